@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class GraphCache:
+    """Bounded LRU of serialized graphs keyed by (family_id, variant, version).
+
+    A variant tells apart payloads of one family version (a projection, a
+    layout mode); invalidating a family drops all of them. Entries expire after `ttl` seconds and the cache is capped both by entry
+    count and by the total size of the stored payloads.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 0, ttl: float = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes  # 0 disables the byte limit
+        self.ttl = ttl  # 0 disables expiry
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, family_id: str, version: int, variant: str = None):
+        key = (family_id, variant, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, payload, _ = entry
+            if self.ttl and time.monotonic() - stored_at > self.ttl:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def set(
+        self,
+        family_id: str,
+        version: int,
+        payload,
+        size: int = None,
+        variant: str = None,
+    ):
+        # `size` accounts for payloads that are not bytes (e.g. built indexes)
+        if not self.enabled:
+            return
+        if size is None:
+            size = len(payload)
+        if self.max_bytes and size > self.max_bytes:
+            return
+        key = (family_id, variant, version)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic(), payload, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes and self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, family_id: str):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == family_id]:
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+graph_cache = GraphCache(
+    max_entries=int(os.getenv("GRAPH_CACHE_MAX_ENTRIES", "128")),
+    max_bytes=int(os.getenv("GRAPH_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+    ttl=float(os.getenv("GRAPH_CACHE_TTL_SECONDS", "300")),
+)
+
+# Server-side layouts, one variant per layout mode
+layout_cache = GraphCache(
+    max_entries=int(os.getenv("LAYOUT_CACHE_MAX_ENTRIES", "64")),
+    max_bytes=int(os.getenv("LAYOUT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.getenv("LAYOUT_CACHE_TTL_SECONDS", "3600")),
+)
+
+# Kinship adjacency indexes (app.kinship.KinshipIndex)
+kinship_cache = GraphCache(
+    max_entries=int(os.getenv("KINSHIP_CACHE_MAX_ENTRIES", "32")),
+    max_bytes=int(os.getenv("KINSHIP_CACHE_MAX_BYTES", str(128 * 1024 * 1024))),
+    ttl=float(os.getenv("KINSHIP_CACHE_TTL_SECONDS", "3600")),
+)
@@ -0,0 +1,204 @@
+import os
+import zlib
+
+from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional, gzip only without it
+    brotli = None
+
+load_dotenv()
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+# Responses smaller than this are sent as is
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI = os.getenv("COMPRESSION_BROTLI", "true").lower() == "true"
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+# Streaming responses are flushed to the client after this much input
+COMPRESSION_STREAM_FLUSH_BYTES = int(
+    os.getenv("COMPRESSION_STREAM_FLUSH_BYTES", str(64 * 1024))
+)
+
+# Already compressed, nothing to gain
+SKIP_CONTENT_TYPES = (
+    "image/",
+    "video/",
+    "audio/",
+    "application/zip",
+    "application/gzip",
+)
+
+
+def no_compression(endpoint):
+    """Opt a route out of response compression (apply below @router.get)."""
+    endpoint.no_compression = True
+    return endpoint
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        # wbits 16 + 15: gzip container
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def parse_accept_encoding(value: str) -> dict[str, float]:
+    accepted = {}
+    for item in value.split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+class CompressionMiddleware:
+    """gzip / brotli response compression.
+
+    Small bodies (below `minimum_size`) pass through untouched, streaming
+    bodies are compressed chunk by chunk and flushed every `flush_size` bytes
+    of input, and routes marked with @no_compression are skipped.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+        use_brotli: bool = COMPRESSION_BROTLI,
+        flush_size: int = COMPRESSION_STREAM_FLUSH_BYTES,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.use_brotli = use_brotli and brotli is not None
+        self.flush_size = flush_size
+
+    def choose_encoder(self, accept_encoding: str):
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        br = accepted.get("br", wildcard) if self.use_brotli else 0.0
+        gzip = accepted.get("gzip", wildcard)
+        if br > 0 and br >= gzip:
+            return BrotliEncoder(self.brotli_quality)
+        if gzip > 0:
+            return GzipEncoder(self.gzip_level)
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoder = self.choose_encoder(Headers(scope=scope).get("accept-encoding", ""))
+        if encoder is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message = {}
+        # None until the first body chunk decides whether to compress
+        compressing = None
+        pending = 0
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, compressing, pending
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressing is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                compressing = self.should_compress(scope, start_message, headers)
+                if compressing and not more_body and len(body) < self.minimum_size:
+                    compressing = False
+                if compressing:
+                    headers["Content-Encoding"] = encoder.name
+                    headers.add_vary_header("Accept-Encoding")
+                    if more_body:
+                        # Length of the compressed stream is unknown up front
+                        del headers["Content-Length"]
+                    else:
+                        body = encoder.compress(body) + encoder.finish()
+                        headers["Content-Length"] = str(len(body))
+                        message["body"] = body
+                        await send(start_message)
+                        await send(message)
+                        return
+                await send(start_message)
+
+            if not compressing:
+                await send(message)
+                return
+
+            chunk = encoder.compress(body)
+            pending += len(body)
+            if not more_body:
+                chunk += encoder.finish()
+            elif pending >= self.flush_size:
+                chunk += encoder.flush()
+                pending = 0
+            if chunk or not more_body:
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": more_body,
+                    }
+                )
+
+        await self.app(scope, receive, send_compressed)
+
+    def should_compress(self, scope: Scope, message: Message, headers) -> bool:
+        # The router stores the matched endpoint in the (shared) scope
+        if getattr(scope.get("endpoint"), "no_compression", False):
+            return False
+        status = message["status"]
+        if status < 200 or status in (204, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return not content_type.startswith(SKIP_CONTENT_TYPES)
@@ -1,23 +1,140 @@
+import base64
+import binascii
 import json
 import logging
 import os
+import time
 import uuid
 from collections import Counter
+from datetime import datetime, timedelta, timezone
 from typing import List
 
-from sqlalchemy import or_
+from sqlalchemy import and_, func, insert, literal, or_, select, update
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from . import models, schemas
+from .cache import graph_cache, kinship_cache, layout_cache
+from .database import recent_writes
+from .import_progress import ImportProgress
+from .kinship import KinshipIndex, describe
+from .layout import LayoutMember, RecursiveFamilyLayout
 
 logger = logging.getLogger(__name__)
 
+# Graph change log retention (see compact_graph_changes)
+GRAPH_CHANGES_RETENTION = timedelta(
+    hours=float(os.getenv("GRAPH_CHANGES_RETENTION_HOURS", "168"))
+)
+GRAPH_CHANGES_COMPACT_INTERVAL = float(
+    os.getenv("GRAPH_CHANGES_COMPACT_INTERVAL_SECONDS", "3600")
+)
+_last_compaction = 0.0
+
 
 def generate_uuid():
     return str(uuid.uuid4())
 
 
+# Keyset pagination
+# Listings are ordered by creation time, then primary key for rows created in
+# the same instant. The opaque cursor carries the (created_at, id) of the last
+# row of the previous page, so deep pages cost the same as the first one, and
+# neither rows inserted nor the last row being deleted meanwhile can shift the
+# window.
+class Page(list):
+    """One page of a listing; `next_cursor` is set when it was full."""
+
+    next_cursor = None
+
+
+def encode_cursor(created_at: datetime, last_id: str) -> str:
+    raw = json.dumps({"created_at": created_at.isoformat(), "id": last_id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+        created_at = datetime.fromisoformat(key["created_at"])
+        last_id = key["id"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(last_id, str):
+        raise ValueError("Invalid cursor")
+    return created_at, last_id
+
+
+def paginate(query, model, skip: int = 0, limit: int = 100, cursor: str = None):
+    query = query.order_by(model.created_at, model.id)
+    if cursor:
+        last_created_at, last_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                model.created_at > last_created_at,
+                and_(model.created_at == last_created_at, model.id > last_id),
+            )
+        )
+    elif skip:
+        # Legacy offset paging, kept for existing clients
+        query = query.offset(skip)
+    page = Page(query.limit(limit).all())
+    if limit and len(page) == limit:
+        page.next_cursor = encode_cursor(page[-1].created_at, page[-1].id)
+    return page
+
+
+# Member projections (fields= / view=)
+MEMBER_FIELDS = tuple(schemas.Member.model_fields)
+
+MEMBER_VIEWS = {
+    # What the canvas needs to draw and place a node in viewer mode
+    "lean": (
+        "id",
+        "family_id",
+        "name",
+        "surname",
+        "gender",
+        "birth_date",
+        "death_date",
+        "is_deceased",
+        "is_fuzzy",
+        "sort_order",
+        "region_ids",
+    ),
+}
+
+
+def get_member_fields(view: str = None, fields: str = None):
+    # Resolve the requested projection; None means the full Member.
+    if fields:
+        requested = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = requested - set(MEMBER_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown member fields: {', '.join(sorted(unknown))}")
+    elif view in (None, "full"):
+        return None
+    elif view in MEMBER_VIEWS:
+        requested = set(MEMBER_VIEWS[view])
+    else:
+        raise ValueError(f"Unknown view: {view}")
+    requested.add("id")
+    return [f for f in MEMBER_FIELDS if f in requested]
+
+
+def get_member_columns(fields, always=("id",)):
+    names = (set(fields) | set(always)) - {"region_ids"}
+    return [getattr(models.Member, f) for f in MEMBER_FIELDS if f in names]
+
+
+def project_member(row, fields, region_ids=None) -> dict:
+    return {
+        f: (region_ids or []) if f == "region_ids" else getattr(row, f)
+        for f in fields
+    }
+
+
 # User
 def create_user(db: Session, user: schemas.UserCreate):
     # In real app, hash password
@@ -41,8 +158,10 @@ def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.User).offset(skip).limit(limit).all()
+def get_users(db: Session, skip: int = 0, limit: int = 100, cursor: str = None):
+    return paginate(
+        db.query(models.User), models.User, skip=skip, limit=limit, cursor=cursor
+    )
 
 
 def delete_user(db: Session, user_id: str):
@@ -68,10 +187,17 @@ def create_family(db: Session, family: schemas.FamilyCreate):
     db.add(db_family)
     db.commit()
     db.refresh(db_family)
+    recent_writes.mark([db_family.id, db_family.user_id])
     return db_family
 
 
-def get_families(db: Session, user_id: str = None, skip: int = 0, limit: int = 100):
+def get_families(
+    db: Session,
+    user_id: str = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str = None,
+):
     query = db.query(models.Family)
 
     if user_id:
@@ -88,13 +214,177 @@ def get_families(db: Session, user_id: str = None, skip: int = 0, limit: int = 1
 
         query = query.filter(owned_condition | shared_condition)
 
-    return query.offset(skip).limit(limit).all()
+    return paginate(query, models.Family, skip=skip, limit=limit, cursor=cursor)
 
 
 def get_family(db: Session, family_id: str):
     return db.query(models.Family).filter(models.Family.id == family_id).first()
 
 
+def get_family_regions(db: Session, family_id: str):
+    return db.query(models.Region).filter(models.Region.family_id == family_id).all()
+
+
+def get_families_with_role(db: Session, families, user_id: str = None):
+    # Family dicts enriched with the requesting user's role
+    collab_roles = {}
+    if user_id:
+        # Collaborator roles for every listed family in one query
+        shared_ids = [f.id for f in families if f.user_id != user_id]
+        if shared_ids:
+            collab_roles = dict(
+                db.query(
+                    models.FamilyCollaborator.family_id, models.FamilyCollaborator.role
+                ).filter(
+                    models.FamilyCollaborator.user_id == user_id,
+                    models.FamilyCollaborator.family_id.in_(shared_ids),
+                )
+            )
+
+    result = []
+    for f in families:
+        role = "viewer"  # Default
+        if user_id:
+            if f.user_id == user_id:
+                role = "owner"
+            else:
+                # Check collaborator role
+                role = collab_roles.get(f.id) or role
+
+        # Super admin check (not implemented here easily without user object)
+        # But for list display, this is fine.
+
+        f_dict = f.__dict__
+        f_dict["current_user_role"] = role
+        result.append(f_dict)
+    return result
+
+
+# Graph versions
+def get_family_version(db: Session, family_id: str):
+    return (
+        db.query(models.Family.version)
+        .filter(models.Family.id == family_id)
+        .scalar()
+    )
+
+
+def invalidate_family_caches(family_id: str):
+    # Entries of older versions can never be hit again
+    for cache in (graph_cache, layout_cache, kinship_cache):
+        cache.invalidate(family_id)
+
+
+def bump_family_versions(db: Session, family_ids, changes=(), reset=False):
+    # Atomic in-database increment; callers commit it with their own changes.
+    # `changes` are (entity_type, entity_id, op) tuples logged against the new
+    # version of every family, feeding get_family_graph_changes. `reset` marks
+    # a change too broad for the log (e.g. relinking a whole family): deltas
+    # from earlier versions are refused and clients reload the full graph.
+    family_ids = {f for f in family_ids if f}
+    if not family_ids:
+        return
+    # Read-your-writes: reads about these go to the primary for a while
+    recent_writes.mark(family_ids | {entity_id for _, entity_id, _ in changes})
+    for family_id in family_ids:
+        invalidate_family_caches(family_id)
+    db.query(models.Family).filter(models.Family.id.in_(family_ids)).update(
+        {models.Family.version: models.Family.version + 1},
+        synchronize_session=False,
+    )
+    if reset:
+        db.query(models.Family).filter(models.Family.id.in_(family_ids)).update(
+            {models.Family.change_log_floor: models.Family.version},
+            synchronize_session=False,
+        )
+        return
+
+    changes = list(dict.fromkeys(changes))
+    if not changes:
+        return
+    versions = db.query(models.Family.id, models.Family.version).filter(
+        models.Family.id.in_(family_ids)
+    )
+    db.execute(
+        insert(models.GraphChange),
+        [
+            {
+                "family_id": family_id,
+                "version": version,
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "op": op,
+            }
+            for family_id, version in versions
+            for entity_type, entity_id, op in changes
+        ],
+    )
+
+    global _last_compaction
+    if time.monotonic() - _last_compaction > GRAPH_CHANGES_COMPACT_INTERVAL:
+        _last_compaction = time.monotonic()
+        compact_graph_changes(db)
+
+
+def compact_graph_changes(db: Session, retention: timedelta = None):
+    # Drop log entries older than the retention window and raise each
+    # family's floor so deltas from before it are answered with a reset.
+    cutoff = datetime.now(timezone.utc) - (retention or GRAPH_CHANGES_RETENTION)
+    expired = (
+        db.query(models.GraphChange.family_id, func.max(models.GraphChange.version))
+        .filter(models.GraphChange.created_at < cutoff)
+        .group_by(models.GraphChange.family_id)
+        .all()
+    )
+    for family_id, max_version in expired:
+        db.query(models.Family).filter(
+            models.Family.id == family_id,
+            models.Family.change_log_floor < max_version,
+        ).update(
+            {models.Family.change_log_floor: max_version},
+            synchronize_session=False,
+        )
+    if expired:
+        db.query(models.GraphChange).filter(
+            models.GraphChange.created_at < cutoff
+        ).delete(synchronize_session=False)
+        logger.info(f"Compacted graph change log for {len(expired)} families")
+
+
+def get_graph_family_ids(db: Session, member_ids) -> set[str]:
+    # Every family whose graph shows one of these members: the members' own
+    # families, families holding regions they belong to, and families with a
+    # region linked to one of the members' families.
+    member_ids = [m for m in member_ids if m]
+    if not member_ids:
+        return set()
+
+    own_ids = {
+        fid
+        for (fid,) in db.query(models.Member.family_id).filter(
+            models.Member.id.in_(member_ids)
+        )
+    }
+    region_family_ids = {
+        fid
+        for (fid,) in db.query(models.Region.family_id)
+        .join(
+            models.member_regions,
+            models.member_regions.c.region_id == models.Region.id,
+        )
+        .filter(models.member_regions.c.member_id.in_(member_ids))
+    }
+    linking_ids = set()
+    if own_ids:
+        linking_ids = {
+            fid
+            for (fid,) in db.query(models.Region.family_id).filter(
+                models.Region.linked_family_id.in_(own_ids)
+            )
+        }
+    return own_ids | region_family_ids | linking_ids
+
+
 # Collaborators
 def add_collaborator(db: Session, family_id: str, user_id: str, role: str):
     # Check if already exists
@@ -103,14 +393,17 @@ def add_collaborator(db: Session, family_id: str, user_id: str, role: str):
         .filter_by(family_id=family_id, user_id=user_id)
         .first()
     )
+    recent_writes.mark([user_id])
     if existing:
         existing.role = role
+        bump_family_versions(db, [family_id])
         db.commit()
         db.refresh(existing)
         return existing
 
     collab = models.FamilyCollaborator(family_id=family_id, user_id=user_id, role=role)
     db.add(collab)
+    bump_family_versions(db, [family_id])
     db.commit()
     db.refresh(collab)
     return collab
@@ -124,6 +417,8 @@ def remove_collaborator(db: Session, family_id: str, user_id: str):
     )
     if collab:
         db.delete(collab)
+        recent_writes.mark([user_id])
+        bump_family_versions(db, [family_id])
         db.commit()
         return True
     return False
@@ -133,6 +428,16 @@ def get_collaborators(db: Session, family_id: str):
     return db.query(models.FamilyCollaborator).filter_by(family_id=family_id).all()
 
 
+def get_collaborators_with_users(db: Session, family_id: str):
+    # Enrich with user info, loaded in the same query
+    return (
+        db.query(models.FamilyCollaborator)
+        .options(joinedload(models.FamilyCollaborator.user))
+        .filter_by(family_id=family_id)
+        .all()
+    )
+
+
 def get_user_role_in_family(db: Session, family_id: str, user_id: str):
     family = get_family(db, family_id)
     if not family:
@@ -158,6 +463,8 @@ def update_family(db: Session, family_id: str, family: schemas.FamilyUpdate):
         update_data = family.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_family, key, value)
+        recent_writes.mark([db_family.user_id])
+        bump_family_versions(db, [family_id])
         db.commit()
         db.refresh(db_family)
     return db_family
@@ -212,8 +519,13 @@ def get_pending_access_requests(db: Session, user_id: str):
 
     all_ids = list(set(owned_ids + admin_ids))
 
+    # Requesting user and family are loaded with the requests
     return (
         db.query(models.AccessRequest)
+        .options(
+            joinedload(models.AccessRequest.user),
+            joinedload(models.AccessRequest.family),
+        )
         .filter(
             models.AccessRequest.family_id.in_(all_ids),
             models.AccessRequest.status == "pending",
@@ -234,8 +546,15 @@ def update_access_request_status(db: Session, request_id: str, status: str):
 def delete_family(db: Session, family_id: str):
     db_family = get_family(db, family_id)
     if db_family:
+        # In bulk rather than through an ORM cascade: a busy family has a long
+        # log, and SQLite does not enforce the ON DELETE CASCADE
+        db.query(models.GraphChange).filter(
+            models.GraphChange.family_id == family_id
+        ).delete(synchronize_session=False)
         db.delete(db_family)
         db.commit()
+        recent_writes.mark([family_id, db_family.user_id])
+        invalidate_family_caches(family_id)
     return db_family
 
 
@@ -260,6 +579,14 @@ def create_member(db: Session, member: schemas.MemberCreate):
     )
     db.add(db_pos)
 
+    bump_family_versions(
+        db,
+        [member.family_id] + [r.family_id for r in db_member.regions],
+        changes=[
+            ("member", db_member.id, "create"),
+            ("position", db_member.id, "create"),
+        ],
+    )
     db.commit()
     db.refresh(db_member)
 
@@ -269,25 +596,45 @@ def create_member(db: Session, member: schemas.MemberCreate):
     return db_member
 
 
-def get_members(db: Session, family_id: str, skip: int = 0, limit: int = 100):
-    # Join with MemberPosition to get positions for this family
-    results = (
-        db.query(models.Member, models.MemberPosition)
-        .outerjoin(
-            models.MemberPosition,
-            (models.MemberPosition.member_id == models.Member.id)
-            & (models.MemberPosition.family_id == family_id),
+def get_members(
+    db: Session,
+    family_id: str,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str = None,
+    fields=None,
+):
+    if fields is not None:
+        # Projection: select only the requested columns and return plain dicts
+        # created_at is selected for the cursor even when not requested
+        columns = get_member_columns(fields, always=("id", "created_at"))
+        rows = paginate(
+            db.query(*columns).filter(models.Member.family_id == family_id),
+            models.Member,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
         )
-        .filter(models.Member.family_id == family_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+        region_map = (
+            get_member_region_ids(db, [r.id for r in rows])
+            if "region_ids" in fields
+            else {}
+        )
+        page = Page(project_member(r, fields, region_map.get(r.id)) for r in rows)
+        page.next_cursor = rows.next_cursor
+        return page
+
+    members = paginate(
+        db.query(models.Member).filter(models.Member.family_id == family_id),
+        models.Member,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
     )
 
-    members = []
-    for m, p in results:
-        m.region_ids = [r.id for r in m.regions]
-        members.append(m)
+    region_map = get_member_region_ids(db, [m.id for m in members])
+    for m in members:
+        m.region_ids = region_map.get(m.id, [])
 
     return members
 
@@ -304,6 +651,8 @@ def update_member(db: Session, member_id: str, member: schemas.MemberUpdate):
     db_member = db.query(models.Member).filter(models.Member.id == member_id).first()
     if db_member:
         update_data = member.model_dump(exclude_unset=True)
+        # Families showing the member before the edit (covers removed regions)
+        affected_family_ids = get_graph_family_ids(db, [member_id])
 
         # Handle regions update
         if "region_ids" in update_data:
@@ -319,6 +668,10 @@ def update_member(db: Session, member_id: str, member: schemas.MemberUpdate):
         for key, value in update_data.items():
             setattr(db_member, key, value)
 
+        affected_family_ids.update(r.family_id for r in db_member.regions)
+        bump_family_versions(
+            db, affected_family_ids, changes=[("member", member_id, "update")]
+        )
         db.commit()
         db.refresh(db_member)
         db_member.region_ids = [r.id for r in db_member.regions]
@@ -330,31 +683,37 @@ def update_members_positions(
     db: Session, updates: List[schemas.MemberPositionUpdate], family_id: str
 ):
     logger.info(f"Updating positions for family {family_id}, count: {len(updates)}")
-    # Upsert positions
-    for update in updates:
-        pos = (
-            db.query(models.MemberPosition)
-            .filter(
-                models.MemberPosition.member_id == update.id,
-                models.MemberPosition.family_id == family_id,
-            )
-            .first()
+    # Upsert positions, existing ones fetched in one query
+    positions = {
+        pos.member_id: pos
+        for pos in db.query(models.MemberPosition).filter(
+            models.MemberPosition.member_id.in_([item.id for item in updates]),
+            models.MemberPosition.family_id == family_id,
         )
+    }
+    for item in updates:
+        pos = positions.get(item.id)
 
         if pos:
-            # logger.info(f"Updating pos for {update.id}: {update.position_x}, {update.position_y}")
-            pos.x = update.position_x
-            pos.y = update.position_y
+            # logger.info(f"Updating pos for {item.id}: {item.position_x}, {item.position_y}")
+            pos.x = item.position_x
+            pos.y = item.position_y
         else:
-            logger.info(f"Creating pos for {update.id} in family {family_id}: {update.position_x}, {update.position_y}")
+            logger.info(f"Creating pos for {item.id} in family {family_id}: {item.position_x}, {item.position_y}")
             pos = models.MemberPosition(
-                member_id=update.id,
+                member_id=item.id,
                 family_id=family_id,
-                x=update.position_x,
-                y=update.position_y,
+                x=item.position_x,
+                y=item.position_y,
             )
             db.add(pos)
+            positions[item.id] = pos
 
+    bump_family_versions(
+        db,
+        [family_id],
+        changes=[("position", item.id, "update") for item in updates],
+    )
     try:
         db.commit()
         # Force refresh of all instances in session to ensure subsequent reads get fresh data
@@ -368,14 +727,66 @@ def update_members_positions(
     return True
 
 
+def get_region_changes(db_region: models.Region, op: str, member_ids=None):
+    # A region change also changes region_ids on every member it holds.
+    if member_ids is None:
+        member_ids = [m.id for m in db_region.members]
+    return [("region", db_region.id, op)] + [
+        ("member", member_id, "update") for member_id in member_ids
+    ]
+
+
+def get_member_delete_changes(db: Session, member_ids):
+    # Change log entries for deleting members, including the edges that go
+    # with them; collected before the rows disappear.
+    changes = []
+    for member_id in member_ids:
+        changes.append(("member", member_id, "delete"))
+        changes.append(("position", member_id, "delete"))
+    spouse_ids = db.query(models.SpouseRelationship.id).filter(
+        models.SpouseRelationship.member1_id.in_(member_ids)
+        | models.SpouseRelationship.member2_id.in_(member_ids)
+    )
+    changes.extend(("spouse", rel_id, "delete") for (rel_id,) in spouse_ids)
+    parent_child_ids = db.query(models.ParentChildRelationship.id).filter(
+        models.ParentChildRelationship.parent_id.in_(member_ids)
+        | models.ParentChildRelationship.child_id.in_(member_ids)
+    )
+    changes.extend(("parent_child", rel_id, "delete") for (rel_id,) in parent_child_ids)
+    return changes
+
+
 def delete_region(db: Session, region_id: str):
     db_region = db.query(models.Region).filter(models.Region.id == region_id).first()
     if db_region:
+        bump_family_versions(
+            db,
+            [db_region.family_id],
+            changes=get_region_changes(db_region, "delete"),
+            reset=bool(db_region.linked_family_id),
+        )
         db.delete(db_region)
         db.commit()
     return db_region
 
 
+def delete_orphan_regions(db: Session, regions, changes):
+    # Delete the regions no member belongs to any more (after a flush)
+    regions = list(regions)
+    if not regions:
+        return
+    in_use = {
+        region_id
+        for (region_id,) in db.query(models.member_regions.c.region_id)
+        .filter(models.member_regions.c.region_id.in_([r.id for r in regions]))
+        .distinct()
+    }
+    for region in regions:
+        if region.id not in in_use:
+            db.delete(region)
+            changes.append(("region", region.id, "delete"))
+
+
 def delete_member(db: Session, member_id: str):
     db_member = db.query(models.Member).filter(models.Member.id == member_id).first()
     if db_member:
@@ -386,6 +797,8 @@ def delete_member(db: Session, member_id: str):
         
         # Create Pydantic model instance to return, ensuring it survives session commit/expiry
         member_response = schemas.Member.model_validate(db_member)
+        affected_family_ids = get_graph_family_ids(db, [member_id])
+        changes = get_member_delete_changes(db, [member_id])
 
         # Check for related relationships and delete them first
         # This is a manual cascade for safety, though database cascade should handle it.
@@ -417,25 +830,35 @@ def delete_member(db: Session, member_id: str):
         db.delete(db_member)
         db.flush()
 
-        for region in affected_regions:
-            count = (
-                db.query(models.member_regions)
-                .filter(models.member_regions.c.region_id == region.id)
-                .count()
-            )
-            if count == 0:
-                db.delete(region)
+        delete_orphan_regions(db, affected_regions, changes)
 
+        bump_family_versions(db, affected_family_ids, changes=changes)
         db.commit()
         return member_response
     return None
 
 
 def delete_members(db: Session, member_ids: list[str]):
-    members = db.query(models.Member).filter(models.Member.id.in_(member_ids)).all()
+    # Regions and the cascaded collections are loaded for all members at once,
+    # not lazily per member by db.delete()
+    members = (
+        db.query(models.Member)
+        .options(
+            selectinload(models.Member.regions),
+            selectinload(models.Member.positions),
+            selectinload(models.Member.spouse_relationships_1),
+            selectinload(models.Member.spouse_relationships_2),
+            selectinload(models.Member.parent_relationships),
+            selectinload(models.Member.child_relationships),
+        )
+        .filter(models.Member.id.in_(member_ids))
+        .all()
+    )
     if not members:
         return []
 
+    affected_family_ids = get_graph_family_ids(db, [m.id for m in members])
+    changes = get_member_delete_changes(db, [m.id for m in members])
     affected_regions = set()
     for m in members:
         for r in m.regions:
@@ -446,15 +869,9 @@ def delete_members(db: Session, member_ids: list[str]):
 
     db.flush()
 
-    for region in affected_regions:
-        count = (
-            db.query(models.member_regions)
-            .filter(models.member_regions.c.region_id == region.id)
-            .count()
-        )
-        if count == 0:
-            db.delete(region)
+    delete_orphan_regions(db, affected_regions, changes)
 
+    bump_family_versions(db, affected_family_ids, changes=changes)
     db.commit()
     return members
 
@@ -465,6 +882,12 @@ def create_spouse_relationship(
 ):
     db_rel = models.SpouseRelationship(**relationship.model_dump())
     db.add(db_rel)
+    db.flush()  # Flush to get ID
+    bump_family_versions(
+        db,
+        get_graph_family_ids(db, [db_rel.member1_id, db_rel.member2_id]),
+        changes=[("spouse", db_rel.id, "create")],
+    )
     db.commit()
     db.refresh(db_rel)
     return db_rel
@@ -475,6 +898,12 @@ def create_parent_child_relationship(
 ):
     db_rel = models.ParentChildRelationship(**relationship.model_dump())
     db.add(db_rel)
+    db.flush()  # Flush to get ID
+    bump_family_versions(
+        db,
+        get_graph_family_ids(db, [db_rel.parent_id, db_rel.child_id]),
+        changes=[("parent_child", db_rel.id, "create")],
+    )
     db.commit()
     db.refresh(db_rel)
     return db_rel
@@ -487,6 +916,11 @@ def delete_spouse_relationship(db: Session, relationship_id: str):
         .first()
     )
     if db_rel:
+        bump_family_versions(
+            db,
+            get_graph_family_ids(db, [db_rel.member1_id, db_rel.member2_id]),
+            changes=[("spouse", db_rel.id, "delete")],
+        )
         db.delete(db_rel)
         db.commit()
     return db_rel
@@ -504,6 +938,11 @@ def update_spouse_relationship(
         update_data = relationship.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_rel, key, value)
+        bump_family_versions(
+            db,
+            get_graph_family_ids(db, [db_rel.member1_id, db_rel.member2_id]),
+            changes=[("spouse", db_rel.id, "update")],
+        )
         db.commit()
         db.refresh(db_rel)
     return db_rel
@@ -516,45 +955,57 @@ def delete_parent_child_relationship(db: Session, relationship_id: str):
         .first()
     )
     if db_rel:
+        bump_family_versions(
+            db,
+            get_graph_family_ids(db, [db_rel.parent_id, db_rel.child_id]),
+            changes=[("parent_child", db_rel.id, "delete")],
+        )
         db.delete(db_rel)
         db.commit()
     return db_rel
 
 
-def get_family_graph(db: Session, family_id: str):
-    linked_regions = (
-        db.query(models.Region)
-        .filter(
-            models.Region.family_id == family_id,
-            models.Region.linked_family_id.isnot(None),
-        )
+def get_member_region_ids(db: Session, member_ids) -> dict[str, list[str]]:
+    # One set-based query over the association table instead of a lazy
+    # load of `Member.regions` per member.
+    region_map: dict[str, list[str]] = {}
+    if not member_ids:
+        return region_map
+
+    links = (
+        db.query(models.member_regions.c.member_id, models.member_regions.c.region_id)
+        .filter(models.member_regions.c.member_id.in_(member_ids))
         .all()
     )
-    linked_family_map = {
-        lr.linked_family_id: lr.id for lr in linked_regions if lr.linked_family_id
-    }
-    linked_family_ids = list(linked_family_map.keys())
+    for member_id, region_id in links:
+        region_map.setdefault(member_id, []).append(region_id)
+    return region_map
+
 
+def get_graph_member_conditions(family_id: str, linked_family_map: dict):
+    # A family graph shows its own members, members placed in one of its
+    # regions, and all members of families linked from one of its regions.
     conditions = [
         models.Member.family_id == family_id,
         models.Member.regions.any(models.Region.family_id == family_id),
     ]
-    if linked_family_ids:
-        conditions.append(models.Member.family_id.in_(linked_family_ids))
+    if linked_family_map:
+        conditions.append(models.Member.family_id.in_(list(linked_family_map)))
+    return conditions
 
-    members = (
-        db.query(models.Member)
-        .filter(or_(*conditions))
-        .limit(2000)
-        .all()
-    )
 
-    logger.info(f"get_family_graph: family_id={family_id}, members={len(members)}")
-    
+def get_linked_family_map(regions) -> dict[str, str]:
+    return {r.linked_family_id: r.id for r in regions if r.linked_family_id}
+
+
+def get_position_map(db: Session, family_id: str, member_ids):
     # Get positions for ALL members in THIS family context
-    member_ids = [m.id for m in members]
     positions = (
-        db.query(models.MemberPosition)
+        db.query(
+            models.MemberPosition.member_id,
+            models.MemberPosition.x,
+            models.MemberPosition.y,
+        )
         .filter(
             models.MemberPosition.member_id.in_(member_ids),
             models.MemberPosition.family_id == family_id,
@@ -562,24 +1013,26 @@ def get_family_graph(db: Session, family_id: str):
         .all()
     )
     logger.info(f"get_family_graph: found {len(positions)} position records for family {family_id}")
-    pos_map = {p.member_id: (p.x, p.y) for p in positions}
+    return {p.member_id: (p.x, p.y) for p in positions}
+
+
+def build_graph_nodes(db: Session, family_id: str, members, linked_family_map):
+    member_ids = [m.id for m in members]
+    region_map = get_member_region_ids(db, member_ids)
+    pos_map = get_position_map(db, family_id, member_ids)
 
+    nodes = []
     for m in members:
-        rids = {r.id for r in m.regions}
+        rids = set(region_map.get(m.id, []))
 
         if m.family_id and m.family_id in linked_family_map:
             rids.add(linked_family_map[m.family_id])
 
         m.region_ids = list(rids)
-        
-    nodes = []
-    member_ids_set = set()
-    for m in members:
-        member_ids_set.add(m.id)
-        
+
         # Look up position
         pos = pos_map.get(m.id, (0, 0))
-        
+
         nodes.append(
             schemas.GraphNode(
                 id=m.id,
@@ -590,8 +1043,78 @@ def get_family_graph(db: Session, family_id: str):
                 data=m,
             )
         )
+    return nodes
+
+
+def spouse_edge(s) -> schemas.GraphEdge:
+    return schemas.GraphEdge(
+        id=s.id,
+        source=s.member1_id,
+        target=s.member2_id,
+        type="spouse",
+        data={"marriage_date": s.marriage_date},
+    )
+
+
+def parent_child_edge(pc) -> schemas.GraphEdge:
+    return schemas.GraphEdge(
+        id=pc.id,
+        source=pc.parent_id,
+        target=pc.child_id,
+        type="parent-child",
+        label=pc.relationship_type,
+    )
+
+
+def get_family_graph(db: Session, family_id: str, fields=None):
+    # The graph is assembled from a fixed number of set-based queries
+    # (regions, members, region links, positions, spouses, parent-child),
+    # independent of the family size.
+    regions = db.query(models.Region).filter(models.Region.family_id == family_id).all()
+    linked_family_map = get_linked_family_map(regions)
+    conditions = get_graph_member_conditions(family_id, linked_family_map)
+
+    if fields is None:
+        members = db.query(models.Member).filter(or_(*conditions)).limit(2000).all()
+        nodes = build_graph_nodes(db, family_id, members, linked_family_map)
+    else:
+        # Projection: node data carries only the requested member columns
+        members = (
+            db.query(
+                *get_member_columns(
+                    fields, always=("id", "family_id", "name", "gender")
+                )
+            )
+            .filter(or_(*conditions))
+            .limit(2000)
+            .all()
+        )
+        member_ids = [m.id for m in members]
+        region_map = (
+            get_member_region_ids(db, member_ids) if "region_ids" in fields else {}
+        )
+        pos_map = get_position_map(db, family_id, member_ids)
+        nodes = []
+        for m in members:
+            rids = set(region_map.get(m.id, []))
+            if m.family_id in linked_family_map:
+                rids.add(linked_family_map[m.family_id])
+            x, y = pos_map.get(m.id, (0, 0))
+            nodes.append(
+                schemas.ProjectedGraphNode(
+                    id=m.id,
+                    name=m.name,
+                    gender=m.gender,
+                    x=x,
+                    y=y,
+                    data=project_member(m, fields, list(rids)),
+                )
+            )
+
+    logger.info(f"get_family_graph: family_id={family_id}, members={len(members)}")
+
+    member_ids_set = {m.id for m in members}
 
-    edges = []
     spouses = (
         db.query(models.SpouseRelationship)
         .filter(
@@ -601,18 +1124,6 @@ def get_family_graph(db: Session, family_id: str):
         .all()
     )
 
-    for s in spouses:
-        if s.member1_id in member_ids_set or s.member2_id in member_ids_set:
-            edges.append(
-                schemas.GraphEdge(
-                    id=s.id,
-                    source=s.member1_id,
-                    target=s.member2_id,
-                    type="spouse",
-                    data={"marriage_date": s.marriage_date},
-                )
-            )
-
     parent_child = (
         db.query(models.ParentChildRelationship)
         .filter(
@@ -622,21 +1133,509 @@ def get_family_graph(db: Session, family_id: str):
         .all()
     )
 
-    for pc in parent_child:
-        if pc.parent_id in member_ids_set or pc.child_id in member_ids_set:
-            edges.append(
-                schemas.GraphEdge(
-                    id=pc.id,
-                    source=pc.parent_id,
-                    target=pc.child_id,
-                    type="parent-child",
-                    label=pc.relationship_type,
-                )
+    edges = [spouse_edge(s) for s in spouses]
+    edges.extend(parent_child_edge(pc) for pc in parent_child)
+
+    if fields is not None:
+        return schemas.ProjectedGraphData(nodes=nodes, edges=edges, regions=regions)
+    return schemas.GraphData(nodes=nodes, edges=edges, regions=regions)
+
+
+def get_family_graph_changes(db: Session, family_id: str, since: int):
+    family = (
+        db.query(models.Family.version, models.Family.change_log_floor)
+        .filter(models.Family.id == family_id)
+        .first()
+    )
+    if family is None:
+        return None
+    if since < family.change_log_floor or since > family.version:
+        raise ValueError(
+            f"No changes available since version {since}; reload the full graph"
+        )
+
+    rows = (
+        db.query(
+            models.GraphChange.entity_type,
+            models.GraphChange.entity_id,
+            models.GraphChange.op,
+        )
+        .filter(
+            models.GraphChange.family_id == family_id,
+            models.GraphChange.version > since,
+            models.GraphChange.version <= family.version,
+        )
+        .order_by(models.GraphChange.id)
+        .all()
+    )
+
+    # Collapse the log to the first and last operation per entity
+    ops: dict[tuple[str, str], list[str]] = {}
+    for entity_type, entity_id, op in rows:
+        key = (entity_type, entity_id)
+        if key in ops:
+            ops[key][1] = op
+        else:
+            ops[key] = [op, op]
+
+    added = schemas.GraphDeltaItems()
+    updated = schemas.GraphDeltaItems()
+    deleted = schemas.GraphDeltaIds()
+
+    def place(section, first_op, item):
+        target = added if first_op == "create" else updated
+        getattr(target, section).append(item)
+
+    def live_ids(entity_types):
+        return {
+            entity_id
+            for (entity_type, entity_id), (first_op, last_op) in ops.items()
+            if entity_type in entity_types and last_op != "delete"
+        }
+
+    def mark_deleted(section, entity_types, found_ids):
+        for (entity_type, entity_id), (first_op, last_op) in ops.items():
+            if entity_type not in entity_types or entity_id in found_ids:
+                continue
+            # Created and removed within the window: the client never saw it
+            if first_op != "create":
+                getattr(deleted, section).append(entity_id)
+
+    regions = db.query(models.Region).filter(models.Region.family_id == family_id).all()
+    linked_family_map = get_linked_family_map(regions)
+
+    # Nodes: members that left the graph count as deleted
+    member_ids = live_ids({"member"})
+    members = []
+    if member_ids:
+        members = (
+            db.query(models.Member)
+            .filter(
+                models.Member.id.in_(member_ids),
+                or_(*get_graph_member_conditions(family_id, linked_family_map)),
+            )
+            .all()
+        )
+    for node in build_graph_nodes(db, family_id, members, linked_family_map):
+        place("nodes", ops[("member", node.id)][0], node)
+    mark_deleted("nodes", {"member"}, {m.id for m in members})
+
+    # Positions in this family's context
+    position_ids = live_ids({"position"})
+    positions = []
+    if position_ids:
+        positions = (
+            db.query(
+                models.MemberPosition.member_id,
+                models.MemberPosition.x,
+                models.MemberPosition.y,
+            )
+            .filter(
+                models.MemberPosition.member_id.in_(position_ids),
+                models.MemberPosition.family_id == family_id,
             )
+            .all()
+        )
+    for p in positions:
+        place(
+            "positions",
+            ops[("position", p.member_id)][0],
+            schemas.GraphPosition(member_id=p.member_id, x=p.x, y=p.y),
+        )
+    mark_deleted("positions", {"position"}, {p.member_id for p in positions})
+
+    # Edges
+    found_edge_ids = set()
+    spouse_ids = live_ids({"spouse"})
+    if spouse_ids:
+        for s in db.query(models.SpouseRelationship).filter(
+            models.SpouseRelationship.id.in_(spouse_ids)
+        ):
+            found_edge_ids.add(s.id)
+            place("edges", ops[("spouse", s.id)][0], spouse_edge(s))
+    parent_child_ids = live_ids({"parent_child"})
+    if parent_child_ids:
+        for pc in db.query(models.ParentChildRelationship).filter(
+            models.ParentChildRelationship.id.in_(parent_child_ids)
+        ):
+            found_edge_ids.add(pc.id)
+            place("edges", ops[("parent_child", pc.id)][0], parent_child_edge(pc))
+    mark_deleted("edges", {"spouse", "parent_child"}, found_edge_ids)
+
+    # Regions
+    region_ids = live_ids({"region"})
+    found_region_ids = set()
+    for r in regions:
+        if r.id in region_ids:
+            found_region_ids.add(r.id)
+            place("regions", ops[("region", r.id)][0], schemas.Region.model_validate(r))
+    mark_deleted("regions", {"region"}, found_region_ids)
+
+    return schemas.GraphDelta(
+        family_id=family_id,
+        since=since,
+        version=family.version,
+        added=added,
+        updated=updated,
+        deleted=deleted,
+    )
 
+
+def get_member_lineage(
+    db: Session,
+    member_id: str,
+    direction: str,
+    depth: int = 5,
+    include_spouses: bool = False,
+):
+    # Ancestors ("ancestors") or descendants ("descendants") of a member up to
+    # `depth` generations, walked inside the database with a recursive CTE
+    # (SQLite, PostgreSQL and MySQL 8). Returned in the GraphData shape, in the
+    # context of the member's own family.
+    member = db.query(models.Member).filter(models.Member.id == member_id).first()
+    if member is None:
+        return None
+
+    pc = models.ParentChildRelationship
+    if direction == "ancestors":
+        start_col, next_col = pc.child_id, pc.parent_id
+    else:
+        start_col, next_col = pc.parent_id, pc.child_id
+
+    lineage = (
+        select(next_col.label("member_id"), literal(1).label("depth"))
+        .where(start_col == member_id)
+        .cte("lineage", recursive=True)
+    )
+    previous = lineage.alias("previous")
+    # UNION (not UNION ALL) plus the depth bound keeps pedigree collapse and
+    # accidental cycles finite.
+    lineage = lineage.union(
+        select(next_col, previous.c.depth + 1)
+        .join(previous, start_col == previous.c.member_id)
+        .where(previous.c.depth < depth)
+    )
+    lineage_ids = {
+        row.member_id
+        for row in db.execute(select(lineage.c.member_id).distinct())
+    }
+    lineage_ids.add(member_id)
+
+    if include_spouses:
+        spouse_pairs = db.query(
+            models.SpouseRelationship.member1_id, models.SpouseRelationship.member2_id
+        ).filter(
+            models.SpouseRelationship.member1_id.in_(lineage_ids)
+            | models.SpouseRelationship.member2_id.in_(lineage_ids)
+        )
+        for a, b in spouse_pairs.all():
+            lineage_ids.update((a, b))
+
+    family_id = member.family_id
     regions = db.query(models.Region).filter(models.Region.family_id == family_id).all()
+    linked_family_map = get_linked_family_map(regions)
 
-    return schemas.GraphData(nodes=nodes, edges=edges, regions=regions)
+    members = db.query(models.Member).filter(models.Member.id.in_(lineage_ids)).all()
+    nodes = build_graph_nodes(db, family_id, members, linked_family_map)
+
+    spouses = db.query(models.SpouseRelationship).filter(
+        models.SpouseRelationship.member1_id.in_(lineage_ids),
+        models.SpouseRelationship.member2_id.in_(lineage_ids),
+    )
+    parent_child = db.query(models.ParentChildRelationship).filter(
+        models.ParentChildRelationship.parent_id.in_(lineage_ids),
+        models.ParentChildRelationship.child_id.in_(lineage_ids),
+    )
+    edges = [spouse_edge(s) for s in spouses]
+    edges.extend(parent_child_edge(p) for p in parent_child)
+
+    used_region_ids = {rid for node in nodes for rid in node.data.region_ids}
+    return schemas.GraphData(
+        nodes=nodes,
+        edges=edges,
+        regions=[r for r in regions if r.id in used_region_ids],
+    )
+
+
+def get_kinship_index(db: Session, family_id: str, version: int):
+    index = kinship_cache.get(family_id, version)
+    if index is not None:
+        return index
+
+    regions = db.query(models.Region).filter(models.Region.family_id == family_id).all()
+    conditions = get_graph_member_conditions(family_id, get_linked_family_map(regions))
+    member_ids_query = db.query(models.Member.id).filter(or_(*conditions))
+    spouses = db.query(
+        models.SpouseRelationship.member1_id, models.SpouseRelationship.member2_id
+    ).filter(
+        models.SpouseRelationship.member1_id.in_(member_ids_query)
+        | models.SpouseRelationship.member2_id.in_(member_ids_query)
+    )
+    parent_child = db.query(
+        models.ParentChildRelationship.parent_id,
+        models.ParentChildRelationship.child_id,
+    ).filter(
+        models.ParentChildRelationship.parent_id.in_(member_ids_query)
+        | models.ParentChildRelationship.child_id.in_(member_ids_query)
+    )
+    index = KinshipIndex(
+        [row.id for row in member_ids_query], spouses.all(), parent_child.all()
+    )
+    logger.info(
+        f"get_kinship_index: family_id={family_id}, version={version}, "
+        f"members={len(index.ids)}, edges={index.edge_count}"
+    )
+    kinship_cache.set(family_id, version, index, size=index.approx_bytes)
+    return index
+
+
+def get_kinship(db: Session, source_id: str, target_id: str, family_id: str = None):
+    # Shortest relationship path between two members within a family graph
+    # (its own members plus linked families); defaults to the source's family.
+    if family_id is None:
+        family_id = (
+            db.query(models.Member.family_id)
+            .filter(models.Member.id == source_id)
+            .scalar()
+        )
+    version = get_family_version(db, family_id) if family_id else None
+    if version is None:
+        return None
+
+    index = get_kinship_index(db, family_id, version)
+    if source_id not in index or target_id not in index:
+        return None
+
+    result = schemas.Kinship(
+        family_id=family_id,
+        version=version,
+        source_id=source_id,
+        target_id=target_id,
+        related=False,
+    )
+    path = index.shortest_path(source_id, target_id)
+    if path is None:
+        return result
+
+    names = dict(
+        db.query(models.Member.id, models.Member.name).filter(
+            models.Member.id.in_([member_id for member_id, _ in path])
+        )
+    )
+    result.related = True
+    result.distance = len(path) - 1
+    result.relationship = describe(relation for _, relation in path[1:])
+    result.path = [
+        schemas.KinshipStep(
+            member_id=member_id, name=names.get(member_id), relation=relation
+        )
+        for member_id, relation in path
+    ]
+    return result
+
+
+def layout_family(db: Session, family_id: str, mode: str = "normal"):
+    # Lay out the whole family graph (no member cap) and store the result as
+    # this family's MemberPositions with bulk statements.
+    regions = db.query(models.Region).filter(models.Region.family_id == family_id).all()
+    linked_family_map = get_linked_family_map(regions)
+    conditions = get_graph_member_conditions(family_id, linked_family_map)
+
+    rows = (
+        db.query(
+            models.Member.id,
+            models.Member.family_id,
+            models.Member.gender,
+            models.Member.sort_order,
+            models.Member.birth_date,
+            models.Member.created_at,
+        )
+        .filter(or_(*conditions))
+        .all()
+    )
+    region_map = get_member_region_ids(db, [r.id for r in rows])
+    members = []
+    for r in rows:
+        region_ids = list(region_map.get(r.id, []))
+        if r.family_id in linked_family_map:
+            region_ids.append(linked_family_map[r.family_id])
+        members.append(
+            LayoutMember(
+                id=r.id,
+                gender=r.gender,
+                sort_order=r.sort_order,
+                birth_date=r.birth_date,
+                created_at=r.created_at.isoformat() if r.created_at else "",
+                region_ids=region_ids,
+            )
+        )
+
+    member_ids_query = db.query(models.Member.id).filter(or_(*conditions))
+    spouses = db.query(
+        models.SpouseRelationship.member1_id, models.SpouseRelationship.member2_id
+    ).filter(
+        models.SpouseRelationship.member1_id.in_(member_ids_query)
+        | models.SpouseRelationship.member2_id.in_(member_ids_query)
+    )
+    parent_child = db.query(
+        models.ParentChildRelationship.parent_id,
+        models.ParentChildRelationship.child_id,
+    ).filter(
+        models.ParentChildRelationship.parent_id.in_(member_ids_query)
+        | models.ParentChildRelationship.child_id.in_(member_ids_query)
+    )
+
+    layout = RecursiveFamilyLayout.from_preset(mode).layout(
+        members, spouses.all(), parent_child.all()
+    )
+
+    existing = {
+        p.member_id: p
+        for p in db.query(
+            models.MemberPosition.id,
+            models.MemberPosition.member_id,
+            models.MemberPosition.x,
+            models.MemberPosition.y,
+        ).filter(
+            models.MemberPosition.family_id == family_id,
+            models.MemberPosition.member_id.in_(member_ids_query),
+        )
+    }
+    updates, inserts, changes = [], [], []
+    for member_id, (x, y) in layout.items():
+        pos = existing.get(member_id)
+        if pos is None:
+            inserts.append(
+                {"member_id": member_id, "family_id": family_id, "x": x, "y": y}
+            )
+            changes.append(("position", member_id, "create"))
+        elif (pos.x, pos.y) != (x, y):
+            updates.append({"id": pos.id, "x": x, "y": y})
+            changes.append(("position", member_id, "update"))
+
+    if changes:
+        if updates:
+            db.execute(update(models.MemberPosition), updates)
+        if inserts:
+            db.execute(insert(models.MemberPosition), inserts)
+        bump_family_versions(db, [family_id], changes=changes)
+        db.commit()
+    logger.info(
+        f"layout_family: family_id={family_id}, mode={mode}, members={len(members)}, "
+        f"updated={len(updates)}, created={len(inserts)}"
+    )
+
+    # Members the layout does not reach keep their stored position
+    positions = {
+        member_id: (p.x or 0, p.y or 0) for member_id, p in existing.items()
+    }
+    positions.update(layout)
+    return schemas.FamilyLayout(
+        family_id=family_id,
+        version=get_family_version(db, family_id),
+        mode=mode,
+        positions=[
+            schemas.GraphPosition(member_id=member_id, x=x, y=y)
+            for member_id, (x, y) in positions.items()
+        ],
+    )
+
+
+def iter_family_graph(db: Session, family_id: str, batch_size: int = 1000):
+    # Streaming counterpart of get_family_graph without the member cap. Each
+    # section is read through a server-side cursor as plain columns, and no
+    # cursor is interleaved with another query (MySQL unbuffered cursors do
+    # not allow it), so memory stays flat regardless of family size.
+    # Yields ("node" | "edge" | "region", schema) pairs in that order.
+    regions = db.query(models.Region).filter(models.Region.family_id == family_id).all()
+    linked_family_map = get_linked_family_map(regions)
+
+    conditions = get_graph_member_conditions(family_id, linked_family_map)
+    member_ids_query = db.query(models.Member.id).filter(or_(*conditions))
+
+    member_columns = [c for c in models.Member.__table__.columns]
+    rows = (
+        db.query(
+            *member_columns,
+            models.MemberPosition.x,
+            models.MemberPosition.y,
+            models.member_regions.c.region_id,
+        )
+        .outerjoin(
+            models.MemberPosition,
+            (models.MemberPosition.member_id == models.Member.id)
+            & (models.MemberPosition.family_id == family_id),
+        )
+        .outerjoin(
+            models.member_regions,
+            models.member_regions.c.member_id == models.Member.id,
+        )
+        .filter(or_(*conditions))
+        .order_by(models.Member.id)
+        .yield_per(batch_size)
+    )
+
+    # One row per (member, region) link; rows of a member are adjacent.
+    def build_node(row, region_ids):
+        data = {c.name: row._mapping[c] for c in member_columns}
+        rids = set(region_ids)
+        if data["family_id"] in linked_family_map:
+            rids.add(linked_family_map[data["family_id"]])
+        data["region_ids"] = list(rids)
+        return schemas.GraphNode(
+            id=data["id"],
+            name=data["name"],
+            gender=data["gender"],
+            x=row.x or 0,
+            y=row.y or 0,
+            data=schemas.Member.model_validate(data),
+        )
+
+    current, current_region_ids = None, []
+    for row in rows:
+        if current is not None and row.id != current.id:
+            yield "node", build_node(current, current_region_ids)
+            current_region_ids = []
+        current = row
+        if row.region_id:
+            current_region_ids.append(row.region_id)
+    if current is not None:
+        yield "node", build_node(current, current_region_ids)
+
+    spouses = (
+        db.query(
+            models.SpouseRelationship.id,
+            models.SpouseRelationship.member1_id,
+            models.SpouseRelationship.member2_id,
+            models.SpouseRelationship.marriage_date,
+        )
+        .filter(
+            models.SpouseRelationship.member1_id.in_(member_ids_query)
+            | models.SpouseRelationship.member2_id.in_(member_ids_query)
+        )
+        .yield_per(batch_size)
+    )
+    for s in spouses:
+        yield "edge", spouse_edge(s)
+
+    parent_child = (
+        db.query(
+            models.ParentChildRelationship.id,
+            models.ParentChildRelationship.parent_id,
+            models.ParentChildRelationship.child_id,
+            models.ParentChildRelationship.relationship_type,
+        )
+        .filter(
+            models.ParentChildRelationship.parent_id.in_(member_ids_query)
+            | models.ParentChildRelationship.child_id.in_(member_ids_query)
+        )
+        .yield_per(batch_size)
+    )
+    for pc in parent_child:
+        yield "edge", parent_child_edge(pc)
+
+    for r in regions:
+        yield "region", schemas.Region.model_validate(r)
 
 
 def import_family_from_preset(db: Session, key: str, user_id: str):
@@ -680,9 +1679,42 @@ def import_family_from_preset(db: Session, key: str, user_id: str):
         return None
 
 
-def import_family(db: Session, import_data: schemas.FamilyImport):
+def fill_defaults(table, rows: list[dict]) -> list[dict]:
+    # A Core insert only applies a column's default when the key is missing
+    # from the row; the ORM also applied it for None. Nulls in the import get
+    # the model defaults, and every row keeps the same keys for executemany.
+    defaults = {
+        column.name: column.default.arg
+        for column in table.columns
+        if column.default is not None and column.default.is_scalar
+    }
+    for row in rows:
+        for name, value in defaults.items():
+            if name in row and row[name] is None:
+                row[name] = value
+    return rows
+
+
+def import_family(
+    db: Session,
+    import_data: schemas.FamilyImport,
+    progress: ImportProgress | None = None,
+):
+    # Stage timings, row counts and progress, see app.import_progress
+    if progress is None:
+        progress = ImportProgress(user_id=import_data.user_id)
+    progress.plan(
+        len(import_data.regions or [])
+        + len(import_data.members)
+        + len(import_data.spouse_relationships or [])
+        + len(import_data.parent_child_relationships or [])
+    )
+    # IDs are generated here and rows written with one executemany INSERT per
+    # table (multi-row VALUES batches on PostgreSQL and MySQL) instead of a
+    # flush per row to learn its id. These are Core inserts: ORM bulk inserts
+    # start a new statement whenever the set of non-NULL columns changes.
     try:
-        logger.info("Starting import_family")
+        logger.info(f"Starting import_family {progress.import_id}")
         with db.begin():
             family_ids = [m.family_id for m in import_data.members if m.family_id]
             source_family_id = None
@@ -691,283 +1723,324 @@ def import_family(db: Session, import_data: schemas.FamilyImport):
             logger.info(f"Identified source_family_id: {source_family_id}")
 
             # 1. Create Family
-            family_data = schemas.FamilyCreate(
-                family_name=import_data.family_name, user_id=import_data.user_id
-            ).model_dump()
-            db_family = models.Family(**family_data)
-            db.add(db_family)
-            db.flush()
+            with progress.timed("family"):
+                family_data = schemas.FamilyCreate(
+                    family_name=import_data.family_name, user_id=import_data.user_id
+                ).model_dump()
+                db_family = models.Family(**family_data)
+                db.add(db_family)
+                db.flush()
+                progress.wrote("family")
             logger.info(f"Created family: {db_family.id}")
 
             # 2. Create Regions & Map IDs
             region_id_map: dict[str, str] = {}
-
-            if import_data.regions:
-                for r in import_data.regions:
-                    db_region = models.Region(
-                        family_id=db_family.id,
-                        name=r.name,
-                        description=r.description,
-                        color=r.color,
-                        linked_family_id=r.linked_family_id,
+            # Regions linking to another family, by that family
+            linked_region_ids: dict[str, list[str]] = {}
+
+            with progress.timed("regions"):
+                region_rows = []
+                for r in import_data.regions or []:
+                    region_id = generate_uuid()
+                    region_rows.append(
+                        {
+                            "id": region_id,
+                            "family_id": db_family.id,
+                            "name": r.name,
+                            "description": r.description,
+                            "color": r.color,
+                            "linked_family_id": r.linked_family_id,
+                        }
                     )
-                    db.add(db_region)
-                    db.flush()
                     if r.original_id:
-                        region_id_map[r.original_id.strip()] = db_region.id
+                        region_id_map[r.original_id.strip()] = region_id
+                    if r.linked_family_id:
+                        linked_region_ids.setdefault(r.linked_family_id, []).append(
+                            region_id
+                        )
+                    progress.advance()
+                if region_rows:
+                    table = models.Region.__table__
+                    db.execute(insert(table), fill_defaults(table, region_rows))
+                progress.wrote("regions", len(region_rows))
 
             logger.info(f"Created {len(region_id_map)} regions")
 
             # 3. Create Members & Map IDs
             id_map: dict[str, str] = {}
-            resolved_ids_cache = {}
+            # Members already in the database: original_id -> family_id
+            existing_members: dict[str, str] = {}
+
+            def resolve_existing(original_ids):
+                missing = {
+                    i
+                    for i in original_ids
+                    if i and i not in id_map and i not in existing_members
+                }
+                if missing:
+                    existing_members.update(
+                        db.query(models.Member.id, models.Member.family_id).filter(
+                            models.Member.id.in_(missing)
+                        )
+                    )
 
             def resolve_id(original_id):
                 if not original_id:
                     return None
                 if original_id in id_map:
                     return id_map[original_id]
-                if original_id in resolved_ids_cache:
-                    return resolved_ids_cache[original_id]
-
-                try:
-                    exists = (
-                        db.query(models.Member.id)
-                        .filter(models.Member.id == original_id)
-                        .first()
-                    )
-                    if exists:
-                        resolved_ids_cache[original_id] = original_id
-                        return original_id
-                except SQLAlchemyError as e:
-                    logger.error(f"DB Error in resolve_id: {e}")
-                    pass
-
+                if original_id in existing_members:
+                    return original_id
                 return None
 
-            for m in import_data.members:
-                new_region_ids = []
-                m_rids = []
-                if hasattr(m, "region_ids") and m.region_ids:
-                    m_rids = m.region_ids
-                elif hasattr(m, "region_id") and m.region_id:
-                    m_rids = [m.region_id]
-
-                for rid in m_rids:
-                    rid_strip = rid.strip() if rid else None
-                    if rid_strip and rid_strip in region_id_map:
-                        new_region_ids.append(region_id_map[rid_strip])
-
-                should_link = False
-                if m.family_id and source_family_id:
-                    if m.family_id != source_family_id:
-                        should_link = True
-                elif m.family_id is None:
-                    should_link = False
+            member_rows = []
+            member_region_rows = {}
+            position_rows = {}
+
+            def link_regions(member_id, region_ids):
+                for region_id in region_ids:
+                    member_region_rows[(member_id, region_id)] = {
+                        "member_id": member_id,
+                        "region_id": region_id,
+                    }
+
+            def add_position(member_id):
+                if member_id not in position_rows:
+                    position_rows[member_id] = {
+                        "id": generate_uuid(),
+                        "member_id": member_id,
+                        "family_id": db_family.id,
+                        "x": 0,
+                        "y": 0,
+                    }
+
+            with progress.timed("members"):
+                external = []
+                for m in import_data.members:
+                    progress.advance()
+                    new_region_ids = []
+                    m_rids = []
+                    if hasattr(m, "region_ids") and m.region_ids:
+                        m_rids = m.region_ids
+                    elif hasattr(m, "region_id") and m.region_id:
+                        m_rids = [m.region_id]
+
+                    for rid in m_rids:
+                        rid_strip = rid.strip() if rid else None
+                        if rid_strip and rid_strip in region_id_map:
+                            new_region_ids.append(region_id_map[rid_strip])
 
-                existing_member_id = None
-                if should_link:
-                    existing_member_id = resolve_id(m.original_id)
+                    should_link = False
+                    if m.family_id and source_family_id:
+                        if m.family_id != source_family_id:
+                            should_link = True
 
-                    if not existing_member_id:
-                        logger.info(
-                            f"External member {m.original_id} (Family: {m.family_id}) not found in DB. Skipping."
-                        )
+                    if should_link:
+                        external.append((m, new_region_ids))
                         continue
 
-                if existing_member_id:
-                    logger.info(
-                        f"Member exists and is EXTERNAL: {existing_member_id}. Linking..."
-                    )
-                    db_member = (
-                        db.query(models.Member)
-                        .filter(models.Member.id == existing_member_id)
-                        .first()
+                    member_id = generate_uuid()
+                    member_rows.append(
+                        {
+                            "id": member_id,
+                            "family_id": db_family.id,
+                            "name": m.name,
+                            "surname": m.surname,
+                            "gender": m.gender,
+                            "birth_date": m.birth_date,
+                            "death_date": m.death_date,
+                            "is_deceased": m.is_deceased,
+                            "is_fuzzy": m.is_fuzzy,
+                            "remark": m.remark,
+                            "birth_place": m.birth_place,
+                            "photo_url": m.photo_url,
+                            "sort_order": m.sort_order,
+                        }
                     )
-
-                    if db_member:
-                        regions_to_add = set()
-                        if new_region_ids:
-                            regions_from_ids = (
-                                db.query(models.Region)
-                                .filter(models.Region.id.in_(new_region_ids))
-                                .all()
-                            )
-                            for r in regions_from_ids:
-                                regions_to_add.add(r)
-
-                        if db_member.family_id:
-                            linked_regions = (
-                                db.query(models.Region)
-                                .filter(
-                                    models.Region.family_id == db_family.id,
-                                    models.Region.linked_family_id
-                                    == db_member.family_id,
-                                )
-                                .all()
-                            )
-
-                            for lr in linked_regions:
-                                regions_to_add.add(lr)
-                                logger.info(
-                                    f"Auto-linking member {db_member.id} to linked region {lr.id}"
-                                )
-
-                        if regions_to_add:
+                    link_regions(member_id, new_region_ids)
+                    add_position(member_id)
+                    id_map[m.original_id] = member_id
+
+                with progress.timed("external_members"):
+                    resolve_existing([m.original_id for m, _ in external])
+                    member_link_rows = len(member_region_rows) + len(position_rows)
+                    linked = 0
+                    for m, new_region_ids in external:
+                        if m.original_id not in existing_members:
                             logger.info(
-                                f"Updating regions for {existing_member_id}. Total regions to add: {len(regions_to_add)}"
-                            )
-                            updated = False
-                            for reg in regions_to_add:
-                                if reg not in db_member.regions:
-                                    db_member.regions.append(reg)
-                                    updated = True
-
-                            if updated:
-                                db.add(db_member)
-                                logger.info(f"Regions updated for {existing_member_id}")
-
-                        # Also create MemberPosition for this family context!
-                        # The linked member appears in this family's graph.
-                        pos = (
-                            db.query(models.MemberPosition)
-                            .filter(
-                                models.MemberPosition.member_id == existing_member_id,
-                                models.MemberPosition.family_id == db_family.id,
+                                f"External member {m.original_id} (Family: {m.family_id}) not found in DB. Skipping."
                             )
-                            .first()
+                            continue
+
+                        # The linked member appears in this family's graph, in
+                        # its regions and in those linked to its own family
+                        member_id = m.original_id
+                        link_regions(member_id, new_region_ids)
+                        link_regions(
+                            member_id,
+                            linked_region_ids.get(existing_members[member_id], []),
                         )
-
-                        if not pos:
-                            pos = models.MemberPosition(
-                                member_id=existing_member_id,
-                                family_id=db_family.id,
-                                x=0,
-                                y=0,
-                            )
-                            db.add(pos)
-
-                    id_map[m.original_id] = existing_member_id
-                    continue
-
-                member_data = schemas.MemberCreate(
-                    family_id=db_family.id,
-                    name=m.name,
-                    surname=m.surname,
-                    gender=m.gender,
-                    birth_date=m.birth_date,
-                    death_date=m.death_date,
-                    is_deceased=m.is_deceased,
-                    is_fuzzy=m.is_fuzzy,
-                    remark=m.remark,
-                    birth_place=m.birth_place,
-                    photo_url=m.photo_url,
-                    sort_order=m.sort_order,
-                    region_ids=new_region_ids,
-                ).model_dump()
-
-                r_ids = member_data.pop("region_ids", [])
-
-                db_member = models.Member(**member_data)
-
-                if r_ids:
-                    regions = (
-                        db.query(models.Region)
-                        .filter(models.Region.id.in_(r_ids))
-                        .all()
+                        add_position(member_id)
+                        id_map[m.original_id] = member_id
+                        linked += 1
+                    external_link_rows = (
+                        len(member_region_rows) + len(position_rows) - member_link_rows
                     )
-                    db_member.regions = regions
-
-                db.add(db_member)
-                db.flush()
-
-                # Create MemberPosition
-                db_pos = models.MemberPosition(
-                    member_id=db_member.id, family_id=db_family.id, x=0, y=0
-                )
-                db.add(db_pos)
-
-                id_map[m.original_id] = db_member.id
+                    progress.wrote("external_members", external_link_rows)
+                    logger.info(f"Linked {linked} external members")
+
+                if member_rows:
+                    table = models.Member.__table__
+                    db.execute(insert(table), fill_defaults(table, member_rows))
+                if member_region_rows:
+                    db.execute(
+                        insert(models.member_regions), list(member_region_rows.values())
+                    )
+                if position_rows:
+                    db.execute(
+                        insert(models.MemberPosition.__table__),
+                        list(position_rows.values()),
+                    )
+                progress.wrote("members", len(member_rows) + member_link_rows)
 
             logger.info(f"Processed {len(import_data.members)} members")
 
+            # Relationships may also reference members of other families that
+            # are not in the member list
+            resolve_existing(
+                [
+                    i
+                    for s in import_data.spouse_relationships or []
+                    for i in (s.member1_original_id, s.member2_original_id)
+                ]
+                + [
+                    i
+                    for pc in import_data.parent_child_relationships or []
+                    for i in (pc.parent_original_id, pc.child_original_id)
+                ]
+            )
+            existing_ids = list(existing_members)
+
             # 4. Create Spouse Relationships
-            for s in import_data.spouse_relationships or []:
-                a = resolve_id(s.member1_original_id)
-                b = resolve_id(s.member2_original_id)
-
-                if a and b:
-                    exists_rel = (
-                        db.query(models.SpouseRelationship)
-                        .filter(
-                            models.SpouseRelationship.member1_id == a,
-                            models.SpouseRelationship.member2_id == b,
+            with progress.timed("spouses"):
+                # Only members that were already in the database can already
+                # be married
+                spouse_pairs = set()
+                if existing_ids:
+                    spouse_pairs.update(
+                        frozenset(pair)
+                        for pair in db.query(
+                            models.SpouseRelationship.member1_id,
+                            models.SpouseRelationship.member2_id,
+                        ).filter(
+                            models.SpouseRelationship.member1_id.in_(existing_ids),
+                            models.SpouseRelationship.member2_id.in_(existing_ids),
                         )
-                        .first()
                     )
-
-                    if not exists_rel:
-                        exists_reverse = (
-                            db.query(models.SpouseRelationship)
-                            .filter(
-                                models.SpouseRelationship.member1_id == b,
-                                models.SpouseRelationship.member2_id == a,
-                            )
-                            .first()
-                        )
-
-                        if not exists_reverse:
-                            rel_data = schemas.SpouseRelationshipCreate(
-                                member1_id=a,
-                                member2_id=b,
-                                marriage_date=getattr(s, "marriage_date", None),
-                            ).model_dump()
-                            db_rel = models.SpouseRelationship(**rel_data)
-                            db.add(db_rel)
-                        else:
+                spouse_rows = []
+                for s in import_data.spouse_relationships or []:
+                    progress.advance()
+                    a = resolve_id(s.member1_original_id)
+                    b = resolve_id(s.member2_original_id)
+
+                    if a and b:
+                        if frozenset((a, b)) in spouse_pairs:
                             logger.info(
-                                f"Spouse relationship already exists (reverse): {b} <-> {a}"
+                                f"Spouse relationship already exists: {a} <-> {b}"
                             )
-                    else:
-                        logger.info(f"Spouse relationship already exists: {a} <-> {b}")
+                            continue
+                        spouse_pairs.add(frozenset((a, b)))
+                        spouse_rows.append(
+                            {
+                                "id": generate_uuid(),
+                                "member1_id": a,
+                                "member2_id": b,
+                                "marriage_date": getattr(s, "marriage_date", None),
+                            }
+                        )
+                if spouse_rows:
+                    db.execute(insert(models.SpouseRelationship.__table__), spouse_rows)
+                progress.wrote("spouses", len(spouse_rows))
 
             # 5. Create Parent-Child Relationships
-            for pc in import_data.parent_child_relationships or []:
-                p = resolve_id(pc.parent_original_id)
-                c = resolve_id(pc.child_original_id)
-
-                if p and c:
-                    exists_pc = (
-                        db.query(models.ParentChildRelationship)
-                        .filter(
-                            models.ParentChildRelationship.parent_id == p,
-                            models.ParentChildRelationship.child_id == c,
-                            models.ParentChildRelationship.relationship_type
-                            == pc.relationship_type,
+            with progress.timed("parent_child"):
+                parent_child_keys = set()
+                if existing_ids:
+                    parent_child_keys.update(
+                        tuple(key)
+                        for key in db.query(
+                            models.ParentChildRelationship.parent_id,
+                            models.ParentChildRelationship.child_id,
+                            models.ParentChildRelationship.relationship_type,
+                        ).filter(
+                            models.ParentChildRelationship.parent_id.in_(existing_ids),
+                            models.ParentChildRelationship.child_id.in_(existing_ids),
                         )
-                        .first()
                     )
-
-                    if not exists_pc:
-                        rel_data = schemas.ParentChildRelationshipCreate(
-                            parent_id=p,
-                            child_id=c,
-                            relationship_type=pc.relationship_type,
-                        ).model_dump()
-                        db_rel = models.ParentChildRelationship(**rel_data)
-                        db.add(db_rel)
-                    else:
-                        logger.info(
-                            f"Parent-Child relationship already exists: {p} -> {c}"
+                parent_child_rows = []
+                for pc in import_data.parent_child_relationships or []:
+                    progress.advance()
+                    p = resolve_id(pc.parent_original_id)
+                    c = resolve_id(pc.child_original_id)
+
+                    if p and c:
+                        key = (p, c, pc.relationship_type)
+                        if key in parent_child_keys:
+                            logger.info(
+                                f"Parent-Child relationship already exists: {p} -> {c}"
+                            )
+                            continue
+                        parent_child_keys.add(key)
+                        parent_child_rows.append(
+                            {
+                                "id": generate_uuid(),
+                                "parent_id": p,
+                                "child_id": c,
+                                "relationship_type": pc.relationship_type,
+                            }
                         )
-
-            db.flush()
-            logger.info("Import completed successfully")
-            return db_family
+                if parent_child_rows:
+                    db.execute(
+                        insert(models.ParentChildRelationship.__table__),
+                        parent_child_rows,
+                    )
+                progress.wrote("parent_child", len(parent_child_rows))
+
+            # A new graph, and new edges, region links and positions for the
+            # existing members it links to in their own families' graphs
+            bump_family_versions(db, [db_family.id], reset=True)
+            if existing_members:
+                changes = [
+                    ("member", member_id, "update") for member_id in existing_members
+                ]
+                changes += [
+                    ("spouse", row["id"], "create")
+                    for row in spouse_rows
+                    if row["member1_id"] in existing_members
+                    or row["member2_id"] in existing_members
+                ]
+                changes += [
+                    ("parent_child", row["id"], "create")
+                    for row in parent_child_rows
+                    if row["parent_id"] in existing_members
+                    or row["child_id"] in existing_members
+                ]
+                bump_family_versions(
+                    db, set(existing_members.values()), changes=changes
+                )
 
     except SQLAlchemyError as e:
+        progress.fail(e)
         logger.error(f"SQLAlchemyError in import_family: {e}")
         raise
     except Exception as e:
+        progress.fail(e)
         logger.error(f"Unexpected error in import_family: {e}")
         raise
+
+    progress.finish(db_family.id)
+    logger.info(
+        f"Import {progress.import_id} completed in "
+        f"{progress.report()['duration_ms']:.0f} ms: {progress.summary()}"
+    )
+    return db_family
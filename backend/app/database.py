@@ -1,9 +1,16 @@
 import os
+import threading
+import time
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 load_dotenv()
 
@@ -13,20 +20,367 @@ SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 if not SQLALCHEMY_DATABASE_URL:
     raise ValueError("DATABASE_URL is not set in environment variables.")
 
-connect_args = {}
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args)
+def get_connect_args(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return {"check_same_thread": False}
+    return {}
+
+
+connect_args = get_connect_args(SQLALCHEMY_DATABASE_URL)
+
+
+class PoolStats:
+    """Checkout counters for one connection pool."""
+
+    def __init__(self, max_overflow: int):
+        self._lock = threading.Lock()
+        # As configured, see get_pool_options
+        self.max_overflow = max_overflow
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                # SQLAlchemy counts overflow from -pool_size
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": self.max_overflow,
+                "timeout_seconds": pool.timeout(),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_total,
+                "wait_seconds_avg": self.wait_total / waits if waits else 0.0,
+                "wait_seconds_max": self.wait_max,
+            }
+
+
+class InstrumentedPoolMixin:
+    # Times every checkout: queue wait, overflow connects and pre-ping
+    stats: PoolStats
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep the counters
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def get_pool_options(url: str, poolclass) -> dict:
+    # Pool tuning from the environment; in-memory SQLite keeps its own pool
+    if make_url(url).database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "-1")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "false").lower() == "true",
+    }
+
+
+def instrument_pool(engine, pool_options: dict):
+    if isinstance(engine.pool, InstrumentedPoolMixin):
+        engine.pool.stats = PoolStats(pool_options["max_overflow"])
+    return engine
+
+
+pool_options = get_pool_options(SQLALCHEMY_DATABASE_URL, InstrumentedQueuePool)
+engine = instrument_pool(
+    create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args, **pool_options),
+    pool_options,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# SQLite production profile: WAL so position saves no longer block graph
+# reads, relaxed fsync, memory-mapped I/O and a larger page cache, plus a
+# separate read-only pool that serves GET requests.
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default").lower()
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # KiB if < 0
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+
+def get_sqlite_pragmas(read_only: bool = False) -> list[str]:
+    pragmas = [
+        f"mmap_size={SQLITE_MMAP_SIZE}",
+        f"cache_size={SQLITE_CACHE_SIZE}",
+        f"busy_timeout={SQLITE_BUSY_TIMEOUT}",
+    ]
+    if read_only:
+        return pragmas + ["query_only=ON"]
+    return ["journal_mode=WAL", "synchronous=NORMAL"] + pragmas
+
+
+def set_sqlite_pragmas(engine, pragmas):
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+
+def get_sqlite_read_only_url(url: str) -> str:
+    # Same file through a read-only SQLite URI
+    return f"sqlite:///file:{make_url(url).database}?mode=ro&uri=true"
+
+
+# Optional read replica. Replicas can lag, so only the routes depending on
+# get_read_db use it (with read-your-writes pinning); the local read-only
+# SQLite pool sees every commit and serves all GET requests.
+SQLALCHEMY_READ_DATABASE_URL = os.getenv("DATABASE_READ_URL")
+READ_POOL_SERVES_ALL_GETS = False
+
+if (
+    SQLITE_PROFILE == "production"
+    and make_url(SQLALCHEMY_DATABASE_URL).get_backend_name() == "sqlite"
+    and make_url(SQLALCHEMY_DATABASE_URL).database not in (None, "", ":memory:")
+):
+    set_sqlite_pragmas(engine, get_sqlite_pragmas())
+    if not SQLALCHEMY_READ_DATABASE_URL:
+        SQLALCHEMY_READ_DATABASE_URL = get_sqlite_read_only_url(SQLALCHEMY_DATABASE_URL)
+        READ_POOL_SERVES_ALL_GETS = True
+
+read_engine = None
+ReadSessionLocal = None
+if SQLALCHEMY_READ_DATABASE_URL:
+    read_pool_options = get_pool_options(
+        SQLALCHEMY_READ_DATABASE_URL, InstrumentedQueuePool
+    )
+    read_engine = instrument_pool(
+        create_engine(
+            SQLALCHEMY_READ_DATABASE_URL,
+            connect_args=get_connect_args(SQLALCHEMY_READ_DATABASE_URL),
+            **read_pool_options,
+        ),
+        read_pool_options,
+    )
+    if READ_POOL_SERVES_ALL_GETS:
+        set_sqlite_pragmas(read_engine, get_sqlite_pragmas(read_only=True))
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+
+class RecentWrites:
+    """Ids (families, members, users) written in the last `window` seconds.
+
+    Reads about them go to the primary until the replica has caught up.
+    Kept per process, like the graph cache.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._deadlines: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, ids):
+        if not self.window:
+            return
+        deadline = time.monotonic() + self.window
+        with self._lock:
+            for id in ids:
+                if id:
+                    self._deadlines[id] = deadline
+
+    def pinned(self, ids) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._deadlines) > 10000:
+                self._deadlines = {k: v for k, v in self._deadlines.items() if v > now}
+            return any(self._deadlines.get(id, 0) > now for id in ids)
+
+
+recent_writes = RecentWrites(float(os.getenv("READ_YOUR_WRITES_SECONDS", "5")))
 
-def get_db():
+
+def get_read_keys(request: Request) -> list[str]:
+    params = {**request.query_params, **request.path_params}
+    return [params[k] for k in ("family_id", "member_id", "user_id") if params.get(k)]
+
+
+def use_read_pool(request: Request) -> bool:
+    return not recent_writes.pinned(get_read_keys(request))
+
+
+def get_session_factory(method: str = "POST"):
+    if READ_POOL_SERVES_ALL_GETS and method in ("GET", "HEAD"):
+        return ReadSessionLocal
+    return SessionLocal
+
+
+def get_db(request: Request):
+    # GET requests use the read pool when one is configured
+    db = get_session_factory(request.method)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_primary_db():
+    # For the few GET routes that also write
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# Optional async mode for the hot read routes: AsyncSession over aiosqlite /
+# asyncpg / aiomysql. Writes and init_db keep using the sync engine.
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver for {url.get_backend_name()}")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+async_engine = None
+AsyncSessionLocal = None
+async_read_engine = None
+AsyncReadSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    SQLALCHEMY_ASYNC_DATABASE_URL = os.getenv(
+        "DATABASE_ASYNC_URL"
+    ) or get_async_database_url(SQLALCHEMY_DATABASE_URL)
+    async_pool_options = get_pool_options(
+        SQLALCHEMY_ASYNC_DATABASE_URL, InstrumentedAsyncQueuePool
+    )
+    async_engine = instrument_pool(
+        create_async_engine(SQLALCHEMY_ASYNC_DATABASE_URL, **async_pool_options),
+        async_pool_options,
+    )
+    if (
+        SQLITE_PROFILE == "production"
+        and async_engine.url.get_backend_name() == "sqlite"
+    ):
+        set_sqlite_pragmas(async_engine.sync_engine, get_sqlite_pragmas())
+    if read_engine is not None:
+        # The replica, or the read-only SQLite pool of the production profile
+        SQLALCHEMY_ASYNC_READ_DATABASE_URL = get_async_database_url(
+            SQLALCHEMY_READ_DATABASE_URL
+        )
+        async_read_pool_options = get_pool_options(
+            SQLALCHEMY_ASYNC_READ_DATABASE_URL, InstrumentedAsyncQueuePool
+        )
+        async_read_engine = instrument_pool(
+            create_async_engine(
+                SQLALCHEMY_ASYNC_READ_DATABASE_URL, **async_read_pool_options
+            ),
+            async_read_pool_options,
+        )
+        if READ_POOL_SERVES_ALL_GETS:
+            set_sqlite_pragmas(
+                async_read_engine.sync_engine, get_sqlite_pragmas(read_only=True)
+            )
+        AsyncReadSessionLocal = async_sessionmaker(
+            async_read_engine, autoflush=False, expire_on_commit=False
+        )
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_sync_read_db(request: Request):
+    factory = SessionLocal
+    if ReadSessionLocal is not None and use_read_pool(request):
+        factory = ReadSessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
         db.close()
+
+
+async def get_async_read_db(request: Request):
+    factory = AsyncSessionLocal
+    if AsyncReadSessionLocal is not None and use_read_pool(request):
+        factory = AsyncReadSessionLocal
+    async with factory() as db:
+        yield db
+
+
+# Session dependency for read routes: the read replica / read-only pool unless
+# the request is pinned to the primary by a recent write; an AsyncSession in
+# async mode. Run crud functions on it through run_crud.
+get_read_db = get_async_read_db if DB_ASYNC else get_sync_read_db
+
+
+async def run_crud(db, fn, *args, **kwargs):
+    # The sync crud functions serve both modes: on an AsyncSession they run
+    # via run_sync over the async driver without blocking the event loop, on
+    # a plain Session they run in the threadpool as sync routes do.
+    if DB_ASYNC:
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+def get_pool_stats() -> dict:
+    stats = {}
+    for name, pool in (
+        ("primary", engine.pool),
+        ("read", read_engine.pool if read_engine else None),
+        ("async", async_engine.sync_engine.pool if async_engine else None),
+        (
+            "async_read",
+            async_read_engine.sync_engine.pool if async_read_engine else None,
+        ),
+    ):
+        if isinstance(pool, InstrumentedPoolMixin):
+            stats[name] = pool.stats.snapshot(pool)
+        elif pool is not None:
+            stats[name] = {"status": pool.status()}
+    return stats
@@ -1,7 +1,22 @@
+import os
+import time
+
+from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine.url import make_url
 
-from .database import SQLALCHEMY_DATABASE_URL, Base, engine
+from .database import SQLALCHEMY_DATABASE_URL
+from .migrations import SCHEMA_VERSION, get_schema_version, upgrade
+
+load_dotenv()
+
+# migrate: create the database and apply pending migrations (default)
+# check: only warn when the schema is not current
+# skip: no database access at startup (run `python -m app.migrations` first)
+DB_INIT = os.getenv("DB_INIT", "migrate").lower()
+
+# Timings of the last startup, see GET /api/instrumentation/startup
+startup = {}
 
 
 def ensure_db_exists():
@@ -50,30 +65,34 @@ def ensure_db_exists():
             print(f"Warning: Automatic database creation failed: {e}")
 
 
-def init_db():
-    # 1. Ensure DB exists (for MySQL/PG)
-    ensure_db_exists()
-
-    # 2. Create Tables
-    # This is safe to call multiple times (checkfirst=True by default)
-    Base.metadata.create_all(bind=engine)
-    print("Database initialized.")
-
-    # 3. Simple Migration for linked_family_id
-    try:
-        with engine.connect() as conn:
-            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
-            try:
-                conn.execute(text("SELECT linked_family_id FROM regions LIMIT 1"))
-            except Exception:
-                print("Migrating: Adding linked_family_id to regions table...")
-                # SQLite and Postgres support ADD COLUMN
-                # Note: MySQL might require type length, using TEXT to be safe or VARCHAR(255)
-                # But here we use String equivalent.
-                conn.execute(
-                    text("ALTER TABLE regions ADD COLUMN linked_family_id VARCHAR(255)")
-                )
-                print("Migration successful.")
-    except Exception as e:
-        print(f"Migration check failed (ignorable if fresh db): {e}")
-        print(f"Migration check failed (ignorable if fresh db): {e}")
+def init_db(mode: str = DB_INIT):
+    # Workers started after `python -m app.migrations` can skip all of this
+    start = time.perf_counter()
+    startup["db_init"] = mode
+    if mode == "skip":
+        print("Database setup skipped (DB_INIT=skip).")
+        return
+
+    # One query when the schema is current
+    version = get_schema_version()
+    if version is None:
+        # 1. Ensure DB exists (for MySQL/PG)
+        ensure_db_exists()
+        version = get_schema_version()
+
+    if version == SCHEMA_VERSION:
+        print(f"Database schema is current (version {version}).")
+    elif mode == "check":
+        print(
+            f"Warning: database schema version {version} does not match "
+            f"{SCHEMA_VERSION}; run `python -m app.migrations`."
+        )
+    else:
+        # 2. Create tables / apply the migrations added since
+        upgrade(current=version)
+        print("Database initialized.")
+        version = max(version, SCHEMA_VERSION)
+
+    startup["schema_version"] = version
+    startup["db_setup_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    print(f"Database setup ({mode}) took {startup['db_setup_ms']} ms.")
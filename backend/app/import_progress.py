@@ -0,0 +1,146 @@
+"""Stage timings and live progress of family imports.
+
+crud.import_family reports into an ImportProgress: time spent and rows
+written per stage, and how many of the input items (regions, members,
+spouse and parent-child relationships) it has worked through. Imports
+started through the API are registered in `import_progress` under an id the
+client may choose, so the UI can poll GET /api/families/import/{id}?user_id=
+while the import request is still running; only the importing user can.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Stages in the order import_family runs them
+STAGES = (
+    "family",
+    "regions",
+    "members",
+    "external_members",
+    "spouses",
+    "parent_child",
+)
+
+# Finished imports kept for polling clients
+FINISHED_IMPORTS_KEPT = 50
+
+
+class ImportProgress:
+    def __init__(self, import_id: str | None = None, user_id: str | None = None):
+        self.import_id = import_id or str(uuid.uuid4())
+        self.user_id = user_id
+        self.status = "running"
+        self.error = None
+        self.family_id = None
+        self.started_at = datetime.now(timezone.utc)
+        self.finished_at = None
+        self.total = 0
+        self.processed = 0
+        self.stages = {name: {"duration_ms": 0.0, "rows": 0} for name in STAGES}
+        self._started = time.perf_counter()
+        self._duration = None
+        # [stage, start, time spent in nested stages]
+        self._stack = []
+
+    @property
+    def stage(self):
+        return self._stack[-1][0] if self._stack else None
+
+    def plan(self, items: int):
+        # Input items still to work through
+        self.total += items
+
+    @contextmanager
+    def timed(self, stage: str):
+        # Nested stages (external members inside members) are only counted
+        # once, in the inner stage
+        self._stack.append([stage, time.perf_counter(), 0.0])
+        try:
+            yield
+        finally:
+            stage, start, nested = self._stack.pop()
+            elapsed = time.perf_counter() - start
+            self.stages[stage]["duration_ms"] += (elapsed - nested) * 1000
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+    def wrote(self, stage: str, rows: int = 1):
+        self.stages[stage]["rows"] += rows
+
+    def advance(self, items: int = 1):
+        self.processed += items
+
+    def finish(self, family_id: str):
+        self.family_id = family_id
+        self.status = "completed"
+        self._done()
+
+    def fail(self, error: Exception):
+        self.error = str(error)
+        self.status = "failed"
+        self._done()
+
+    def _done(self):
+        self.finished_at = datetime.now(timezone.utc)
+        self._duration = time.perf_counter() - self._started
+
+    def report(self) -> dict:
+        duration = self._duration
+        if duration is None:
+            duration = time.perf_counter() - self._started
+        return {
+            "import_id": self.import_id,
+            "status": self.status,
+            "error": self.error,
+            "family_id": self.family_id,
+            "stage": self.stage,
+            "processed": self.processed,
+            "total": self.total,
+            "progress": self.processed / self.total if self.total else 1.0,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_ms": round(duration * 1000, 1),
+            "stages": [
+                {"stage": name, **stats, "duration_ms": round(stats["duration_ms"], 1)}
+                for name, stats in self.stages.items()
+            ],
+        }
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{name} {stats['duration_ms']:.0f} ms/{stats['rows']} rows"
+            for name, stats in self.stages.items()
+        )
+
+
+class ImportRegistry:
+    def __init__(self, keep: int):
+        self._imports = OrderedDict()
+        self._lock = threading.Lock()
+        self.keep = keep
+
+    def start(self, import_id: str | None, user_id: str | None) -> ImportProgress:
+        progress = ImportProgress(import_id, user_id)
+        with self._lock:
+            existing = self._imports.get(progress.import_id)
+            if existing is not None and existing.status == "running":
+                raise ValueError(f"Import {progress.import_id} is already running")
+            self._imports.pop(progress.import_id, None)
+            self._imports[progress.import_id] = progress
+            finished = [
+                key for key, p in self._imports.items() if p.status != "running"
+            ]
+            for key in finished[: max(0, len(finished) - self.keep)]:
+                del self._imports[key]
+        return progress
+
+    def get(self, import_id: str) -> ImportProgress | None:
+        with self._lock:
+            return self._imports.get(import_id)
+
+
+import_progress = ImportRegistry(FINISHED_IMPORTS_KEPT)
@@ -0,0 +1,187 @@
+"""Kinship path finding over an in-memory adjacency index.
+
+A KinshipIndex is built once per family graph version from the spouse and
+parent-child relationships and answers "how is A related to B" with a
+bidirectional breadth-first search, without touching the database per hop.
+"""
+
+from typing import Optional
+
+# How the next member on a path relates to the previous one
+PARENT = "parent"
+CHILD = "child"
+SPOUSE = "spouse"
+
+_INVERSE = {PARENT: CHILD, CHILD: PARENT, SPOUSE: SPOUSE}
+
+
+class KinshipIndex:
+    """Adjacency lists over dense integer member indexes."""
+
+    __slots__ = ("ids", "positions", "parents", "children", "spouses", "edge_count")
+
+    def __init__(self, member_ids, spouse_pairs, parent_child_pairs):
+        ids = sorted(set(member_ids))
+        positions = {member_id: i for i, member_id in enumerate(ids)}
+
+        def slot(member_id):
+            i = positions.get(member_id)
+            if i is None:
+                i = positions[member_id] = len(ids)
+                ids.append(member_id)
+                for lists in (parents, children, spouses):
+                    lists.append([])
+            return i
+
+        parents = [[] for _ in ids]
+        children = [[] for _ in ids]
+        spouses = [[] for _ in ids]
+        edge_count = 0
+        for a, b in spouse_pairs:
+            i, j = slot(a), slot(b)
+            spouses[i].append(j)
+            spouses[j].append(i)
+            edge_count += 1
+        for parent_id, child_id in parent_child_pairs:
+            p, c = slot(parent_id), slot(child_id)
+            parents[c].append(p)
+            children[p].append(c)
+            edge_count += 1
+
+        self.ids = ids
+        self.positions = positions
+        # Tuples keep the per-member lists compact once the index is built
+        self.parents = [tuple(sorted(set(x))) for x in parents]
+        self.children = [tuple(sorted(set(x))) for x in children]
+        self.spouses = [tuple(sorted(set(x))) for x in spouses]
+        self.edge_count = edge_count
+
+    def __contains__(self, member_id) -> bool:
+        return member_id in self.positions
+
+    @property
+    def approx_bytes(self) -> int:
+        # Rough footprint for cache accounting: ids, lookup entries, adjacency
+        return 200 * len(self.ids) + 16 * self.edge_count
+
+    def _neighbours(self, i):
+        for j in self.parents[i]:
+            yield j, PARENT
+        for j in self.spouses[i]:
+            yield j, SPOUSE
+        for j in self.children[i]:
+            yield j, CHILD
+
+    def shortest_path(self, source_id: str, target_id: str):
+        """Shortest path from source to target as [(member_id, relation)],
+        where relation says how each member relates to the previous one
+        (None for the source). Returns None when they are not connected."""
+        if source_id not in self.positions or target_id not in self.positions:
+            return None
+        source = self.positions[source_id]
+        target = self.positions[target_id]
+        if source == target:
+            return [(source_id, None)]
+
+        # node -> (linked node, relation along the source->target direction, depth)
+        forward = {source: (None, None, 0)}
+        backward = {target: (None, None, 0)}
+        forward_frontier = [source]
+        backward_frontier = [target]
+        meet = None
+        while forward_frontier and backward_frontier and meet is None:
+            # Always grow the smaller side; finish the whole level so the
+            # meeting point with the shortest total distance wins.
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meet = self._expand(
+                    forward_frontier, forward, backward, False
+                )
+            else:
+                backward_frontier, meet = self._expand(
+                    backward_frontier, backward, forward, True
+                )
+        if meet is None:
+            return None
+
+        path = []
+        node = meet
+        while node is not None:
+            prev, relation, _ = forward[node]
+            path.append((self.ids[node], relation))
+            node = prev
+        path.reverse()
+        node = meet
+        while True:
+            succ, relation, _ = backward[node]
+            if succ is None:
+                break
+            path.append((self.ids[succ], relation))
+            node = succ
+        return path
+
+    def _expand(self, frontier, seen, other, reverse):
+        next_frontier = []
+        best = None
+        best_depth = None
+        for u in frontier:
+            depth = seen[u][2] + 1
+            for v, relation in self._neighbours(u):
+                if v in seen:
+                    continue
+                if reverse:
+                    # Walking back from the target: v -> u is the inverse step
+                    relation = _INVERSE[relation]
+                seen[v] = (u, relation, depth)
+                next_frontier.append(v)
+                if v in other and (best_depth is None or other[v][2] < best_depth):
+                    best, best_depth = v, other[v][2]
+        return next_frontier, best
+
+
+def _ordinal(n: int) -> str:
+    return {1: "first", 2: "second", 3: "third"}.get(n, f"{n}th")
+
+
+def _times(n: int) -> str:
+    return {1: "once", 2: "twice"}.get(n, f"{n} times")
+
+
+def _blood_label(up: int, down: int) -> str:
+    if down == 0:
+        return "parent" if up == 1 else "great-" * (up - 2) + "grandparent"
+    if up == 0:
+        return "child" if down == 1 else "great-" * (down - 2) + "grandchild"
+    if up == 1 and down == 1:
+        return "sibling"
+    if down == 1:
+        return "great-" * (up - 2) + "aunt/uncle"
+    if up == 1:
+        return "great-" * (down - 2) + "niece/nephew"
+    label = f"{_ordinal(min(up, down) - 1)} cousin"
+    if up != down:
+        label += f" {_times(abs(up - down))} removed"
+    return label
+
+
+def describe(relations) -> Optional[str]:
+    """Describe a path (the relations after the source) as what the target
+    is to the source, e.g. "spouse's first cousin once removed"."""
+    relations = list(relations)
+    if not relations:
+        return "self"
+    parts = []
+    up = down = 0
+    for relation in relations:
+        if relation == SPOUSE or (relation == PARENT and down):
+            if up or down:
+                parts.append(_blood_label(up, down))
+            up = down = 0
+        if relation == SPOUSE:
+            parts.append("spouse")
+        elif relation == PARENT:
+            up += 1
+        else:
+            down += 1
+    if up or down:
+        parts.append(_blood_label(up, down))
+    return "'s ".join(parts)
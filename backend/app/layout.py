@@ -0,0 +1,468 @@
+"""Server-side port of the frontend RecursiveFamilyLayoutStrategy.
+
+Places every member of a family graph the way the canvas does: each person
+with their spouses on one row, children grouped by mother one generation
+below, sibling subtrees pushed apart and parents centred above their
+children, and disconnected families laid out left to right.
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+from functools import cmp_to_key
+from typing import Optional
+
+# Mirrors NormalLayoutStrategy / CompactLayoutStrategy and the node sizes in
+# frontend/src/config/constants.ts
+LAYOUT_PRESETS = {
+    "normal": {
+        "node_width": 256,
+        "node_height": 138,
+        "x_gap": 50,
+        "spouse_gap": 30,
+        "spouse_step": 100,
+        "y_gap": 50,
+    },
+    "compact": {
+        "node_width": 100,
+        "node_height": 300,
+        "x_gap": 40,
+        "spouse_gap": 20,
+        "spouse_step": 40,
+        "y_gap": 50,
+    },
+}
+
+_DATE_RE = re.compile(r"^(-?)(\d{1,6})(?:-(\d{1,2})(?:-(\d{1,2}))?)?")
+
+
+@dataclass
+class LayoutMember:
+    id: str
+    gender: str
+    sort_order: Optional[int] = None
+    birth_date: Optional[str] = None
+    created_at: str = ""
+    region_ids: list = field(default_factory=list)
+
+
+@dataclass
+class _GraphNode:
+    member: LayoutMember
+    # dicts keep insertion order, like the JS Sets they replace
+    spouses: dict = field(default_factory=dict)
+    children: dict = field(default_factory=dict)
+    parents: dict = field(default_factory=dict)
+
+
+def _date_key(value: str):
+    # yyyy-MM-dd or -yyyy-MM-dd (HistoricalDateInput); partial dates count
+    # from the start of the year/month, as JS Date parsing does.
+    match = _DATE_RE.match(value.strip())
+    if not match:
+        return None
+    sign, year, month, day = match.groups()
+    year = -int(year) if sign else int(year)
+    return (year, int(month or 1), int(day or 1))
+
+
+class RecursiveFamilyLayout:
+    def __init__(
+        self,
+        node_width: int,
+        node_height: int,
+        x_gap: int = 50,
+        spouse_gap: int = 30,
+        spouse_step: int = 100,
+        y_gap: int = 200,
+    ):
+        self.node_width = node_width
+        self.node_height = node_height
+        self.x_gap = x_gap
+        self.spouse_gap = spouse_gap
+        self.spouse_step = spouse_step
+        self.y_gap = y_gap
+
+    @classmethod
+    def from_preset(cls, name: str) -> "RecursiveFamilyLayout":
+        return cls(**LAYOUT_PRESETS[name])
+
+    def layout(self, members, spouses, parent_child) -> dict[str, tuple[int, int]]:
+        """Return {member_id: (x, y)}.
+
+        `spouses` are (member1_id, member2_id) pairs and `parent_child` are
+        (parent_id, child_id) pairs. Members the recursion never reaches (a
+        child linked only to a non-root mother) are left out, so callers keep
+        their stored position.
+        """
+        nodes_map = self._build_directed_graph(members, spouses, parent_child)
+        all_positions: dict[str, list[float]] = {}
+
+        def member_of(node_id):
+            node = nodes_map.get(node_id)
+            return node.member if node else None
+
+        def by_sibling(ids):
+            return sorted(
+                ids,
+                key=cmp_to_key(
+                    lambda a, b: self._compare_sibling(member_of(a), member_of(b))
+                ),
+            )
+
+        family_root_cache = []
+        for family_ids in self._split_family_components(nodes_map):
+            roots = self._compute_roots(family_ids, nodes_map)
+            family_root_cache.append((roots, family_ids))
+
+        # Group by region first to ensure families in the same region are clustered
+        families_by_region: dict[str, list] = {}
+        for item in family_root_cache:
+            roots = item[0]
+            root_member = member_of(roots[0]) if roots else None
+            region_id = (
+                root_member.region_ids[0]
+                if root_member and root_member.region_ids
+                else ""
+            )
+            families_by_region.setdefault(region_id, []).append(item)
+
+        def first_root_member(group):
+            roots = group[0][0] if group else []
+            return member_of(roots[0]) if roots else None
+
+        for region_id, group in families_by_region.items():
+            families_by_region[region_id] = sorted(
+                group,
+                key=cmp_to_key(
+                    lambda a, b: self._compare_sibling(
+                        first_root_member([a]), first_root_member([b])
+                    )
+                ),
+            )
+        sorted_region_keys = sorted(
+            families_by_region,
+            key=cmp_to_key(
+                lambda a, b: self._compare_sibling(
+                    first_root_member(families_by_region[a]),
+                    first_root_member(families_by_region[b]),
+                )
+            ),
+        )
+        family_root_cache = [
+            item for key in sorted_region_keys for item in families_by_region[key]
+        ]
+
+        # --- Layout each family ---
+        for roots, family_ids in family_root_cache:
+            x_map: dict[str, float] = {}
+            y_map: dict[str, float] = {}
+            cursor_by_depth: dict[int, float] = {}
+            children_order_by_parent: dict[str, list[str]] = {}
+
+            def place_at(node_id, depth, x):
+                x_map[node_id] = x
+                y_map[node_id] = depth * (self.node_height + self.y_gap)
+
+            def place_spouse_row(root_id, depth):
+                node = nodes_map.get(root_id)
+                spouse_order = by_sibling(node.spouses if node else [])
+
+                use_spouse_overlap = len(spouse_order) >= 2 and self.node_width > 250
+                normal_step = self.node_width + self.spouse_gap
+                step = self.spouse_step if use_spouse_overlap else normal_step
+
+                cur_x = cursor_by_depth.get(depth, 0)
+                place_at(root_id, depth, cur_x)
+                cur_x += normal_step
+                for spouse_id in spouse_order:
+                    place_at(spouse_id, depth, cur_x)
+                    cur_x += step
+
+                right_most = max(
+                    x_map.get(i, 0) + self.node_width for i in [root_id, *spouse_order]
+                )
+                cursor_by_depth[depth] = max(
+                    cursor_by_depth.get(depth, 0), right_most + self.x_gap
+                )
+                return spouse_order
+
+            def place_children_groups(parent_id, spouse_order, depth):
+                node = nodes_map.get(parent_id)
+                children = list(node.children) if node else []
+                spouse_index = {sp: idx for idx, sp in enumerate(spouse_order)}
+
+                def mother_key(child_id):
+                    # The mother must be a parent listed in the spouse row
+                    child = nodes_map.get(child_id)
+                    if not child:
+                        return None
+                    best_mother, best_idx = None, math.inf
+                    for parent in child.parents:
+                        if parent not in spouse_index:
+                            continue
+                        if member_of(parent).gender != "female":
+                            continue
+                        if spouse_index[parent] < best_idx:
+                            best_idx = spouse_index[parent]
+                            best_mother = parent
+                    return best_mother
+
+                groups: dict = {}
+                for child_id in children:
+                    key = mother_key(child_id)
+                    if key not in groups:
+                        # Children with a mother follow her order; the rest go last
+                        order = math.inf if key is None else spouse_index[key]
+                        groups[key] = (order, [])
+                    groups[key][1].append(child_id)
+
+                ordered_groups = [
+                    by_sibling(kids)
+                    for _, kids in sorted(groups.values(), key=lambda g: g[0])
+                ]
+
+                cur_x = cursor_by_depth.get(depth + 1, 0)
+                for kids in ordered_groups:
+                    for kid in kids:
+                        place_at(kid, depth + 1, cur_x)
+                        cur_x += self.node_width + self.x_gap
+                    # Keep a gap between mother groups
+                    cur_x += self.x_gap
+
+                cursor_by_depth[depth + 1] = max(
+                    cursor_by_depth.get(depth + 1, 0), cur_x
+                )
+                ordered_children = [kid for kids in ordered_groups for kid in kids]
+                children_order_by_parent[parent_id] = ordered_children
+                return ordered_children
+
+            visited = set()
+
+            def dfs(root_id, depth):
+                # Iterative pre-order walk; deep lineages would overflow the
+                # Python recursion limit.
+                stack = [(root_id, depth)]
+                while stack:
+                    node_id, d = stack.pop()
+                    if node_id in visited:
+                        continue
+                    visited.add(node_id)
+                    spouse_order = place_spouse_row(node_id, d)
+                    ordered_children = place_children_groups(node_id, spouse_order, d)
+                    stack.extend((c, d + 1) for c in reversed(ordered_children))
+
+            ordered_roots = by_sibling(roots)
+            for root_id in ordered_roots:
+                dfs(root_id, 0)
+
+            self._adjust_family_centering(
+                ordered_roots, children_order_by_parent, nodes_map, x_map, by_sibling
+            )
+
+            for node_id in family_ids:
+                if node_id in x_map and node_id in y_map:
+                    all_positions[node_id] = [x_map[node_id], y_map[node_id]]
+
+        # --- Offset families so they do not overlap ---
+        global_offset_x = 0
+        for _, family_ids in family_root_cache:
+            placed = [all_positions[i] for i in family_ids if i in all_positions]
+            min_x = min((p[0] for p in placed), default=0)
+            max_x = max((p[0] + self.node_width for p in placed), default=0)
+            dx = global_offset_x - min_x
+            for p in placed:
+                p[0] += dx
+            global_offset_x += (max_x - min_x) + self.x_gap * 4
+
+        return {
+            node_id: (round(x), round(y)) for node_id, (x, y) in all_positions.items()
+        }
+
+    def _adjust_family_centering(
+        self, ordered_roots, children_order_by_parent, nodes_map, x_map, by_sibling
+    ):
+        """Push overlapping sibling subtrees apart, pull gaps closed and centre
+        each parent row over its children (post-order)."""
+
+        def cluster_members(node_id):
+            node = nodes_map.get(node_id)
+            return by_sibling(dict.fromkeys([node_id, *(node.spouses if node else [])]))
+
+        def cluster_left_right(node_id):
+            xs = [x_map[m] for m in cluster_members(node_id) if m in x_map]
+            if not xs:
+                return (0, self.node_width)
+            return (min(xs), max(xs) + self.node_width)
+
+        def shift_cluster(node_id, dx):
+            if dx == 0:
+                return
+            for m in cluster_members(node_id):
+                if m in x_map:
+                    x_map[m] += dx
+
+        def shift_subtree(root_id, dx):
+            if dx == 0:
+                return
+            stack, seen = [root_id], set()
+            while stack:
+                cur = stack.pop()
+                if cur in seen:
+                    continue
+                seen.add(cur)
+                shift_cluster(cur, dx)
+                node = nodes_map.get(cur)
+                if node:
+                    stack.extend(node.children)
+
+        span: dict[str, tuple[float, float]] = {}
+        visiting = set()
+
+        def post(root_id):
+            # Iterative post-order: children spans first, then the parent.
+            stack = [(root_id, False)]
+            while stack:
+                node_id, expanded = stack.pop()
+                if not expanded:
+                    if node_id in span:
+                        continue
+                    if node_id in visiting:
+                        # Cycle guard: fall back to the row's own span
+                        span[node_id] = cluster_left_right(node_id)
+                        continue
+                    visiting.add(node_id)
+                    stack.append((node_id, True))
+                    kids = children_order_by_parent.get(node_id, [])
+                    stack.extend((c, False) for c in reversed(kids))
+                    continue
+                finish(node_id)
+                visiting.discard(node_id)
+
+        def finish(node_id):
+            kids = children_order_by_parent.get(node_id, [])
+            if not kids:
+                span[node_id] = cluster_left_right(node_id)
+                return
+
+            # (A) Sibling subtrees left to right: shift right on overlap
+            prev_right = None
+            for c in kids:
+                left, right = span.get(c) or cluster_left_right(c)
+                need_left = left if prev_right is None else prev_right + self.x_gap
+                if left < need_left:
+                    dx = need_left - left
+                    shift_subtree(c, dx)
+                    span[c] = (left + dx, right + dx)
+                prev_right = span.get(c, (left, right))[1]
+
+            # (A2) Pull gaps between sibling subtrees closed
+            prev_right = None
+            for c in kids:
+                left, right = span.get(c) or cluster_left_right(c)
+                target_left = left if prev_right is None else prev_right + self.x_gap
+                if left > target_left:
+                    dx = target_left - left
+                    shift_subtree(c, dx)
+                    span[c] = (left + dx, right + dx)
+                prev_right = span.get(c, (left, right))[1]
+
+            child_left = min(span[c][0] for c in kids if c in span)
+            child_right = max(span[c][1] for c in kids if c in span)
+            child_center = (child_left + child_right) / 2
+
+            # (B) Centre the parent row over all children
+            my_left, my_right = cluster_left_right(node_id)
+            shift_cluster(node_id, child_center - (my_left + my_right) / 2)
+
+            my_left, my_right = cluster_left_right(node_id)
+            span[node_id] = (min(my_left, child_left), max(my_right, child_right))
+
+        for root_id in ordered_roots:
+            post(root_id)
+
+    def _compare_sibling(self, m1: Optional[LayoutMember], m2: Optional[LayoutMember]):
+        if m1 is None or m2 is None:
+            if m1 is None and m2 is None:
+                return 0
+            return -1 if m2 is None else 1
+
+        s1 = math.inf if m1.sort_order is None else m1.sort_order
+        s2 = math.inf if m2.sort_order is None else m2.sort_order
+        if s1 > 0 and s2 > 0 and s1 != s2:
+            return -1 if s1 < s2 else 1
+
+        if m1.birth_date and m2.birth_date and m1.birth_date != m2.birth_date:
+            d1, d2 = _date_key(m1.birth_date), _date_key(m2.birth_date)
+            # Unparseable dates compare equal (NaN in the JS comparator)
+            if d1 is None or d2 is None or d1 == d2:
+                return 0
+            return -1 if d1 < d2 else 1
+
+        if m1.created_at != m2.created_at:
+            return -1 if m1.created_at < m2.created_at else 1
+        if m1.id != m2.id:
+            return -1 if m1.id < m2.id else 1
+        return 0
+
+    def _compute_roots(self, component_ids, nodes_map):
+        # 1. No parents and no spouse in family is root
+        # 2. No parents but has spouses in family, and his/her spouse has
+        #    parents, is not root
+        # 3. No parents but has spouses in family, and his/her spouse has no
+        #    parents, male is root female is not root
+        roots = []
+        for node_id in component_ids:
+            node = nodes_map.get(node_id)
+            if not node:
+                roots.append(node_id)
+                continue
+            if node.parents:
+                continue
+            if not node.spouses:
+                roots.append(node_id)
+                continue
+            if any(nodes_map[sp].parents for sp in node.spouses if sp in nodes_map):
+                continue
+            if node.member.gender == "male":
+                roots.append(node_id)
+        return roots
+
+    def _split_family_components(self, nodes_map):
+        adj: dict[str, dict] = {}
+        for node_id, node in nodes_map.items():
+            neighbors = adj.setdefault(node_id, {})
+            for other in [*node.spouses, *node.children, *node.parents]:
+                neighbors[other] = None
+                adj.setdefault(other, {})[node_id] = None
+
+        components = []
+        visited = set()
+        for start_id in nodes_map:
+            if start_id in visited:
+                continue
+            stack = [start_id]
+            component = []
+            visited.add(start_id)
+            while stack:
+                cur = stack.pop()
+                component.append(cur)
+                for neighbor in adj.get(cur, {}):
+                    if neighbor in visited:
+                        continue
+                    visited.add(neighbor)
+                    stack.append(neighbor)
+            components.append(component)
+        return components
+
+    def _build_directed_graph(self, members, spouses, parent_child):
+        nodes_map = {m.id: _GraphNode(member=m) for m in members}
+        for a, b in spouses:
+            if a in nodes_map and b in nodes_map:
+                nodes_map[a].spouses[b] = None
+                nodes_map[b].spouses[a] = None
+        for parent, child in parent_child:
+            if parent in nodes_map and child in nodes_map:
+                nodes_map[parent].children[child] = None
+                nodes_map[child].parents[parent] = None
+        return nodes_map
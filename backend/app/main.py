@@ -1,13 +1,35 @@
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from .db_init import init_db
-from .routers import families, members, regions, relationships, users
+from .compression import COMPRESSION_ENABLED, CompressionMiddleware, no_compression
+from .database import get_pool_stats
+from .db_init import init_db, startup
+from .metrics import (
+    METRICS_ENABLED,
+    MetricsMiddleware,
+    get_pool_metrics,
+    render_metrics,
+)
+from .profiling import PROFILING_ENABLED, ProfilingMiddleware
+from .query_budget import QUERY_BUDGET_ENABLED, QueryBudgetMiddleware
+from .responses import DefaultResponse
+from .routers import (
+    families,
+    instrumentation,
+    members,
+    regions,
+    relationships,
+    users,
+)
+
+started = time.perf_counter()
 
-# Initialize database (create DB if not exists, create tables)
+# Initialize database (create DB if not exists, apply migrations), see DB_INIT
 init_db()
 
-app = FastAPI(title="Family Tree API")
+app = FastAPI(title="Family Tree API", default_response_class=DefaultResponse)
 
 # CORS
 origins = [
@@ -21,15 +43,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read the graph version and the next page cursor
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+# gzip / brotli for graph and listing payloads, see app.compression
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Per-request cProfile runs on demand, see app.profiling
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Logs (or in strict mode fails) requests issuing too many statements
+if QUERY_BUDGET_ENABLED:
+    app.add_middleware(QueryBudgetMiddleware)
+
+# Outermost, so latency and sizes are what clients see
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(members.router)
 app.include_router(relationships.router)
 app.include_router(families.router)
 app.include_router(users.router)
 app.include_router(regions.router)
+app.include_router(instrumentation.router)
+
+startup["app_setup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+print(f"App ready in {startup['app_setup_ms']} ms.")
 
 
 @app.get("/")
+@no_compression
 def read_root():
     return {"message": "Welcome to Family Tree API"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    body = render_metrics(get_pool_metrics(get_pool_stats()))
+    return Response(content=body, media_type="text/plain; version=0.0.4")
@@ -0,0 +1,265 @@
+"""Prometheus-style request and SQL metrics.
+
+MetricsMiddleware times every HTTP request per route template and keeps the
+SQL statements issued while serving it, counted through SQLAlchemy engine
+events. render_metrics() produces the text exposition format for /metrics.
+"""
+
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+load_dotenv()
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra="") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.extend(self._render_sample(labels, value))
+        return lines
+
+    def _render_sample(self, labels, value) -> list[str]:
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, labels, value):
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # per-bucket counts, sum, count
+                state = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def _render_sample(self, labels, state) -> list[str]:
+        counts, total, count = state
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            le = _labels(self.labelnames, labels, f'le="{_number(bound)}"')
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+        suffix = _labels(self.labelnames, labels)
+        lines.append(f"{self.name}_sum{suffix} {_number(total)}")
+        lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+ROUTE_LABELS = ("method", "route")
+
+requests_total = Counter(
+    "http_requests_total", "HTTP requests served.", ROUTE_LABELS + ("status",)
+)
+request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ROUTE_LABELS
+)
+response_size = Histogram(
+    "http_response_size_bytes",
+    "HTTP response body size as sent.",
+    ROUTE_LABELS,
+    SIZE_BUCKETS,
+)
+requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests being served.")
+request_sql_statements = Histogram(
+    "http_request_sql_statements",
+    "SQL statements executed per HTTP request.",
+    ROUTE_LABELS,
+    STATEMENT_BUCKETS,
+)
+request_sql_duration = Histogram(
+    "http_request_sql_seconds", "SQL time per HTTP request.", ROUTE_LABELS
+)
+sql_statements_total = Counter("db_sql_statements_total", "SQL statements executed.")
+sql_seconds_total = Counter("db_sql_seconds_total", "Time spent executing SQL.")
+
+REGISTRY = [
+    requests_total,
+    request_duration,
+    response_size,
+    requests_in_flight,
+    request_sql_statements,
+    request_sql_duration,
+    sql_statements_total,
+    sql_seconds_total,
+]
+
+
+class RequestStats:
+    """SQL activity of the request being served (see current_request)."""
+
+    __slots__ = ("statements", "sql_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.sql_seconds = 0.0
+
+
+# Set by MetricsMiddleware; sync handlers see it through the threadpool's
+# copied context, async-mode sessions through the greenlet.
+current_request: ContextVar = ContextVar("current_request", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    sql_statements_total.inc()
+    sql_seconds_total.inc(amount=elapsed)
+    stats = current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.sql_seconds += elapsed
+
+
+def _handle_error(context):
+    # No after_cursor_execute for a failed statement
+    starts = context.connection.info.get("query_start") if context.connection else None
+    if starts:
+        starts.pop()
+
+
+# Without metrics, statements are not timed at all
+if METRICS_ENABLED:
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+def get_route_label(scope: Scope) -> str:
+    # Route templates keep label cardinality bounded
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            elapsed = time.perf_counter() - start
+            requests_in_flight.dec()
+            current_request.reset(token)
+            labels = (scope["method"], get_route_label(scope))
+            requests_total.inc(labels + (str(status),))
+            request_duration.observe(labels, elapsed)
+            response_size.observe(labels, size)
+            request_sql_statements.observe(labels, stats.statements)
+            request_sql_duration.observe(labels, stats.sql_seconds)
+
+
+def get_pool_metrics(pool_stats: dict) -> list[Metric]:
+    # Point-in-time pool figures, see database.get_pool_stats
+    fields = {
+        "checked_out": Gauge("db_pool_checked_out", "Connections in use.", ["pool"]),
+        "overflow": Gauge("db_pool_overflow", "Overflow connections open.", ["pool"]),
+        "checkouts": Counter("db_pool_checkouts_total", "Pool checkouts.", ["pool"]),
+        "timeouts": Counter(
+            "db_pool_timeouts_total", "Pool checkout timeouts.", ["pool"]
+        ),
+        "wait_seconds_total": Counter(
+            "db_pool_wait_seconds_total", "Time spent waiting for checkouts.", ["pool"]
+        ),
+    }
+    for pool, stats in pool_stats.items():
+        for field, metric in fields.items():
+            if field in stats:
+                metric.inc((pool,), stats[field])
+    return list(fields.values())
+
+
+def render_metrics(extra=()) -> str:
+    lines = []
+    for metric in list(REGISTRY) + list(extra):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,214 @@
+"""Versioned schema migrations.
+
+The schema version lives in the one-row `schema_version` table. Upgrading
+runs every migration above the recorded version in order, each in its own
+transaction together with the version bump; when the database is already at
+SCHEMA_VERSION nothing is introspected. Databases created before versioning
+start at 0: the migrations below are written to also bring those up to date.
+
+To change the schema, append a migration with the next version number.
+
+Run from backend/:  python -m app.migrations [upgrade|current]
+"""
+
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlalchemy import Column, Integer, MetaData, Table, inspect, select, text
+from sqlalchemy.exc import DBAPIError
+
+from . import models
+from .database import Base, engine
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, nullable=False),
+)
+
+
+@dataclass
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable
+
+
+def create_tables(conn):
+    # Tables (and their indexes) that don't exist yet, as currently modelled
+    Base.metadata.create_all(bind=conn)
+
+
+def add_column(table: str, column: str, ddl: str, then: str | None = None):
+    # Fresh databases already have the column from create_tables
+    def upgrade(conn):
+        if column in {c["name"] for c in inspect(conn).get_columns(table)}:
+            return
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        if then:
+            conn.execute(text(then))
+
+    return upgrade
+
+
+def create_indexes(table):
+    # create_all only indexes the tables it creates
+    def upgrade(conn):
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+    return upgrade
+
+
+def drop_index(table: str, name: str):
+    # Fresh databases never had the index
+    def upgrade(conn):
+        reflected = Table(table, MetaData(), autoload_with=conn)
+        for index in reflected.indexes:
+            if index.name == name:
+                index.drop(bind=conn)
+
+    return upgrade
+
+
+def run_all(*steps):
+    def upgrade(conn):
+        for step in steps:
+            step(conn)
+
+    return upgrade
+
+
+def recreate_change_log(conn):
+    # Replaces graph_changes with the current definition. The log only serves
+    # delta sync, so it is dropped rather than copied: clients older than the
+    # new floor reload the full graph once.
+    table = models.GraphChange.__table__
+    table.drop(bind=conn, checkfirst=True)
+    table.create(bind=conn)
+    conn.execute(text("UPDATE families SET change_log_floor = version"))
+
+
+MIGRATIONS = [
+    Migration(1, "Create tables", create_tables),
+    Migration(
+        2,
+        "Add regions.linked_family_id",
+        add_column("regions", "linked_family_id", "VARCHAR(255)"),
+    ),
+    Migration(
+        3,
+        "Add families.version",
+        add_column("families", "version", "INTEGER NOT NULL DEFAULT 0"),
+    ),
+    Migration(
+        4,
+        "Add families.change_log_floor",
+        add_column(
+            "families",
+            "change_log_floor",
+            "INTEGER NOT NULL DEFAULT 0",
+            # Changes made before the log existed cannot be replayed
+            then="UPDATE families SET change_log_floor = version",
+        ),
+    ),
+    Migration(
+        5,
+        "Add member keyset pagination index",
+        create_indexes(models.Member.__table__),
+    ),
+    Migration(
+        6,
+        "Order keyset pagination by creation time",
+        run_all(
+            drop_index("members", "ix_members_family_id_id"),
+            create_indexes(models.Member.__table__),
+            create_indexes(models.Family.__table__),
+            create_indexes(models.User.__table__),
+        ),
+    ),
+    Migration(
+        7,
+        "Delete graph_changes with their family",
+        recreate_change_log,
+    ),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def get_schema_version(bind=engine):
+    """Recorded version, 0 for a database without the version table, or
+    None when the database cannot be reached."""
+    try:
+        with bind.connect() as conn:
+            return conn.execute(select(schema_version.c.version)).scalar() or 0
+    except DBAPIError as e:
+        if inspect_has_table(bind, schema_version.name) is False:
+            return 0
+        print(f"Schema version check failed: {e}")
+        return None
+
+
+def inspect_has_table(bind, name: str):
+    try:
+        with bind.connect() as conn:
+            return inspect(conn).has_table(name)
+    except DBAPIError:
+        return None
+
+
+def set_schema_version(conn, version: int):
+    schema_version.create(bind=conn, checkfirst=True)
+    if conn.execute(schema_version.update().values(version=version)).rowcount == 0:
+        conn.execute(schema_version.insert().values(version=version))
+
+
+def upgrade(bind=engine, current: int | None = None) -> list[int]:
+    """Apply pending migrations; returns the versions applied."""
+    if current is None:
+        current = get_schema_version(bind)
+    if current is None:
+        raise RuntimeError("Database is not reachable")
+    if current > SCHEMA_VERSION:
+        print(
+            f"Database schema version {current} is newer than this code "
+            f"({SCHEMA_VERSION}); not migrating."
+        )
+        return []
+
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.version <= current:
+            continue
+        start = time.perf_counter()
+        with bind.begin() as conn:
+            migration.upgrade(conn)
+            set_schema_version(conn, migration.version)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(
+            f"Migrated to schema version {migration.version}: "
+            f"{migration.description} ({elapsed:.1f} ms)"
+        )
+        applied.append(migration.version)
+    return applied
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+    if command == "current":
+        print(f"database: {get_schema_version()}, code: {SCHEMA_VERSION}")
+    elif command == "upgrade":
+        from .db_init import ensure_db_exists
+
+        ensure_db_exists()
+        applied = upgrade()
+        print(f"Schema at version {SCHEMA_VERSION} ({len(applied)} applied)")
+    else:
+        sys.exit(f"Unknown command {command!r}, expected upgrade or current")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,14 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Table,
     Text,
     UniqueConstraint,
 )
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -21,6 +23,18 @@ def generate_uuid():
     return str(uuid.uuid4())
 
 
+# Creation time of rows listed with keyset pagination. SQLite compares the
+# stored text, so bound values are written in the CURRENT_TIMESTAMP format of
+# the server default rather than SQLAlchemy's default with microseconds.
+CreatedAt = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d "
+        "%(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite",
+)
+
+
 # Association table for Member <-> Region
 member_regions = Table(
     "member_regions",
@@ -38,7 +52,7 @@ class User(Base):
     password_hash = Column(String, nullable=False)
     name = Column(String, nullable=False)
     is_superuser = Column(Boolean, default=False, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(CreatedAt, server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True), onupdate=func.now(), server_default=func.now()
     )
@@ -49,6 +63,9 @@ class User(Base):
         "AccessRequest", back_populates="user", cascade="all, delete-orphan"
     )
 
+    # Serves listings in creation order (keyset pagination)
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
+
 
 class FamilyCollaborator(Base):
     __tablename__ = "family_collaborators"
@@ -89,7 +106,11 @@ class Family(Base):
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     family_name = Column(String, nullable=False)
     description = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped by every write that changes what the family graph shows
+    version = Column(Integer, default=0, server_default="0", nullable=False)
+    # Versions up to this one have been compacted out of graph_changes
+    change_log_floor = Column(Integer, default=0, server_default="0", nullable=False)
+    created_at = Column(CreatedAt, server_default=func.now())
 
     owner = relationship("User", back_populates="families")
     collaborators = relationship(
@@ -105,6 +126,9 @@ class Family(Base):
         "Region", back_populates="family", cascade="all, delete-orphan"
     )
 
+    # Serves listings in creation order (keyset pagination)
+    __table_args__ = (Index("ix_families_created_at_id", "created_at", "id"),)
+
 
 class Region(Base):
     __tablename__ = "regions"
@@ -139,7 +163,7 @@ class Member(Base):
     photo_url = Column(String, nullable=True)
     # position_x and position_y moved to MemberPosition table
     sort_order = Column(Integer, default=0)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(CreatedAt, server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True), onupdate=func.now(), server_default=func.now()
     )
@@ -180,6 +204,11 @@ class Member(Base):
         cascade="all, delete-orphan",
     )
 
+    # Serves family-scoped listings in creation order (keyset pagination)
+    __table_args__ = (
+        Index("ix_members_family_id_created_at_id", "family_id", "created_at", "id"),
+    )
+
 
 class SpouseRelationship(Base):
     __tablename__ = "spouse_relationships"
@@ -246,3 +275,26 @@ class MemberPosition(Base):
             "member_id", "family_id", name="unique_member_position_per_family"
         ),
     )
+
+
+class GraphChange(Base):
+    """One entry of a family's graph change log, written alongside the
+    version bump that produced it."""
+
+    __tablename__ = "graph_changes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    family_id = Column(
+        String, ForeignKey("families.id", ondelete="CASCADE"), nullable=False
+    )
+    version = Column(Integer, nullable=False)
+    # 'member', 'position', 'spouse', 'parent_child', 'region'
+    entity_type = Column(String, nullable=False)
+    entity_id = Column(String, nullable=False)
+    op = Column(String, nullable=False)  # 'create', 'update', 'delete'
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_graph_changes_family_id_version", "family_id", "version"),
+        Index("ix_graph_changes_created_at", "created_at"),
+    )
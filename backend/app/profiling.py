@@ -0,0 +1,152 @@
+"""On-demand profiling of single requests.
+
+With PROFILING_ENABLED=true a request is profiled when it carries the
+PROFILE_HEADER header with the id of a superuser, or when it is picked by
+PROFILE_SAMPLE_RATE. It runs under cProfile and the profile is written to
+PROFILE_DIR as a pstats file named after the route and the family_id (from
+the path, query string or JSON body); open it with `python -m pstats` or
+snakeviz. The response names the file in an X-Profile-File header.
+
+Since Python 3.12 cProfile is process wide: it sees every thread, so the
+threadpool work of sync routes and run_crud is included, and so is whatever
+else the worker does meanwhile. Only one request is profiled at a time;
+others asking for a profile while one runs are served unprofiled.
+"""
+
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+# Share of all requests profiled without the header (0 to disable)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+# Header carrying a superuser id to profile one request on demand
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "X-Profile")
+# Request bodies up to this size are searched for a family_id
+PROFILE_BODY_PEEK_BYTES = 64 * 1024
+
+# cProfile allows one active profiler per process
+_profiling = threading.Lock()
+
+
+def is_superuser(user_id: str) -> bool:
+    # Imported here: the routers pull in the whole app
+    from . import crud
+    from .database import SessionLocal
+    from .routers.users import get_superuser_ids
+
+    with SessionLocal() as db:
+        user = crud.get_user(db, user_id)
+        return user is not None and (
+            user.is_superuser or user.id in get_superuser_ids()
+        )
+
+
+def get_family_id(scope: Scope, body: bytes):
+    family_id = scope.get("path_params", {}).get("family_id")
+    if not family_id:
+        family_id = QueryParams(scope.get("query_string", b"")).get("family_id")
+    if not family_id and body:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and isinstance(data.get("family_id"), str):
+            family_id = data["family_id"]
+    return family_id
+
+
+def get_profile_path(directory: str, scope: Scope, family_id) -> str:
+    # The route template is known once routing is done
+    route = getattr(scope.get("route"), "path", None) or scope["path"]
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    family_id = re.sub(r"[^A-Za-z0-9-]+", "_", family_id or "none")
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    millis = int(time.time() * 1000) % 1000
+    name = f"{stamp}{millis:03d}-{scope['method']}-{slug}-{family_id}"
+    return os.path.join(directory, name + ".prof")
+
+
+class ProfilingMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        directory: str = PROFILE_DIR,
+        sample_rate: float = PROFILE_SAMPLE_RATE,
+        header: str = PROFILE_HEADER,
+    ) -> None:
+        self.app = app
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.header = header.lower()
+
+    async def should_profile(self, scope: Scope) -> bool:
+        user_id = Headers(scope=scope).get(self.header)
+        if user_id:
+            if await run_in_threadpool(is_superuser, user_id):
+                return True
+            logger.warning(f"Ignoring {self.header} header of non-superuser {user_id}")
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not await self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        if not _profiling.acquire(blocking=False):
+            logger.info(f"Profiler busy, not profiling {scope['path']}")
+            await self.app(scope, receive, send)
+            return
+
+        body = bytearray()
+        path = None
+
+        async def receive_with_peek() -> Message:
+            message = await receive()
+            if (
+                message["type"] == "http.request"
+                and len(body) <= PROFILE_BODY_PEEK_BYTES
+            ):
+                body.extend(message.get("body", b""))
+            return message
+
+        def get_path() -> str:
+            peeked = bytes(body) if len(body) <= PROFILE_BODY_PEEK_BYTES else b""
+            family_id = get_family_id(scope, peeked)
+            return get_profile_path(self.directory, scope, family_id)
+
+        async def send_with_path(message: Message) -> None:
+            nonlocal path
+            if message["type"] == "http.response.start":
+                path = get_path()
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Profile-File", os.path.basename(path))
+            await send(message)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                await self.app(scope, receive_with_peek, send_with_path)
+            finally:
+                profiler.disable()
+        finally:
+            _profiling.release()
+            path = path or get_path()
+            os.makedirs(self.directory, exist_ok=True)
+            profiler.dump_stats(path)
+            logger.info(f"Request profile written to {path}")
@@ -0,0 +1,153 @@
+"""Per-request SQL statement budgets (N+1 detection).
+
+QueryBudgetMiddleware counts the statements each HTTP request issues and
+logs the request when it goes over the statement budget or repeats one
+statement shape too often, listing the repeated fingerprints. In strict mode
+the request raises QueryBudgetExceeded instead, which fails tests.
+"""
+
+import logging
+import os
+import re
+from collections import Counter
+from contextvars import ContextVar
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Off by default like slow queries and profiling; the test suite turns it on
+QUERY_BUDGET_ENABLED = os.getenv("QUERY_BUDGET_ENABLED", "false").lower() == "true"
+# Statements per request; empty disables the check
+QUERY_BUDGET_MAX_QUERIES = os.getenv("QUERY_BUDGET_MAX_QUERIES", "50")
+QUERY_BUDGET_MAX_QUERIES = (
+    int(QUERY_BUDGET_MAX_QUERIES) if QUERY_BUDGET_MAX_QUERIES else None
+)
+# Executions of one statement fingerprint per request (a loop issuing queries)
+QUERY_BUDGET_MAX_REPEATS = os.getenv("QUERY_BUDGET_MAX_REPEATS", "10")
+QUERY_BUDGET_MAX_REPEATS = (
+    int(QUERY_BUDGET_MAX_REPEATS) if QUERY_BUDGET_MAX_REPEATS else None
+)
+# Raise instead of logging, for test runs
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"
+# Fingerprints listed per offending request
+QUERY_BUDGET_REPORT_TOP = 5
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\bIN \([^()]*\)", re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(
+    max_queries: int | None = QUERY_BUDGET_MAX_QUERIES,
+    max_repeats: int | None = QUERY_BUDGET_MAX_REPEATS,
+):
+    """Per-route budget (apply below @router.get); None lifts a limit."""
+
+    def decorator(endpoint):
+        endpoint.query_budget = (max_queries, max_repeats)
+        return endpoint
+
+    return decorator
+
+
+def fingerprint(statement: str) -> str:
+    # Same shape regardless of literals and the length of expanded IN lists
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    return _IN_LIST.sub("IN (...)", statement)
+
+
+# Raw statement text -> executions for the request being served. Compiled
+# statements are cached, so counting the text is cheap; fingerprints are only
+# computed for requests that go over budget.
+current_statements: ContextVar = ContextVar("current_statements", default=None)
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    statements = current_statements.get()
+    if statements is not None:
+        statements[statement] += 1
+
+
+if QUERY_BUDGET_ENABLED:
+    event.listen(Engine, "after_cursor_execute", _count_statement)
+
+
+def get_repeated(statements: Counter) -> list[tuple[str, int]]:
+    repeated = Counter()
+    for statement, count in statements.items():
+        repeated[fingerprint(statement)] += count
+    return repeated.most_common()
+
+
+def check_budget(statements: Counter, max_queries: int | None, max_repeats: int | None):
+    # Problems found, or an empty list when the request stayed in budget
+    problems = []
+    total = sum(statements.values())
+    if max_queries is not None and total > max_queries:
+        problems.append(f"{total} statements (budget {max_queries})")
+    if max_repeats is not None and statements:
+        repeated = get_repeated(statements)
+        if repeated[0][1] > max_repeats:
+            problems.append(
+                f"statement repeated {repeated[0][1]} times (budget {max_repeats})"
+            )
+    return problems
+
+
+class QueryBudgetMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_queries: int | None = QUERY_BUDGET_MAX_QUERIES,
+        max_repeats: int | None = QUERY_BUDGET_MAX_REPEATS,
+        strict: bool = QUERY_BUDGET_STRICT,
+    ) -> None:
+        self.app = app
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.strict = strict
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        statements = Counter()
+        token = current_statements.set(statements)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_statements.reset(token)
+
+        # The router stores the matched endpoint in the (shared) scope
+        max_queries, max_repeats = getattr(
+            scope.get("endpoint"),
+            "query_budget",
+            (self.max_queries, self.max_repeats),
+        )
+        problems = check_budget(statements, max_queries, max_repeats)
+        if not problems:
+            return
+
+        route = getattr(scope.get("route"), "path", None) or scope["path"]
+        top = "\n".join(
+            f"  {count}x {statement}"
+            for statement, count in get_repeated(statements)[:QUERY_BUDGET_REPORT_TOP]
+        )
+        message = f"{scope['method']} {route}: {', '.join(problems)}\n{top}"
+        if self.strict:
+            raise QueryBudgetExceeded(message)
+        logger.warning(f"Query budget exceeded: {message}")
@@ -0,0 +1,47 @@
+import os
+from typing import Any
+
+from dotenv import load_dotenv
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional: only speeds up FastJSONResponse.render
+    orjson = None
+
+load_dotenv()
+
+# "fast" (default): serialize hot payloads straight to JSON bytes and render
+# everything else with FastJSONResponse. "standard": FastAPI's stock
+# validate -> jsonable_encoder -> json.dumps path.
+FAST_JSON = os.getenv("JSON_RESPONSE", "fast").lower() != "standard"
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode()
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return super().render(content)
+
+
+# Application-wide default, see app.main
+DefaultResponse = FastJSONResponse if FAST_JSON else JSONResponse
+
+
+def json_response(value, adapter: TypeAdapter, response: Response = None):
+    # Fast path for large payloads: one validation (a no-op for model
+    # instances) and a direct dump to bytes in pydantic-core, instead of
+    # FastAPI re-validating, building a dict tree and encoding it again.
+    # Headers set on the injected `response` are carried over.
+    if not FAST_JSON:
+        return value
+    body = adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers=dict(response.headers) if response is not None else None,
+    )
@@ -1,10 +1,16 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
 from .. import crud, schemas
-from ..database import get_db
+from ..cache import layout_cache
+from ..database import get_db, get_read_db, run_crud
+from ..import_progress import import_progress
+from ..layout import LAYOUT_PRESETS
+from ..query_budget import query_budget
+from ..responses import json_response
 
 router = APIRouter(
     prefix="/api/families",
@@ -12,22 +18,47 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+family_list_adapter = TypeAdapter(List[schemas.FamilyWithRole])
+
 
 @router.post("/", response_model=schemas.Family)
 def create_family(family: schemas.FamilyCreate, db: Session = Depends(get_db)):
     return crud.create_family(db=db, family=family)
 
 
-@router.post("/import", response_model=schemas.Family)
+# Bulk inserts may repeat one INSERT per batch of rows
+@router.post("/import", response_model=schemas.FamilyImportResult)
+@query_budget(max_repeats=None)
 def import_family(
     family_import: schemas.FamilyImport,
     user_id: str = None,
+    import_id: str = None,
+    report: bool = False,
     db: Session = Depends(get_db),
 ):
     # If user_id is provided via query param (or in future via auth token), override the JSON content
     if user_id:
         family_import.user_id = user_id
-    return crud.import_family(db=db, import_data=family_import)
+    # Clients choosing the import_id can poll its progress while this runs
+    try:
+        progress = import_progress.start(import_id, family_import.user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    db_family = crud.import_family(db=db, import_data=family_import, progress=progress)
+    result = schemas.FamilyImportResult.model_validate(db_family)
+    if report:
+        result.import_report = schemas.ImportReport(**progress.report())
+    return result
+
+
+@router.get("/import/{import_id}", response_model=schemas.ImportReport)
+async def read_import_progress(import_id: str, user_id: str):
+    # No database access: served while the import holds its transaction.
+    # Only the importing user sees it; to anyone else it does not exist.
+    progress = import_progress.get(import_id)
+    if progress is None or progress.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return progress.report()
 
 
 @router.post("/import-preset/{key}", response_model=schemas.Family)
@@ -39,8 +70,13 @@ def import_preset_family(key: str, user_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=List[schemas.FamilyWithRole])
-def read_families(
-    user_id: str = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
+async def read_families(
+    response: Response,
+    user_id: str = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str = None,
+    db: Session = Depends(get_read_db),
 ):
     # Note: user_id param should come from auth dependency ideally.
     # For now, frontend passes it or we infer?
@@ -51,29 +87,22 @@ def read_families(
     # But requirement says "Invite user... invited user has read only".
     # So user should only see families they have access to.
 
-    families = crud.get_families(db, user_id=user_id, skip=skip, limit=limit)
-
-    # Enrich with role
-    result = []
-    for f in families:
-        role = "viewer"  # Default
-        if user_id:
-            if f.user_id == user_id:
-                role = "owner"
-            else:
-                # Check collaborator role
-                collab_role = crud.get_user_role_in_family(db, f.id, user_id)
-                if collab_role:
-                    role = collab_role
+    try:
+        families = await run_crud(
+            db,
+            crud.get_families,
+            user_id=user_id,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if families.next_cursor:
+        response.headers["X-Next-Cursor"] = families.next_cursor
 
-        # Super admin check (not implemented here easily without user object)
-        # But for list display, this is fine.
-
-        f_dict = f.__dict__
-        f_dict["current_user_role"] = role
-        result.append(f_dict)
-
-    return result
+    result = await run_crud(db, crud.get_families_with_role, families, user_id)
+    return json_response(result, family_list_adapter, response)
 
 
 @router.get("/{family_id}", response_model=schemas.FamilyWithRole)
@@ -99,13 +128,31 @@ def read_family(family_id: str, user_id: str = None, db: Session = Depends(get_d
 
 
 @router.get("/{family_id}/name", response_model=dict)
-def get_family_name(family_id: str, db: Session = Depends(get_db)):
-    db_family = crud.get_family(db, family_id=family_id)
+async def get_family_name(family_id: str, db: Session = Depends(get_read_db)):
+    db_family = await run_crud(db, crud.get_family, family_id=family_id)
     if db_family is None:
         raise HTTPException(status_code=404, detail="Family not found")
     return {"family_name": db_family.family_name}
 
 
+@router.post("/{family_id}/layout", response_model=schemas.FamilyLayout)
+def layout_family(family_id: str, mode: str = "normal", db: Session = Depends(get_db)):
+    if mode not in LAYOUT_PRESETS:
+        raise HTTPException(status_code=400, detail=f"Unknown layout mode: {mode}")
+    version = crud.get_family_version(db, family_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Family not found")
+
+    # A cached layout was stored as this version's positions, so a hit means
+    # nothing has moved since.
+    body = layout_cache.get(family_id, version, variant=mode)
+    if body is None:
+        result = crud.layout_family(db, family_id, mode)
+        body = result.model_dump_json().encode()
+        layout_cache.set(family_id, result.version, body, variant=mode)
+    return Response(content=body, media_type="application/json")
+
+
 @router.post("/{family_id}/invite", response_model=schemas.FamilyCollaborator)
 def invite_user(
     family_id: str, invite: schemas.FamilyInvite, db: Session = Depends(get_db)
@@ -127,12 +174,8 @@ def invite_user(
 @router.get(
     "/{family_id}/collaborators", response_model=List[schemas.FamilyCollaborator]
 )
-def get_collaborators(family_id: str, db: Session = Depends(get_db)):
-    collabs = crud.get_collaborators(db, family_id)
-    # Enrich with user info
-    for c in collabs:
-        c.user = crud.get_user(db, c.user_id)
-    return collabs
+async def get_collaborators(family_id: str, db: Session = Depends(get_read_db)):
+    return await run_crud(db, crud.get_collaborators_with_users, family_id)
 
 
 @router.delete("/{family_id}/collaborators/{user_id}")
@@ -173,12 +216,7 @@ def create_access_request(
 
 @router.get("/access-requests/pending", response_model=List[schemas.AccessRequest])
 def get_pending_access_requests(user_id: str, db: Session = Depends(get_db)):
-    reqs = crud.get_pending_access_requests(db, user_id)
-    # Enrich
-    for r in reqs:
-        r.user = crud.get_user(db, r.user_id)
-        r.family = crud.get_family(db, r.family_id)
-    return reqs
+    return crud.get_pending_access_requests(db, user_id)
 
 
 @router.put("/access-requests/{request_id}/approve")
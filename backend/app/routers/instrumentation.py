@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from .. import crud
+from ..compression import no_compression
+from ..database import get_db, get_pool_stats
+from ..db_init import startup
+from ..slow_queries import SLOW_QUERY_LOG, SLOW_QUERY_THRESHOLD_MS, slow_query_log
+from .users import get_superuser_ids
+
+router = APIRouter(
+    prefix="/api/instrumentation",
+    tags=["instrumentation"],
+)
+
+
+def require_superuser(user_id: str, db: Session = Depends(get_db)):
+    user = crud.get_user(db, user_id)
+    if user is None or not (user.is_superuser or user.id in get_superuser_ids()):
+        raise HTTPException(status_code=403, detail="Superuser access required")
+    return user
+
+
+@router.get("/pool", response_model=dict)
+@no_compression
+def read_pool_stats():
+    return get_pool_stats()
+
+
+@router.get("/startup", response_model=dict)
+def read_startup():
+    # Database setup mode, schema version and timings of this worker's startup
+    return startup
+
+
+@router.get(
+    "/slow-queries", response_model=dict, dependencies=[Depends(require_superuser)]
+)
+def read_slow_queries(limit: int = Query(50, ge=1, le=1000)):
+    return {
+        "enabled": SLOW_QUERY_LOG,
+        "threshold_ms": SLOW_QUERY_THRESHOLD_MS,
+        "total": slow_query_log.total,
+        "entries": slow_query_log.recent(limit),
+    }
+
+
+@router.delete(
+    "/slow-queries", status_code=204, dependencies=[Depends(require_superuser)]
+)
+def clear_slow_queries():
+    slow_query_log.clear()
+    return None
@@ -1,10 +1,12 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
 from .. import crud, schemas
-from ..database import get_db
+from ..database import get_db, get_read_db, run_crud
+from ..responses import json_response
 
 router = APIRouter(
     prefix="/api/members",
@@ -12,6 +14,10 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+member_list_adapter = TypeAdapter(List[schemas.Member])
+graph_adapter = TypeAdapter(schemas.GraphData)
+projection_adapter = TypeAdapter(List[dict])
+
 
 @router.post("/", response_model=schemas.Member)
 def create_member(member: schemas.MemberCreate, db: Session = Depends(get_db)):
@@ -19,21 +25,94 @@ def create_member(member: schemas.MemberCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=List[schemas.Member])
-def read_members(
-    family_id: str, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
+async def read_members(
+    family_id: str,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str = None,
+    view: str = None,
+    fields: str = None,
+    db: Session = Depends(get_read_db),
 ):
-    members = crud.get_members(db, family_id=family_id, skip=skip, limit=limit)
-    return members
+    try:
+        member_fields = crud.get_member_fields(view, fields)
+        members = await run_crud(
+            db,
+            crud.get_members,
+            family_id=family_id,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            fields=member_fields,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if members.next_cursor:
+        response.headers["X-Next-Cursor"] = members.next_cursor
+    if member_fields is not None:
+        # Projected rows don't fit the Member model; serialize them as they are
+        return Response(
+            content=projection_adapter.dump_json(members),
+            media_type="application/json",
+            headers=dict(response.headers),
+        )
+    return json_response(members, member_list_adapter, response)
 
 
 @router.get("/{member_id}", response_model=schemas.Member)
-def read_member(member_id: str, db: Session = Depends(get_db)):
-    db_member = crud.get_member(db, member_id=member_id)
+async def read_member(member_id: str, db: Session = Depends(get_read_db)):
+    db_member = await run_crud(db, crud.get_member, member_id=member_id)
     if db_member is None:
         raise HTTPException(status_code=404, detail="Member not found")
     return db_member
 
 
+@router.get("/{member_id}/ancestors", response_model=schemas.GraphData)
+def read_ancestors(
+    member_id: str,
+    depth: int = Query(5, ge=1, le=100),
+    include_spouses: bool = False,
+    db: Session = Depends(get_db),
+):
+    graph = crud.get_member_lineage(
+        db, member_id, "ancestors", depth=depth, include_spouses=include_spouses
+    )
+    if graph is None:
+        raise HTTPException(status_code=404, detail="Member not found")
+    return json_response(graph, graph_adapter)
+
+
+@router.get("/{member_id}/descendants", response_model=schemas.GraphData)
+def read_descendants(
+    member_id: str,
+    depth: int = Query(5, ge=1, le=100),
+    include_spouses: bool = False,
+    db: Session = Depends(get_db),
+):
+    graph = crud.get_member_lineage(
+        db, member_id, "descendants", depth=depth, include_spouses=include_spouses
+    )
+    if graph is None:
+        raise HTTPException(status_code=404, detail="Member not found")
+    return json_response(graph, graph_adapter)
+
+
+@router.get("/{member_id}/kinship/{other_id}", response_model=schemas.Kinship)
+def read_kinship(
+    member_id: str,
+    other_id: str,
+    family_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    kinship = crud.get_kinship(db, member_id, other_id, family_id=family_id)
+    if kinship is None:
+        raise HTTPException(
+            status_code=404, detail="Member not found in this family graph"
+        )
+    return kinship
+
+
 @router.put("/{member_id}", response_model=schemas.Member)
 def update_member(
     member_id: str, member: schemas.MemberUpdate, db: Session = Depends(get_db)
@@ -1,10 +1,10 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
-from .. import models, schemas
-from ..database import get_db
+from .. import crud, models, schemas
+from ..database import get_db, get_read_db, run_crud
 
 router = APIRouter(
     prefix="/api/regions",
@@ -23,14 +23,15 @@ def create_region(region: schemas.RegionCreate, db: Session = Depends(get_db)):
         linked_family_id=region.linked_family_id,
     )
     db.add(db_region)
-    db.commit()
-    db.refresh(db_region)
+    db.flush()  # Flush to get ID
 
     # Assign Members if provided
+    members = []
     if region.member_ids:
         # We need to ensure members belong to the same family
         members = (
             db.query(models.Member)
+            .options(selectinload(models.Member.regions))
             .filter(models.Member.id.in_(region.member_ids))
             .all()
         )
@@ -40,8 +41,19 @@ def create_region(region: schemas.RegionCreate, db: Session = Depends(get_db)):
             # Append if not exists
             if db_region not in member.regions:
                 member.regions.append(db_region)
-        db.commit()
-        db.refresh(db_region)
+
+    # One commit: the new version must not be visible without the members.
+    # Members of other families change region_ids in their own graphs too.
+    crud.bump_family_versions(
+        db,
+        [region.family_id] + [m.family_id for m in members],
+        changes=crud.get_region_changes(
+            db_region, "create", member_ids=[m.id for m in members]
+        ),
+        reset=bool(region.linked_family_id),
+    )
+    db.commit()
+    db.refresh(db_region)
 
     return db_region
 
@@ -62,6 +74,14 @@ def update_region(
     if db_region is None:
         raise HTTPException(status_code=404, detail="Region not found")
 
+    # Members leaving the region change as well as the ones joining it
+    member_family_ids = {m.id: m.family_id for m in db_region.members}
+    changed_member_ids = set(member_family_ids)
+    relinked = (
+        region.linked_family_id is not None
+        and region.linked_family_id != db_region.linked_family_id
+    )
+
     if region.name is not None:
         db_region.name = region.name
     if region.description is not None:
@@ -81,7 +101,20 @@ def update_region(
         # Ensure members belong to same family -> Removed constraint to allow linked families
         # valid_members = [m for m in members if m.family_id == db_region.family_id]
         db_region.members = members
-
+        member_family_ids.update((m.id, m.family_id) for m in members)
+        changed_member_ids.symmetric_difference_update(m.id for m in members)
+    else:
+        changed_member_ids = set()
+
+    crud.bump_family_versions(
+        db,
+        [db_region.family_id]
+        + [member_family_ids[member_id] for member_id in changed_member_ids],
+        changes=crud.get_region_changes(
+            db_region, "update", member_ids=sorted(changed_member_ids)
+        ),
+        reset=relinked,
+    )
     db.commit()
     db.refresh(db_region)
     return db_region
@@ -97,11 +130,19 @@ def delete_region(region_id: str, db: Session = Depends(get_db)):
     # The association table entries will be removed (cascade delete if configured, or manually if not)
     # SQLAlchemy default behavior for secondary table is to delete associations.
     
+    crud.bump_family_versions(
+        db,
+        [db_region.family_id] + [m.family_id for m in db_region.members],
+        changes=crud.get_region_changes(db_region, "delete"),
+        reset=bool(db_region.linked_family_id),
+    )
     db.delete(db_region)
     db.commit()
     return None
 
 
 @router.get("/family/{family_id}", response_model=List[schemas.Region])
-def read_regions_by_family(family_id: str, db: Session = Depends(get_db)):
-    return db.query(models.Region).filter(models.Region.family_id == family_id).all()
+async def read_regions_by_family(
+    family_id: str, db: Session = Depends(get_read_db)
+):
+    return await run_crud(db, crud.get_family_regions, family_id)
@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
 from .. import crud, schemas
-from ..database import get_db
+from ..cache import graph_cache
+from ..compression import no_compression
+from ..database import get_db, get_read_db, get_session_factory, run_crud
+from ..responses import json_response
 
 router = APIRouter(
     prefix="/api/relationships",
@@ -10,6 +17,8 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+graph_adapter = TypeAdapter(schemas.GraphData)
+
 
 @router.post("/spouse", response_model=schemas.SpouseRelationship)
 def create_spouse_relationship(
@@ -73,7 +82,107 @@ def delete_parent_child_relationship(
     return {"status": "success"}
 
 
+def graph_etag(version: int) -> str:
+    return f'W/"{version}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison: W/"3" and "3" name the same version
+    return "*" in candidates or etag.removeprefix("W/") in {
+        tag.removeprefix("W/") for tag in candidates
+    }
+
+
 @router.get("/graph/{family_id}", response_model=schemas.GraphData)
-def get_graph(family_id: str, db: Session = Depends(get_db)):
-    return crud.get_family_graph(db, family_id)
-    return crud.get_family_graph(db, family_id)
+async def get_graph(
+    family_id: str,
+    request: Request,
+    view: str = None,
+    fields: str = None,
+    db: Session = Depends(get_read_db),
+):
+    # view=lean or fields=a,b,c trims node data to those member fields
+    try:
+        member_fields = crud.get_member_fields(view, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    version = await run_crud(db, crud.get_family_version, family_id)
+    if version is not None:
+        etag = graph_etag(version)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        # Unchanged graph: answer from the version alone, skip the member tables
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        variant = None
+        if member_fields is not None:
+            variant = ",".join(member_fields)
+        body = graph_cache.get(family_id, version, variant=variant)
+        if body is None:
+            graph = await run_crud(
+                db, crud.get_family_graph, family_id, fields=member_fields
+            )
+            body = graph.model_dump_json().encode()
+            graph_cache.set(family_id, version, body, variant=variant)
+        return Response(content=body, media_type="application/json", headers=headers)
+    graph = await run_crud(db, crud.get_family_graph, family_id, fields=member_fields)
+    if member_fields is not None:
+        return Response(content=graph.model_dump_json(), media_type="application/json")
+    return json_response(graph, graph_adapter)
+
+
+@router.get("/graph/{family_id}/changes", response_model=schemas.GraphDelta)
+async def get_graph_changes(
+    family_id: str, since: int, db: Session = Depends(get_read_db)
+):
+    try:
+        delta = await run_crud(db, crud.get_family_graph_changes, family_id, since)
+    except ValueError as e:
+        # The log no longer reaches back to `since`
+        raise HTTPException(status_code=410, detail=str(e))
+    if delta is None:
+        raise HTTPException(status_code=404, detail="Family not found")
+    return delta
+
+
+@router.get("/graph/{family_id}/stream")
+def stream_graph(family_id: str, db: Session = Depends(get_db)):
+    """Stream the whole graph as NDJSON: a `meta` line, then one line per
+    node, edge and region (in that order), then an `end` line with counts."""
+    version = crud.get_family_version(db, family_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Family not found")
+
+    def lines():
+        # The request-scoped session is closed before the body is sent, so
+        # the stream owns its session.
+        stream_db = get_session_factory("GET")()
+        try:
+            yield (
+                json.dumps({"kind": "meta", "family_id": family_id, "version": version})
+                + "\n"
+            )
+            counts = {"node": 0, "edge": 0, "region": 0}
+            for kind, item in crud.iter_family_graph(stream_db, family_id):
+                counts[kind] += 1
+                yield f'{{"kind":"{kind}","data":{item.model_dump_json()}}}\n'
+            yield json.dumps({"kind": "end", "counts": counts}) + "\n"
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"ETag": graph_etag(version), "Cache-Control": "no-cache"},
+    )
+
+
+@router.get("/graph-cache/stats", response_model=dict)
+@no_compression
+def get_graph_cache_stats():
+    return graph_cache.stats()
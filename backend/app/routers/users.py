@@ -1,11 +1,11 @@
 import os
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from .. import crud, schemas
-from ..database import get_db
+from ..database import get_db, get_primary_db
 
 
 # Get Superuser IDs from env
@@ -40,15 +40,26 @@ class UserWithFamilies(schemas.User):
 
 
 @router.get("/", response_model=list[UserWithFamilies])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    users = crud.get_users(db, skip=skip, limit=limit)
+def read_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str = None,
+    db: Session = Depends(get_db),
+):
+    try:
+        users = crud.get_users(db, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if users.next_cursor:
+        response.headers["X-Next-Cursor"] = users.next_cursor
     # We rely on ORM lazy loading or eager loading in future.
     # For now, FastAPI/Pydantic from_attributes will try to access .families
     return users
 
 
 @router.get("/{user_id}", response_model=schemas.User)
-def read_user(user_id: str, db: Session = Depends(get_db)):
+def read_user(user_id: str, db: Session = Depends(get_primary_db)):
     db_user = crud.get_user(db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
@@ -98,6 +98,7 @@ class FamilyCollaboratorUpdate(BaseModel):
 class Family(FamilyBase):
     id: str
     user_id: str
+    version: int = 0
     created_at: datetime
 
     # Include collaborators in response? Maybe separate endpoint or optional include
@@ -270,6 +271,67 @@ class GraphData(BaseModel):
     regions: Optional[List[Region]] = []  # Include regions in graph data
 
 
+class ProjectedGraphNode(GraphNode):
+    data: Optional[dict] = None  # Only the requested member fields
+
+
+class ProjectedGraphData(GraphData):
+    nodes: List[ProjectedGraphNode]
+
+
+class GraphPosition(BaseModel):
+    member_id: str
+    x: int
+    y: int
+
+
+class GraphDeltaItems(BaseModel):
+    nodes: List[GraphNode] = []
+    edges: List[GraphEdge] = []
+    regions: List[Region] = []
+    positions: List[GraphPosition] = []
+
+
+class GraphDeltaIds(BaseModel):
+    nodes: List[str] = []
+    edges: List[str] = []
+    regions: List[str] = []
+    positions: List[str] = []
+
+
+class GraphDelta(BaseModel):
+    family_id: str
+    since: int
+    version: int
+    added: GraphDeltaItems
+    updated: GraphDeltaItems
+    deleted: GraphDeltaIds
+
+
+class FamilyLayout(BaseModel):
+    family_id: str
+    version: int
+    mode: str
+    positions: List[GraphPosition]
+
+
+class KinshipStep(BaseModel):
+    member_id: str
+    name: Optional[str] = None
+    relation: Optional[str] = None  # parent, child or spouse of the previous step
+
+
+class Kinship(BaseModel):
+    family_id: str
+    version: int
+    source_id: str
+    target_id: str
+    related: bool
+    distance: Optional[int] = None
+    relationship: Optional[str] = None  # what the target is to the source
+    path: List[KinshipStep] = []
+
+
 # Import Schemas
 class ImportMember(MemberBase):
     original_id: str
@@ -299,3 +361,29 @@ class FamilyImport(BaseModel):
     parent_child_relationships: List[ImportParentChild]
     regions: Optional[List[ImportRegion]] = []
     regions: Optional[List[ImportRegion]] = []
+
+
+class ImportStage(BaseModel):
+    stage: str
+    duration_ms: float
+    rows: int
+
+
+class ImportReport(BaseModel):
+    import_id: str
+    status: str  # running, completed or failed
+    error: Optional[str] = None
+    family_id: Optional[str] = None
+    stage: Optional[str] = None  # current stage while running
+    processed: int
+    total: int
+    progress: float
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    duration_ms: float
+    stages: List[ImportStage]
+
+
+class FamilyImportResult(Family):
+    # Only filled in when requested with ?report=true
+    import_report: Optional[ImportReport] = None
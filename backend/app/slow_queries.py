@@ -0,0 +1,164 @@
+"""Opt-in slow query log.
+
+With SLOW_QUERY_LOG=true every statement slower than SLOW_QUERY_THRESHOLD_MS
+is logged and kept in a bounded in-memory list (see GET
+/api/instrumentation/slow-queries) together with the shape of its bound
+parameters, the app function that issued it, and the query plan, captured
+with EXPLAIN (EXPLAIN QUERY PLAN on SQLite) on the same connection.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "false").lower() == "true"
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+# Capture the plan of slow SELECTs (one extra EXPLAIN per slow statement)
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+# Entries kept for the admin endpoint
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "100"))
+
+# Only read-only statements are explained: a failing EXPLAIN would abort the
+# caller's transaction on PostgreSQL.
+EXPLAINABLE = ("select", "with")
+
+_PACKAGE = __name__.rpartition(".")[0]
+_SKIP_MODULES = {__name__, f"{_PACKAGE}.database", f"{_PACKAGE}.metrics"}
+
+
+class SlowQueryLog:
+    def __init__(self, size: int):
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def add(self, entry: dict):
+        with self._lock:
+            self._entries.append(entry)
+            self.total += 1
+
+    def recent(self, limit: int | None = None) -> list[dict]:
+        # Newest first
+        with self._lock:
+            entries = list(reversed(self._entries))
+        return entries[:limit] if limit else entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog(SLOW_QUERY_LOG_SIZE)
+
+
+def get_parameter_shape(parameters, executemany: bool):
+    # Types only: values may be personal data
+    if executemany:
+        rows = list(parameters or ())
+        first = get_parameter_shape(rows[0], False) if rows else None
+        return {"rows": len(rows), "row": first}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    # Runs of one type are collapsed, e.g. the ids of an expanded IN list
+    shape = []
+    for value in parameters or ():
+        name = type(value).__name__
+        if shape and shape[-1][0] == name:
+            shape[-1][1] += 1
+        else:
+            shape.append([name, 1])
+    return [name if count == 1 else f"{name} x{count}" for name, count in shape]
+
+
+def get_caller() -> str:
+    # Innermost app frame outside the instrumentation modules, which is the
+    # crud function (or route) that issued the statement
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(_PACKAGE + ".") and module not in _SKIP_MODULES:
+            return f"{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def explain(conn, statement: str, parameters) -> list[str]:
+    # Run on the raw DBAPI connection: same connection and transaction as the
+    # slow statement, without going through engine events again
+    dialect = conn.dialect.name
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    if dialect == "sqlite":
+        # (id, parent, notused, detail)
+        return [row[3] for row in rows]
+    if dialect == "postgresql":
+        return [row[0] for row in rows]
+    return [str(tuple(row)) for row in rows]
+
+
+def record(conn, statement, parameters, elapsed: float, executemany: bool):
+    entry = {
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "duration_ms": round(elapsed * 1000, 3),
+        "statement": statement,
+        "parameters": get_parameter_shape(parameters, executemany),
+        "caller": get_caller(),
+        "dialect": conn.dialect.name,
+        "plan": None,
+    }
+    if (
+        SLOW_QUERY_EXPLAIN
+        and not executemany
+        and statement.lstrip().lower().startswith(EXPLAINABLE)
+    ):
+        try:
+            entry["plan"] = explain(conn, statement, parameters)
+        except Exception as e:
+            entry["plan"] = [f"EXPLAIN failed: {e}"]
+    slow_query_log.add(entry)
+    logger.warning(
+        f"Slow query ({entry['duration_ms']:.1f} ms) from {entry['caller']}: "
+        f"{' '.join(statement.split())}"
+    )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["slow_query_start"].pop()
+    if elapsed * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+        record(conn, statement, parameters, elapsed, executemany)
+
+
+def _handle_error(context):
+    # No after_cursor_execute for a failed statement
+    starts = (
+        context.connection.info.get("slow_query_start") if context.connection else None
+    )
+    if starts:
+        starts.pop()
+
+
+if SLOW_QUERY_LOG:
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
@@ -0,0 +1,277 @@
+"""Deterministic synthetic family trees in the FamilyImport format.
+
+Run from backend/:  python -m benchmarks.genealogy --size 1000 > family.json
+
+With --cross-family-links N --external-family ID, N generated members marry
+members of that already imported family (read through DATABASE_URL).
+
+The same arguments and seed always produce the same tree. Generation starts
+from one founding couple and proceeds generation by generation: every couple
+has about `branching` children, most children marry someone from outside the
+family, some remarry (`remarriage_rate`), and children of a remarried member
+are split between the spouses. Growth stops at `size` members or after
+`depth` generations, whichever comes first.
+
+Cross-family links reference members of an already imported family: they
+marry into the tree as external members (resolved by id on import) and a
+region linked to their family groups them.
+"""
+
+import argparse
+import json
+import random
+from dataclasses import dataclass, field
+
+from app import schemas
+
+# Stand-in family id of the generated members; import_family treats members
+# whose family_id differs from the most common one as external links.
+SYNTHETIC_FAMILY_ID = "synthetic-family"
+
+SURNAMES = ("Li", "Wang", "Zhang", "Liu", "Chen", "Yang", "Zhao", "Huang", "Zhou", "Wu")
+SYLLABLES = (
+    "an", "bo", "chen", "de", "fang", "gui", "hao", "jian", "kai", "lan",
+    "ming", "ning", "ping", "qing", "rui", "shan", "tai", "wen", "xin", "yu",
+)  # fmt: skip
+REGION_COLORS = ("#EBF8FF", "#F0FFF4", "#FFFAF0", "#FFF5F7", "#FAF5FF", "#E6FFFA")
+
+FOUNDING_YEAR = 1500
+GENERATION_YEARS = 25
+
+
+@dataclass
+class GeneratorOptions:
+    size: int = 1000
+    # Generations below the founders; None grows until `size` is reached
+    depth: int | None = None
+    # Average children per couple
+    branching: float = 3.0
+    # Share of members who marry at all
+    marriage_rate: float = 0.85
+    # Share of married members who take a second spouse
+    remarriage_rate: float = 0.1
+    # Branch regions, one per founder's child line (0 for none)
+    regions: int = 4
+    # Number of external spouses drawn from `external_members`
+    cross_family_links: int = 0
+    seed: int = 0
+
+
+@dataclass
+class _Builder:
+    rng: random.Random
+    members: list = field(default_factory=list)
+    spouses: list = field(default_factory=list)
+    parent_child: list = field(default_factory=list)
+
+    def add_member(self, gender, generation, surname, region_ids=()):
+        original_id = f"m{len(self.members):07d}"
+        birth = FOUNDING_YEAR + generation * GENERATION_YEARS + self.rng.randint(-5, 5)
+        given = "".join(self.rng.choice(SYLLABLES) for _ in range(2)).capitalize()
+        lifespan = self.rng.randint(30, 90)
+        self.members.append(
+            schemas.ImportMember(
+                original_id=original_id,
+                family_id=SYNTHETIC_FAMILY_ID,
+                name=f"{surname} {given}",
+                surname=surname,
+                gender=gender,
+                birth_date=f"{birth:04d}-{self.rng.randint(1, 12):02d}-01",
+                death_date=f"{birth + lifespan:04d}-01-01",
+                is_deceased=True,
+                is_fuzzy=self.rng.random() < 0.05,
+                remark=f"Generation {generation + 1}"
+                if self.rng.random() < 0.2
+                else None,
+                sort_order=0,
+                region_ids=list(region_ids),
+            )
+        )
+        return original_id
+
+    def marry(self, a, b):
+        self.spouses.append(
+            schemas.ImportSpouse(member1_original_id=a, member2_original_id=b)
+        )
+
+    def add_child(self, parent_id, parent_gender, child_id):
+        self.parent_child.append(
+            schemas.ImportParentChild(
+                parent_original_id=parent_id,
+                child_original_id=child_id,
+                relationship_type="father" if parent_gender == "male" else "mother",
+            )
+        )
+
+
+def _other(gender):
+    return "female" if gender == "male" else "male"
+
+
+def generate_family(
+    options: GeneratorOptions,
+    user_id: str,
+    external_members=(),
+    family_name: str | None = None,
+) -> schemas.FamilyImport:
+    """Build a FamilyImport. `external_members` are (member_id, family_id,
+    gender) of existing members available for cross-family links."""
+    rng = random.Random(options.seed)
+    builder = _Builder(rng)
+    surname = rng.choice(SURNAMES)
+
+    regions = [
+        schemas.ImportRegion(
+            original_id=f"r{i:03d}",
+            name=f"Branch {i + 1}",
+            color=REGION_COLORS[i % len(REGION_COLORS)],
+        )
+        for i in range(options.regions)
+    ]
+
+    founder = builder.add_member("male", 0, surname)
+    founder_spouse = builder.add_member("female", 0, rng.choice(SURNAMES))
+    builder.marry(founder, founder_spouse)
+    # Descendants of the founders, (id, gender)
+    bloodline = []
+    # Couples still to have children: (bloodline member, spouse, generation, regions)
+    couples = [(founder, "male", founder_spouse, 0, ())]
+
+    while couples and len(builder.members) < options.size:
+        next_couples = []
+        for parent, parent_gender, spouse, generation, region_ids in couples:
+            if options.depth is not None and generation >= options.depth:
+                continue
+            # The founders always have children, later couples may not
+            count = max(int(generation == 0), round(rng.gauss(options.branching, 1)))
+            for i in range(count):
+                if len(builder.members) >= options.size:
+                    break
+                child_regions = region_ids
+                if generation == 0 and regions:
+                    # Each of the founder's children starts a branch
+                    child_regions = (regions[i % len(regions)].original_id,)
+                gender = rng.choice(("male", "female"))
+                child = builder.add_member(
+                    gender, generation + 1, surname, child_regions
+                )
+                builder.add_child(parent, parent_gender, child)
+                builder.add_child(spouse, _other(parent_gender), child)
+                bloodline.append((child, gender))
+
+                if rng.random() >= options.marriage_rate:
+                    continue
+                # Every marriage is a couple of its own, so the children of
+                # a remarried member are split between the spouses
+                spouse_count = 2 if rng.random() < options.remarriage_rate else 1
+                for _ in range(spouse_count):
+                    if len(builder.members) >= options.size:
+                        break
+                    partner = builder.add_member(
+                        _other(gender),
+                        generation + 1,
+                        rng.choice(SURNAMES),
+                        child_regions,
+                    )
+                    builder.marry(child, partner)
+                    next_couples.append(
+                        (child, gender, partner, generation + 1, child_regions)
+                    )
+        couples = next_couples
+
+    external = list(external_members)[: options.cross_family_links]
+    members = builder.members
+    if external:
+        linked = {}
+        for member_id, family_id, gender in external:
+            if family_id not in linked:
+                linked[family_id] = schemas.ImportRegion(
+                    original_id=f"linked-{len(linked)}",
+                    name=f"Linked family {len(linked) + 1}",
+                    linked_family_id=family_id,
+                )
+            candidates = [b for b in bloodline if b[1] != gender] or bloodline
+            if not candidates:
+                break
+            partner, _ = rng.choice(candidates)
+            members.append(
+                schemas.ImportMember(
+                    original_id=member_id,
+                    family_id=family_id,
+                    name=f"External {member_id[:8]}",
+                    gender=gender,
+                )
+            )
+            builder.marry(partner, member_id)
+        regions.extend(linked.values())
+
+    return schemas.FamilyImport(
+        family_name=family_name or f"Synthetic {surname} ({len(members)} members)",
+        user_id=user_id,
+        members=members,
+        spouse_relationships=builder.spouses,
+        parent_child_relationships=builder.parent_child,
+        regions=regions,
+    )
+
+
+def get_external_members(family_ids) -> list[tuple[str, str, str]]:
+    # Members of families already in the database (DATABASE_URL), in a stable
+    # order so a seed keeps producing the same links
+    from app import models
+    from app.database import SessionLocal
+
+    with SessionLocal() as db:
+        rows = (
+            db.query(models.Member.id, models.Member.family_id, models.Member.gender)
+            .filter(models.Member.family_id.in_(family_ids))
+            .order_by(models.Member.family_id, models.Member.id)
+            .all()
+        )
+    return [tuple(row) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=None)
+    parser.add_argument("--branching", type=float, default=3.0)
+    parser.add_argument("--marriage-rate", type=float, default=0.85)
+    parser.add_argument("--remarriage-rate", type=float, default=0.1)
+    parser.add_argument("--regions", type=int, default=4)
+    parser.add_argument("--cross-family-links", type=int, default=0)
+    parser.add_argument(
+        "--external-family",
+        action="append",
+        default=[],
+        metavar="FAMILY_ID",
+        help="imported family whose members cross-family links marry; repeatable",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--user-id", default="synthetic-user")
+    args = parser.parse_args()
+
+    external_members = []
+    if args.cross_family_links:
+        if not args.external_family:
+            parser.error("--cross-family-links needs --external-family")
+        external_members = get_external_members(args.external_family)
+        if not external_members:
+            parser.error("the external families have no members")
+
+    options = GeneratorOptions(
+        size=args.size,
+        depth=args.depth,
+        branching=args.branching,
+        marriage_rate=args.marriage_rate,
+        remarriage_rate=args.remarriage_rate,
+        regions=args.regions,
+        cross_family_links=args.cross_family_links,
+        seed=args.seed,
+    )
+    family = generate_family(options, args.user_id, external_members)
+    print(json.dumps(family.model_dump(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Compare FastAPI's default response encoding with the fast JSON path.
+
+Run from backend/:  python -m benchmarks.json_encoding [--nodes 2000]
+
+FastJSONResponse uses orjson when the fast-json extra is installed
+(uv sync --extra fast-json); the report says which one was measured.
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+
+from app import schemas
+from app.responses import FastJSONResponse, orjson
+
+
+def build_graph(nodes: int) -> schemas.GraphData:
+    now = datetime.now(timezone.utc)
+    members = [
+        schemas.Member(
+            id=f"member-{i:06d}",
+            family_id="family-1",
+            name=f"Member {i}",
+            surname="Li",
+            gender="male" if i % 2 else "female",
+            birth_date=f"{1700 + i % 300}-01-01",
+            remark="Lorem ipsum dolor sit amet " * 3,
+            birth_place="Chang'an",
+            region_ids=["region-1"],
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(nodes)
+    ]
+    return schemas.GraphData(
+        nodes=[
+            schemas.GraphNode(
+                id=m.id, name=m.name, gender=m.gender, x=i * 10, y=i, data=m
+            )
+            for i, m in enumerate(members)
+        ],
+        edges=[
+            schemas.GraphEdge(
+                id=f"edge-{i}",
+                source=members[i // 2].id,
+                target=members[i].id,
+                type="parent-child",
+                label="father",
+            )
+            for i in range(1, nodes)
+        ],
+        regions=[],
+    )
+
+
+def timed(fn, repeat: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    graph = build_graph(args.nodes)
+    members = [node.data for node in graph.nodes]
+    loop = asyncio.new_event_loop()
+
+    def default_path(model, type_):
+        field = create_response_field(name="Response", type_=type_)
+
+        def run():
+            content = loop.run_until_complete(
+                serialize_response(field=field, response_content=model)
+            )
+            return JSONResponse(content).body
+
+        return run
+
+    def fast_path(model, type_):
+        adapter = TypeAdapter(type_)
+        return lambda: adapter.dump_json(
+            adapter.validate_python(model, from_attributes=True)
+        )
+
+    def default_class_render(model, type_):
+        # Routes still on response_model, rendered by the global default class
+        field = create_response_field(name="Response", type_=type_)
+
+        def run():
+            content = loop.run_until_complete(
+                serialize_response(field=field, response_content=model)
+            )
+            return FastJSONResponse(content).body
+
+        return run
+
+    print(f"orjson: {'installed' if orjson else 'not installed'}")
+    print(
+        f"{'payload':<28}{'default ms':>12}{'fast ms':>10}{'render ms':>11}{'speedup':>9}"
+    )
+    for label, model, type_ in (
+        (f"GraphData ({args.nodes} nodes)", graph, schemas.GraphData),
+        (f"List[Member] ({args.nodes})", members, List[schemas.Member]),
+    ):
+        default_ms = timed(default_path(model, type_), args.repeat)
+        fast_ms = timed(fast_path(model, type_), args.repeat)
+        render_ms = timed(default_class_render(model, type_), args.repeat)
+        print(
+            f"{label:<28}{default_ms:>12.2f}{fast_ms:>10.2f}{render_ms:>11.2f}"
+            f"{default_ms / fast_ms:>8.1f}x"
+        )
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
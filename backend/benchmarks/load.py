@@ -0,0 +1,319 @@
+"""Replay concurrent editing sessions against a local API server.
+
+Run from backend/:  python -m benchmarks.load [--editors 10] [--duration 30]
+
+Starts `uvicorn app.main:app` on a scratch SQLite database (other settings
+come from the environment, e.g. SQLITE_PROFILE=production), seeds users and
+synthetic families, then runs one session loop per editor until the duration
+is up: log in, list families, load the graph, save a burst of node drags,
+edit a member, add a child with its parent-child relationship, and reload
+the graph with its ETag. Reports throughput, latency percentiles and error
+rates per endpoint. Needs httpx (the client behind FastAPI's TestClient).
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.genealogy import GeneratorOptions, generate_family
+
+PASSWORD = "load-test"
+
+
+class EndpointStats:
+    __slots__ = ("errors", "latencies")
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, think: float, seed: int):
+        self.client = client
+        self.think = think
+        self.rng = random.Random(seed)
+        self.stats = defaultdict(EndpointStats)
+
+    async def request(self, label: str, method: str, url: str, **kwargs):
+        # `label` groups requests by route template in the report
+        stats = self.stats[label]
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            stats.latencies.append(time.perf_counter() - start)
+            stats.errors += 1
+            return None
+        stats.latencies.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            stats.errors += 1
+            return None
+        return response
+
+    async def pause(self):
+        if self.think:
+            await asyncio.sleep(self.rng.uniform(0.5, 1.5) * self.think)
+
+    async def session(self, editor: dict, family_id: str, deadline: float):
+        rng = random.Random(self.rng.random())
+        member_ids = []
+        etag = None
+        while time.monotonic() < deadline:
+            await self.request(
+                "POST /api/users/login",
+                "POST",
+                "/api/users/login",
+                json={"email": editor["email"], "password": PASSWORD},
+            )
+            await self.request(
+                "GET /api/families/",
+                "GET",
+                "/api/families/",
+                params={"user_id": editor["id"]},
+            )
+            graph = await self.request(
+                "GET /api/relationships/graph/{family_id}",
+                "GET",
+                f"/api/relationships/graph/{family_id}",
+            )
+            if graph is not None:
+                etag = graph.headers.get("etag")
+                member_ids = [node["id"] for node in graph.json()["nodes"]]
+            if not member_ids:
+                await self.pause()
+                continue
+            await self.pause()
+
+            # Drag saves: a few small position batches in quick succession
+            for _ in range(rng.randint(3, 8)):
+                moved = rng.sample(member_ids, min(len(member_ids), rng.randint(1, 5)))
+                await self.request(
+                    "PUT /api/members/batch/positions",
+                    "PUT",
+                    "/api/members/batch/positions",
+                    json={
+                        "family_id": family_id,
+                        "updates": [
+                            {
+                                "id": member_id,
+                                "position_x": rng.randint(0, 5000),
+                                "position_y": rng.randint(0, 5000),
+                            }
+                            for member_id in moved
+                        ],
+                    },
+                )
+                await asyncio.sleep(rng.uniform(0.02, 0.1))
+            await self.pause()
+
+            await self.request(
+                "PUT /api/members/{member_id}",
+                "PUT",
+                f"/api/members/{rng.choice(member_ids)}",
+                json={"remark": f"Edited by {editor['name']} at {time.time():.0f}"},
+            )
+            await self.pause()
+
+            parent_id = rng.choice(member_ids)
+            child = await self.request(
+                "POST /api/members/",
+                "POST",
+                "/api/members/",
+                json={
+                    "family_id": family_id,
+                    "name": f"Child of {parent_id[:8]}",
+                    "gender": rng.choice(("male", "female")),
+                },
+            )
+            if child is not None:
+                child_id = child.json()["id"]
+                member_ids.append(child_id)
+                await self.request(
+                    "POST /api/relationships/parent-child",
+                    "POST",
+                    "/api/relationships/parent-child",
+                    json={
+                        "parent_id": parent_id,
+                        "child_id": child_id,
+                        "relationship_type": "father",
+                    },
+                )
+            await self.pause()
+
+            # Reload: 304 when nobody else changed the family meanwhile
+            await self.request(
+                "GET /api/relationships/graph/{family_id} (revalidate)",
+                "GET",
+                f"/api/relationships/graph/{family_id}",
+                headers={"If-None-Match": etag} if etag else {},
+            )
+            await self.pause()
+
+    def report(self, elapsed: float):
+        print(
+            f"{'endpoint':<56}{'requests':>9}{'req/s':>8}{'p50 ms':>9}"
+            f"{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+        )
+        total = EndpointStats()
+        for label, stats in sorted(self.stats.items()):
+            total.latencies.extend(stats.latencies)
+            total.errors += stats.errors
+            self.print_row(label, stats, elapsed)
+        self.print_row("total", total, elapsed)
+
+    @staticmethod
+    def print_row(label: str, stats: EndpointStats, elapsed: float):
+        latencies = sorted(stats.latencies)
+        count = len(latencies)
+        error_rate = stats.errors / count if count else 0.0
+        print(
+            f"{label:<56}{count:>9}{count / elapsed:>8.1f}"
+            f"{percentile(latencies, 50) * 1000:>9.1f}"
+            f"{percentile(latencies, 95) * 1000:>9.1f}"
+            f"{percentile(latencies, 99) * 1000:>9.1f}"
+            f"{error_rate:>8.1%}"
+        )
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, database: str, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{database}")
+    command = [sys.executable, "-m", "uvicorn", "app.main:app"]
+    command += ["--port", str(port), "--workers", str(workers)]
+    command += ["--log-level", "warning", "--no-access-log"]
+    return subprocess.Popen(command, env=env)
+
+
+async def wait_for_server(client: httpx.AsyncClient, server, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server is not None and server.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            await client.get("/")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError("API server did not start in time")
+
+
+async def seed(client: httpx.AsyncClient, args) -> list[tuple[dict, str]]:
+    # Editors share families round-robin: (editor, family_id) per session
+    editors = []
+    for i in range(args.editors):
+        response = await client.post(
+            "/api/users/",
+            json={
+                "email": f"editor{i}-{time.time_ns()}@example.com",
+                "name": f"Editor {i}",
+                "password": PASSWORD,
+            },
+        )
+        response.raise_for_status()
+        editors.append(response.json())
+
+    family_ids = []
+    for i in range(args.families):
+        owner = editors[i % len(editors)]
+        data = generate_family(
+            GeneratorOptions(size=args.members, seed=args.seed + i), owner["id"]
+        )
+        response = await client.post(
+            "/api/families/import",
+            content=data.model_dump_json(),
+            headers={"Content-Type": "application/json"},
+            timeout=None,
+        )
+        response.raise_for_status()
+        family_ids.append(response.json()["id"])
+
+    sessions = []
+    for i, editor in enumerate(editors):
+        family_id = family_ids[i % len(family_ids)]
+        if i >= len(family_ids):
+            # Owners of the imported families need no invitation
+            await client.post(
+                f"/api/families/{family_id}/invite",
+                json={"email": editor["email"], "role": "editor"},
+            )
+        sessions.append((editor, family_id))
+    return sessions
+
+
+async def run(args):
+    server = None
+    base_url = args.url
+    if base_url is None:
+        port = free_port()
+        database = args.database or os.path.join(tempfile.mkdtemp(), "load.db")
+        print(f"database: {database}")
+        server = start_server(port, database, args.workers)
+        base_url = f"http://127.0.0.1:{port}"
+
+    limits = httpx.Limits(max_connections=args.editors + 1)
+    try:
+        async with httpx.AsyncClient(
+            base_url=base_url, limits=limits, timeout=60
+        ) as client:
+            await wait_for_server(client, server)
+            sessions = await seed(client, args)
+            print(
+                f"{args.editors} editors on {args.families} families of "
+                f"{args.members} members for {args.duration:.0f}s"
+            )
+
+            load = LoadTest(client, args.think, args.seed)
+            start = time.monotonic()
+            deadline = start + args.duration
+            await asyncio.gather(
+                *(load.session(editor, fid, deadline) for editor, fid in sessions)
+            )
+            load.report(time.monotonic() - start)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--editors", type=int, default=10)
+    parser.add_argument("--families", type=int, default=2)
+    parser.add_argument("--members", type=int, default=500, help="per family")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument(
+        "--think", type=float, default=0.2, help="mean pause between steps, seconds"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--database", help="SQLite file (default: a temporary one)")
+    parser.add_argument("--url", help="use a running server instead of starting one")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
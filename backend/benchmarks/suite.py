@@ -0,0 +1,222 @@
+"""Time the hot crud paths and list endpoints on synthetic families.
+
+Run from backend/:  python -m benchmarks.suite [--sizes 1000,10000,100000]
+
+Every size gets a freshly generated family (see benchmarks.genealogy) in a
+scratch SQLite database, linked to a small external family so imports also
+resolve cross-family members. Reported times are per call, in milliseconds.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+
+def measure(fn, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+class Suite:
+    def __init__(self, repeat: int, links: int, seed: int):
+        # Imported here: the app reads DATABASE_URL at import time
+        from fastapi.testclient import TestClient
+
+        from app import crud, models
+        from app.database import SessionLocal
+        from app.main import app
+
+        self.crud = crud
+        self.models = models
+        self.SessionLocal = SessionLocal
+        self.client = TestClient(app)
+        self.repeat = repeat
+        self.links = links
+        self.seed = seed
+        self.results = []
+
+        with SessionLocal() as db:
+            user = models.User(
+                email="bench@example.com", name="bench", password_hash=""
+            )
+            db.add(user)
+            db.commit()
+            self.user_id = user.id
+        self.external_members = self.import_external_family()
+
+    def import_external_family(self):
+        from benchmarks.genealogy import GeneratorOptions, generate_family
+
+        data = generate_family(
+            GeneratorOptions(size=200, seed=self.seed + 1),
+            self.user_id,
+            family_name="External family",
+        )
+        with self.SessionLocal() as db:
+            family = self.crud.import_family(db, data)
+            rows = (
+                db.query(self.models.Member.id, self.models.Member.gender)
+                .filter(self.models.Member.family_id == family.id)
+                .all()
+            )
+            return [(member_id, family.id, gender) for member_id, gender in rows]
+
+    def record(self, size: int, operation: str, timings: list[float]):
+        row = {
+            "size": size,
+            "operation": operation,
+            "runs": len(timings),
+            "median_ms": statistics.median(timings),
+            "min_ms": min(timings),
+            "max_ms": max(timings),
+        }
+        self.results.append(row)
+        print(
+            f"{size:>8} {operation:<34}{row['runs']:>5}"
+            f"{row['median_ms']:>12.1f}{row['min_ms']:>12.1f}{row['max_ms']:>12.1f}",
+            flush=True,
+        )
+
+    def run(self, size: int):
+        from benchmarks.genealogy import GeneratorOptions, generate_family
+
+        crud = self.crud
+        data = generate_family(
+            GeneratorOptions(size=size, cross_family_links=self.links, seed=self.seed),
+            self.user_id,
+            external_members=self.external_members,
+        )
+
+        family_id = None
+
+        def import_family():
+            nonlocal family_id
+            with self.SessionLocal() as db:
+                family_id = crud.import_family(db, data).id
+
+        self.record(size, "import_family", measure(import_family, 1))
+
+        with self.SessionLocal() as db:
+            member_ids = [
+                member_id
+                for (member_id,) in db.query(self.models.Member.id)
+                .filter(self.models.Member.family_id == family_id)
+                .order_by(self.models.Member.id)
+            ]
+
+        def get_family_graph():
+            # A new session each time, so nothing comes from the identity map
+            with self.SessionLocal() as db:
+                crud.get_family_graph(db, family_id)
+
+        self.record(size, "get_family_graph", measure(get_family_graph, self.repeat))
+
+        def get(url, **params):
+            response = self.client.get(url, params=params)
+            response.raise_for_status()
+            return response
+
+        def walk_members():
+            cursor = None
+            while True:
+                params = {"family_id": family_id, "limit": 1000}
+                if cursor:
+                    params["cursor"] = cursor
+                cursor = get("/api/members/", **params).headers.get("X-Next-Cursor")
+                if not cursor:
+                    break
+
+        for operation, fn in (
+            ("GET /api/families/", lambda: get("/api/families/", user_id=self.user_id)),
+            (
+                "GET /api/members/ (first page)",
+                lambda: get("/api/members/", family_id=family_id, limit=100),
+            ),
+            ("GET /api/members/ (all pages)", walk_members),
+            (
+                "GET /api/regions/family/{id}",
+                lambda: get(f"/api/regions/family/{family_id}"),
+            ),
+        ):
+            self.record(size, operation, measure(fn, self.repeat))
+
+        def update_positions(ids):
+            from app import schemas
+
+            updates = [
+                schemas.MemberPositionUpdate(id=member_id, position_x=i, position_y=i)
+                for i, member_id in enumerate(ids)
+            ]
+
+            def run():
+                with self.SessionLocal() as db:
+                    crud.update_members_positions(db, updates, family_id)
+
+            return run
+
+        self.record(
+            size,
+            "update_members_positions (100)",
+            measure(update_positions(member_ids[:100]), self.repeat),
+        )
+        self.record(
+            size,
+            "update_members_positions (all)",
+            measure(update_positions(member_ids), self.repeat),
+        )
+
+        # The youngest members, as a user pruning recent entries would
+        with self.SessionLocal() as db:
+            victims = [
+                member_id
+                for (member_id,) in db.query(self.models.Member.id)
+                .filter(self.models.Member.family_id == family_id)
+                .order_by(self.models.Member.birth_date.desc(), self.models.Member.id)
+                .limit(100)
+            ]
+
+        def delete_members():
+            with self.SessionLocal() as db:
+                crud.delete_members(db, victims)
+
+        self.record(size, "delete_members (100)", measure(delete_members, 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--links", type=int, default=10, help="cross-family links per family"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database", help="SQLite file (default: a temporary one)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    path = args.database or os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    print(f"database: {path}")
+
+    suite = Suite(args.repeat, args.links, args.seed)
+    print(
+        f"{'members':>8} {'operation':<34}{'runs':>5}"
+        f"{'median ms':>12}{'min ms':>12}{'max ms':>12}"
+    )
+    for size in (int(s) for s in args.sizes.split(",")):
+        suite.run(size)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(suite.results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Tests run against a scratch SQLite database.
+
+Run from backend/:  uv run pytest
+
+The app reads DATABASE_URL when app.database is first imported, so it is set
+here before any test module imports the app. Query budgets run in strict mode:
+a request that goes over its statement budget fails the test.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import uuid
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+os.environ["QUERY_BUDGET_ENABLED"] = "true"
+os.environ["QUERY_BUDGET_STRICT"] = "true"
+
+
+@contextmanager
+def count_statements():
+    """Collects the SQL statements executed inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture(scope="session")
+def app():
+    # Importing the app creates the schema (see app.db_init)
+    from app.main import app
+
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return TestClient(app)
+
+
+@pytest.fixture
+def db(app):
+    from app.database import SessionLocal
+
+    with SessionLocal() as session:
+        yield session
+
+
+def create_user(db, name: str = "tester"):
+    from app import models
+
+    user = models.User(
+        email=f"{name}-{uuid.uuid4().hex[:8]}@example.com",
+        name=name,
+        password_hash="",
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def user(db):
+    return create_user(db)
+
+
+def create_family_tree(db, user_id: str, members: dict, parent_child=(), spouses=()):
+    """Creates a family from {name: gender} and (parent, child) / (spouse,
+    spouse) name pairs; returns the family id and the member ids by name."""
+    from app import crud, schemas
+
+    family = crud.create_family(
+        db, schemas.FamilyCreate(family_name="Tree", user_id=user_id)
+    )
+    ids = {
+        name: crud.create_member(
+            db,
+            schemas.MemberCreate(name=name, gender=gender, family_id=family.id),
+        ).id
+        for name, gender in members.items()
+    }
+    for parent, child in parent_child:
+        relationship_type = "father" if members[parent] == "male" else "mother"
+        crud.create_parent_child_relationship(
+            db,
+            schemas.ParentChildRelationshipCreate(
+                parent_id=ids[parent],
+                child_id=ids[child],
+                relationship_type=relationship_type,
+            ),
+        )
+    for a, b in spouses:
+        crud.create_spouse_relationship(
+            db, schemas.SpouseRelationshipCreate(member1_id=ids[a], member2_id=ids[b])
+        )
+    return family.id, ids
+
+
+def import_synthetic_family(user_id: str, size: int, **options) -> str:
+    from app import crud
+    from app.database import SessionLocal
+    from benchmarks.genealogy import GeneratorOptions, generate_family
+
+    # import_family runs its own transaction, so it gets a fresh session
+    data = generate_family(GeneratorOptions(size=size, **options), user_id)
+    with SessionLocal() as db:
+        return crud.import_family(db, data).id
+
+
+def run_app(script: str, **env) -> str:
+    """Runs `script` in a fresh interpreter with extra environment (None
+    unsets a variable), for settings read when the app is imported. Fails on
+    a non-zero exit."""
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'app.db')}",
+        **env,
+    }
+    env = {name: value for name, value in env.items() if value is not None}
+    result = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(script)],
+        cwd=os.path.dirname(os.path.dirname(__file__)),
+        env=env,
+        capture_output=True,
+        check=False,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
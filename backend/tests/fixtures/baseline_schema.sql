@@ -0,0 +1,127 @@
+-- Schema created by the app before versioned migrations (SQLite), the
+-- starting point of tests/test_migrations.py
+
+CREATE TABLE users (
+    id VARCHAR NOT NULL,
+    email VARCHAR NOT NULL,
+    password_hash VARCHAR NOT NULL,
+    name VARCHAR NOT NULL,
+    is_superuser BOOLEAN NOT NULL,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    updated_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    PRIMARY KEY (id)
+);
+
+CREATE UNIQUE INDEX ix_users_email ON users (email);
+
+CREATE TABLE families (
+    id VARCHAR NOT NULL,
+    user_id VARCHAR NOT NULL,
+    family_name VARCHAR NOT NULL,
+    description TEXT,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+
+CREATE TABLE family_collaborators (
+    family_id VARCHAR NOT NULL,
+    user_id VARCHAR NOT NULL,
+    role VARCHAR NOT NULL,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    PRIMARY KEY (family_id, user_id),
+    FOREIGN KEY(family_id) REFERENCES families (id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+
+CREATE TABLE access_requests (
+    id VARCHAR NOT NULL,
+    family_id VARCHAR NOT NULL,
+    user_id VARCHAR NOT NULL,
+    status VARCHAR NOT NULL,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    updated_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    PRIMARY KEY (id),
+    FOREIGN KEY(family_id) REFERENCES families (id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+
+CREATE TABLE regions (
+    id VARCHAR NOT NULL,
+    family_id VARCHAR NOT NULL,
+    name VARCHAR NOT NULL,
+    description VARCHAR,
+    color VARCHAR,
+    linked_family_id VARCHAR,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    PRIMARY KEY (id),
+    FOREIGN KEY(family_id) REFERENCES families (id)
+);
+
+CREATE TABLE members (
+    id VARCHAR NOT NULL,
+    family_id VARCHAR NOT NULL,
+    name VARCHAR NOT NULL,
+    surname VARCHAR,
+    gender VARCHAR NOT NULL,
+    birth_date VARCHAR,
+    death_date VARCHAR,
+    is_deceased BOOLEAN,
+    is_fuzzy BOOLEAN,
+    remark VARCHAR,
+    birth_place VARCHAR,
+    photo_url VARCHAR,
+    sort_order INTEGER,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    updated_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    PRIMARY KEY (id),
+    FOREIGN KEY(family_id) REFERENCES families (id)
+);
+
+CREATE INDEX ix_members_name ON members (name);
+
+CREATE TABLE member_regions (
+    member_id VARCHAR NOT NULL,
+    region_id VARCHAR NOT NULL,
+    PRIMARY KEY (member_id, region_id),
+    FOREIGN KEY(member_id) REFERENCES members (id),
+    FOREIGN KEY(region_id) REFERENCES regions (id)
+);
+
+CREATE TABLE spouse_relationships (
+    id VARCHAR NOT NULL,
+    member1_id VARCHAR NOT NULL,
+    member2_id VARCHAR NOT NULL,
+    marriage_date VARCHAR,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    PRIMARY KEY (id),
+    CONSTRAINT unique_spouses UNIQUE (member1_id, member2_id),
+    FOREIGN KEY(member1_id) REFERENCES members (id),
+    FOREIGN KEY(member2_id) REFERENCES members (id)
+);
+
+CREATE TABLE parent_child_relationships (
+    id VARCHAR NOT NULL,
+    parent_id VARCHAR NOT NULL,
+    child_id VARCHAR NOT NULL,
+    relationship_type VARCHAR NOT NULL,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    PRIMARY KEY (id),
+    CONSTRAINT unique_parent_child UNIQUE (parent_id, child_id, relationship_type),
+    FOREIGN KEY(parent_id) REFERENCES members (id),
+    FOREIGN KEY(child_id) REFERENCES members (id)
+);
+
+CREATE TABLE member_positions (
+    id VARCHAR NOT NULL,
+    member_id VARCHAR NOT NULL,
+    family_id VARCHAR NOT NULL,
+    x INTEGER,
+    y INTEGER,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    updated_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    PRIMARY KEY (id),
+    CONSTRAINT unique_member_position_per_family UNIQUE (member_id, family_id),
+    FOREIGN KEY(member_id) REFERENCES members (id),
+    FOREIGN KEY(family_id) REFERENCES families (id)
+);
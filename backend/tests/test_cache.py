@@ -0,0 +1,55 @@
+from app import crud, models, schemas
+from app.cache import GraphCache, graph_cache, layout_cache
+
+from .conftest import import_synthetic_family
+
+
+def test_invalidate_drops_every_variant_of_a_family():
+    cache = GraphCache(max_entries=10)
+    cache.set("a", 1, b"full")
+    cache.set("a", 1, b"lean", variant="id,name")
+    cache.set("b", 1, b"other")
+
+    cache.invalidate("a")
+
+    assert cache.get("a", 1) is None
+    assert cache.get("a", 1, variant="id,name") is None
+    assert cache.get("b", 1) == b"other"
+    assert cache.stats()["bytes"] == len(b"other")
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = GraphCache(max_entries=10, max_bytes=10)
+    cache.set("a", 1, b"12345")
+    cache.set("b", 1, b"12345")
+    assert cache.get("a", 1) == b"12345"
+    cache.set("c", 1, b"12345")
+
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_write_evicts_projected_graphs_and_layouts(client, db, user):
+    family_id = import_synthetic_family(user.id, 20)
+    # The layout moves members, so it comes first to cache all at one version
+    assert client.post(f"/api/families/{family_id}/layout").status_code == 200
+    graph_url = f"/api/relationships/graph/{family_id}"
+    assert client.get(graph_url).status_code == 200
+    assert client.get(graph_url, params={"view": "lean"}).status_code == 200
+
+    version = crud.get_family_version(db, family_id)
+    lean = ",".join(crud.get_member_fields("lean"))
+    cached = [
+        (graph_cache, None),
+        (graph_cache, lean),
+        (layout_cache, "normal"),
+    ]
+    for cache, variant in cached:
+        assert cache.get(family_id, version, variant=variant) is not None
+
+    member = db.query(models.Member).filter_by(family_id=family_id).first()
+    crud.update_member(db, member.id, schemas.MemberUpdate(remark="edited"))
+
+    for cache, variant in cached:
+        assert cache.get(family_id, version, variant=variant) is None
@@ -0,0 +1,49 @@
+import gzip
+
+import pytest
+
+from app.compression import COMPRESSION_MIN_SIZE
+
+from .conftest import import_synthetic_family
+
+
+@pytest.fixture
+def graph_url(user):
+    return f"/api/relationships/graph/{import_synthetic_family(user.id, 100)}"
+
+
+def get_raw(client, url, accept_encoding):
+    # The raw body, without the client decoding it
+    with client.stream("GET", url, headers={"Accept-Encoding": accept_encoding}) as r:
+        return r, b"".join(r.iter_raw())
+
+
+def test_gzip_when_accepted(client, graph_url):
+    response, body = get_raw(client, graph_url, "gzip")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) == len(body)
+    assert len(gzip.decompress(body)) >= COMPRESSION_MIN_SIZE
+
+
+def test_brotli_preferred_when_installed(client, graph_url):
+    brotli = pytest.importorskip("brotli")
+    response, body = get_raw(client, graph_url, "gzip, br")
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(body).startswith(b"{")
+
+
+def test_gzip_when_brotli_is_refused(client, graph_url):
+    response, _ = get_raw(client, graph_url, "br;q=0, gzip")
+    assert response.headers["Content-Encoding"] == "gzip"
+
+
+def test_identity_without_accept_encoding(client, graph_url):
+    response, _ = get_raw(client, graph_url, "identity")
+    assert "Content-Encoding" not in response.headers
+
+
+def test_small_responses_are_not_compressed(client, user):
+    response, body = get_raw(client, f"/api/users/{user.id}", "gzip, br")
+    assert len(body) < COMPRESSION_MIN_SIZE
+    assert "Content-Encoding" not in response.headers
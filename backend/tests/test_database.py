@@ -0,0 +1,209 @@
+import json
+import os
+import tempfile
+
+import pytest
+
+from .conftest import run_app
+
+# Creates a family with a member over the API, reads it back through the read
+# routes and prints the responses and the pools that served them
+READ_ROUTES = """
+    import json
+    from fastapi.testclient import TestClient
+    from app import database
+    from app.main import app
+
+    client = TestClient(app)
+    user = client.post(
+        "/api/users/", json={"email": "a@example.com", "name": "A", "password": "x"}
+    ).json()
+    family = client.post(
+        "/api/families/", json={"family_name": "F", "user_id": user["id"]}
+    ).json()
+    client.post(
+        "/api/members/",
+        json={"name": "M", "gender": "male", "family_id": family["id"]},
+    )
+    # Past the read-your-writes window, reads may use the read pool
+    database.recent_writes.window = 0
+    database.recent_writes._deadlines.clear()
+    graph = client.get(f"/api/relationships/graph/{family['id']}")
+    members = client.get("/api/members/", params={"family_id": family["id"]})
+    print(json.dumps({
+        "graph": [graph.status_code, len(graph.json()["nodes"])],
+        "members": [members.status_code, len(members.json())],
+        "read_url": str(database.async_read_engine.url)
+        if database.async_read_engine else None,
+        "pools": {
+            name: stats.get("checkouts")
+            for name, stats in database.get_pool_stats().items()
+        },
+    }))
+"""
+
+
+def test_async_mode_serves_read_routes():
+    pytest.importorskip("aiosqlite")
+    result = json.loads(run_app(READ_ROUTES, DB_ASYNC="true").splitlines()[-1])
+
+    assert result["graph"] == [200, 1]
+    assert result["members"] == [200, 1]
+    assert result["pools"]["async"] > 0
+
+
+def test_async_mode_reads_through_the_read_only_sqlite_pool():
+    pytest.importorskip("aiosqlite")
+    result = json.loads(
+        run_app(READ_ROUTES, DB_ASYNC="true", SQLITE_PROFILE="production").splitlines()[
+            -1
+        ]
+    )
+
+    assert result["graph"] == [200, 1]
+    assert "mode=ro" in result["read_url"]
+    assert result["pools"]["async_read"] > 0
+
+
+def test_pool_stats_report_the_configured_max_overflow():
+    script = """
+        import json
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        print(json.dumps(TestClient(app).get("/api/instrumentation/pool").json()))
+    """
+    pools = json.loads(run_app(script, DB_MAX_OVERFLOW="3").splitlines()[-1])
+
+    assert pools["primary"]["max_overflow"] == 3
+
+
+# Writes a family, then reads it back straight away through a plain GET route
+# and tries to write through the read pool
+PRODUCTION_PROFILE = """
+    import json
+    from fastapi.testclient import TestClient
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from app import database
+    from app.main import app
+
+    client = TestClient(app)
+    user = client.post(
+        "/api/users/", json={"email": "a@example.com", "name": "A", "password": "x"}
+    ).json()
+    family = client.post(
+        "/api/families/", json={"family_name": "F", "user_id": user["id"]}
+    ).json()
+    with database.engine.connect() as conn:
+        journal_mode = conn.execute(text("PRAGMA journal_mode")).scalar()
+    read_only = None
+    if database.ReadSessionLocal is not None:
+        with database.ReadSessionLocal() as db:
+            try:
+                db.execute(text("DELETE FROM families"))
+                db.commit()
+                read_only = False
+            except OperationalError:
+                read_only = True
+
+    def read_checkouts():
+        return database.get_pool_stats().get("read", {}).get("checkouts", 0)
+
+    before = read_checkouts()
+    read = client.get(
+        f"/api/families/{family['id']}", params={"user_id": user["id"]}
+    )
+    print(json.dumps({
+        "journal_mode": journal_mode,
+        "read_url": str(database.read_engine.url) if database.read_engine else None,
+        "read_only": read_only,
+        "read": [read.status_code, read.json().get("family_name")],
+        "read_checkouts": read_checkouts() - before,
+    }))
+"""
+
+
+def test_sqlite_production_profile():
+    result = json.loads(
+        run_app(PRODUCTION_PROFILE, SQLITE_PROFILE="production").splitlines()[-1]
+    )
+
+    assert result["journal_mode"] == "wal"
+    assert "mode=ro" in result["read_url"]
+    assert result["read_only"] is True
+    # The read-only pool serves GETs and sees the write just committed
+    assert result["read"] == [200, "F"]
+    assert result["read_checkouts"] > 0
+
+
+def test_sqlite_default_profile_has_no_read_pool():
+    result = json.loads(
+        run_app(PRODUCTION_PROFILE, SQLITE_PROFILE=None).splitlines()[-1]
+    )
+
+    assert result["journal_mode"] == "delete"
+    assert result["read_url"] is None
+    assert result["read"] == [200, "F"]
+
+
+# The replica is a second, empty database: whatever a read finds there came
+# from the replica, whatever it finds in the primary did not
+REPLICA_READS = """
+    import json
+    from fastapi.testclient import TestClient
+    from app import database, models
+    from app.main import app
+
+    models.Base.metadata.create_all(database.read_engine)
+    client = TestClient(app)
+    user = client.post(
+        "/api/users/", json={"email": "a@example.com", "name": "A", "password": "x"}
+    ).json()
+    family = client.post(
+        "/api/families/", json={"family_name": "F", "user_id": user["id"]}
+    ).json()
+    client.post(
+        "/api/members/",
+        json={"name": "M", "gender": "male", "family_id": family["id"]},
+    )
+
+    def count_members():
+        response = client.get("/api/members/", params={"family_id": family["id"]})
+        return len(response.json())
+
+    just_written = count_members()
+    database.recent_writes._deadlines.clear()
+    print(json.dumps({
+        "just_written": just_written,
+        "later": count_members(),
+        "primary_only": client.get(f"/api/users/{user['id']}").status_code,
+    }))
+"""
+
+
+def get_replica_url() -> str:
+    return f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'replica.db')}"
+
+
+def test_replica_reads_your_writes_from_the_primary():
+    result = json.loads(
+        run_app(REPLICA_READS, DATABASE_READ_URL=get_replica_url()).splitlines()[-1]
+    )
+
+    # Pinned to the primary right after the write, then served by the replica
+    assert result["just_written"] == 1
+    assert result["later"] == 0
+    assert result["primary_only"] == 200
+
+
+def test_replica_without_read_your_writes_window():
+    result = json.loads(
+        run_app(
+            REPLICA_READS,
+            DATABASE_READ_URL=get_replica_url(),
+            READ_YOUR_WRITES_SECONDS="0",
+        ).splitlines()[-1]
+    )
+
+    assert result["just_written"] == 0
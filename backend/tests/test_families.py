@@ -0,0 +1,44 @@
+from sqlalchemy import text
+
+from app import crud, models, schemas
+
+from .conftest import import_synthetic_family
+
+
+def test_delete_family_with_change_log(db, user):
+    family_id = import_synthetic_family(user.id, 10)
+    member = (
+        db.query(models.Member).filter(models.Member.family_id == family_id).first()
+    )
+    crud.update_member(db, member.id, schemas.MemberUpdate(remark="edited"))
+    assert db.query(models.GraphChange).filter_by(family_id=family_id).count()
+
+    # Enforce foreign keys, as MySQL and PostgreSQL do
+    db.commit()
+    db.execute(text("PRAGMA foreign_keys=ON"))
+    try:
+        assert crud.delete_family(db, family_id) is not None
+    finally:
+        db.execute(text("PRAGMA foreign_keys=OFF"))
+
+    assert crud.get_family(db, family_id) is None
+    assert not db.query(models.GraphChange).filter_by(family_id=family_id).count()
+
+
+def test_import_progress_is_only_visible_to_the_importing_user(client, user):
+    from benchmarks.genealogy import GeneratorOptions, generate_family
+
+    data = generate_family(GeneratorOptions(size=10), user.id)
+    response = client.post(
+        "/api/families/import",
+        params={"import_id": "progress-test", "user_id": user.id},
+        json=data.model_dump(mode="json"),
+    )
+    assert response.status_code == 200
+
+    url = "/api/families/import/progress-test"
+    response = client.get(url, params={"user_id": user.id})
+    assert response.status_code == 200
+    assert response.json()["status"] == "completed"
+    assert client.get(url, params={"user_id": "someone-else"}).status_code == 404
+    assert client.get(url).status_code == 422
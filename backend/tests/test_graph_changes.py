@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from app import crud, models
+
+
+def create_family(client, user):
+    response = client.post(
+        "/api/families/", json={"family_name": "Delta", "user_id": user.id}
+    )
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def create_member(client, family_id, name):
+    response = client.post(
+        "/api/members/", json={"name": name, "gender": "male", "family_id": family_id}
+    )
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def get_version(db, family_id) -> int:
+    db.expire_all()
+    return db.get(models.Family, family_id).version
+
+
+def get_changes(client, family_id, since):
+    return client.get(
+        f"/api/relationships/graph/{family_id}/changes", params={"since": since}
+    )
+
+
+def test_changes_since_a_version(client, db, user):
+    family_id = create_family(client, user)
+    kept = create_member(client, family_id, "Kept")
+    since = get_version(db, family_id)
+
+    added = create_member(client, family_id, "Added")
+    client.put(f"/api/members/{kept}", json={"name": "Renamed"})
+    transient = create_member(client, family_id, "Transient")
+    client.delete(f"/api/members/{transient}")
+    client.delete(f"/api/members/{added}")
+    added = create_member(client, family_id, "Added again")
+
+    response = get_changes(client, family_id, since)
+    assert response.status_code == 200
+    delta = response.json()
+    assert delta["since"] == since
+    assert delta["version"] == get_version(db, family_id)
+    assert [n["id"] for n in delta["added"]["nodes"]] == [added]
+    assert [(n["id"], n["name"]) for n in delta["updated"]["nodes"]] == [
+        (kept, "Renamed")
+    ]
+    # Created and deleted inside the window: the client never saw it
+    assert delta["deleted"]["nodes"] == []
+
+    response = get_changes(client, family_id, delta["version"])
+    assert response.status_code == 200
+    assert response.json()["added"]["nodes"] == []
+
+
+def test_changes_report_deleted_members(client, db, user):
+    family_id = create_family(client, user)
+    member = create_member(client, family_id, "Gone")
+    since = get_version(db, family_id)
+    client.delete(f"/api/members/{member}")
+
+    delta = get_changes(client, family_id, since).json()
+    assert delta["deleted"]["nodes"] == [member]
+
+
+def test_changes_beyond_the_current_version_are_gone(client, db, user):
+    family_id = create_family(client, user)
+    version = get_version(db, family_id)
+
+    assert get_changes(client, family_id, version + 1).status_code == 410
+
+
+def test_changes_below_the_compaction_floor_are_gone(client, db, user):
+    family_id = create_family(client, user)
+    since = get_version(db, family_id)
+    create_member(client, family_id, "Compacted")
+    version = get_version(db, family_id)
+
+    crud.compact_graph_changes(db, retention=timedelta(seconds=-60))
+    db.commit()
+
+    assert get_version(db, family_id) == version
+    assert db.get(models.Family, family_id).change_log_floor == version
+    assert get_changes(client, family_id, since).status_code == 410
+    response = get_changes(client, family_id, version)
+    assert response.status_code == 200
+    assert response.json()["added"]["nodes"] == []
+
+
+def test_changes_unknown_family(client):
+    assert get_changes(client, "missing", 0).status_code == 404
@@ -0,0 +1,29 @@
+from app import crud
+
+from .conftest import count_statements, import_synthetic_family
+
+# regions, members, region links, positions, spouses, parent-child
+GRAPH_STATEMENTS = 6
+
+
+def get_graph_statements(db, family_id: str) -> list[str]:
+    # Nothing may come from the identity map of an earlier query
+    db.expire_all()
+    with count_statements() as statements:
+        graph = crud.get_family_graph(db, family_id)
+    assert graph.nodes
+    return statements
+
+
+def test_graph_statements_do_not_grow_with_family_size(db, user):
+    small = import_synthetic_family(user.id, 20)
+    large = import_synthetic_family(user.id, 1500)
+
+    assert len(get_graph_statements(db, small)) == GRAPH_STATEMENTS
+    assert len(get_graph_statements(db, large)) == GRAPH_STATEMENTS
+
+
+def test_graph_statements_without_regions(db, user):
+    family_id = import_synthetic_family(user.id, 200, regions=0)
+
+    assert len(get_graph_statements(db, family_id)) == GRAPH_STATEMENTS
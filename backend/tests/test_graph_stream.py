@@ -0,0 +1,50 @@
+import json
+
+from .conftest import import_synthetic_family
+
+
+def read_stream(client, family_id):
+    response = client.get(f"/api/relationships/graph/{family_id}/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return response, [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_stream_matches_the_graph(client, user):
+    family_id = import_synthetic_family(user.id, 40)
+    graph = client.get(f"/api/relationships/graph/{family_id}")
+
+    response, lines = read_stream(client, family_id)
+    assert response.headers["ETag"] == graph.headers["ETag"]
+    assert lines[0]["kind"] == "meta"
+    assert lines[0]["family_id"] == family_id
+    assert lines[-1]["kind"] == "end"
+
+    # meta, then nodes, edges and regions in that order, then end
+    kinds = [line["kind"] for line in lines[1:-1]]
+    assert kinds == sorted(kinds, key=["node", "edge", "region"].index)
+    items = {
+        kind: [line["data"] for line in lines if line["kind"] == kind]
+        for kind in ("node", "edge", "region")
+    }
+    assert lines[-1]["counts"] == {kind: len(data) for kind, data in items.items()}
+    for kind, key in (("node", "nodes"), ("edge", "edges"), ("region", "regions")):
+        assert {item["id"] for item in items[kind]} == {
+            item["id"] for item in graph.json()[key]
+        }
+
+
+def test_stream_has_no_member_cap(client, user):
+    family_id = import_synthetic_family(user.id, 2100, regions=0)
+
+    _, lines = read_stream(client, family_id)
+    nodes = {line["data"]["id"] for line in lines if line["kind"] == "node"}
+    assert len(nodes) == lines[-1]["counts"]["node"] == 2100
+    assert (
+        len(client.get(f"/api/relationships/graph/{family_id}").json()["nodes"]) == 2000
+    )
+
+
+def test_stream_unknown_family(client):
+    response = client.get("/api/relationships/graph/missing/stream")
+    assert response.status_code == 404
@@ -0,0 +1,51 @@
+from app import models
+
+from .conftest import import_synthetic_family
+
+
+def get_graph(client, family_id, etag=None):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get(f"/api/relationships/graph/{family_id}", headers=headers)
+
+
+def test_import_linking_existing_members_changes_their_graph(client, db, user):
+    from app import crud
+    from app.database import SessionLocal
+    from benchmarks.genealogy import GeneratorOptions, generate_family
+
+    family_a = import_synthetic_family(user.id, 30)
+    response = get_graph(client, family_a)
+    etag = response.headers["ETag"]
+    edges = len(response.json()["edges"])
+
+    members = db.query(models.Member).filter(models.Member.family_id == family_a)
+    external = [(m.id, m.family_id, m.gender) for m in members]
+    data = generate_family(
+        GeneratorOptions(size=30, cross_family_links=5), user.id, external
+    )
+    with SessionLocal() as session:
+        crud.import_family(session, data)
+
+    response = get_graph(client, family_a, etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.json()["edges"]) > edges
+
+
+def test_region_with_other_family_members_changes_their_graph(client, db, user):
+    family_a = import_synthetic_family(user.id, 10, regions=0)
+    family_b = import_synthetic_family(user.id, 10, regions=0)
+    etag = get_graph(client, family_a).headers["ETag"]
+    member = db.query(models.Member).filter(models.Member.family_id == family_a).first()
+
+    response = client.post(
+        "/api/regions/",
+        json={"name": "Shared", "family_id": family_b, "member_ids": [member.id]},
+    )
+    assert response.status_code == 200
+    region_id = response.json()["id"]
+
+    response = get_graph(client, family_a, etag)
+    assert response.status_code == 200
+    node = next(n for n in response.json()["nodes"] if n["id"] == member.id)
+    assert node["data"]["region_ids"] == [region_id]
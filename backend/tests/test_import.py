@@ -0,0 +1,29 @@
+from app import crud, models, schemas
+
+
+def test_import_nulls_get_model_defaults(db, user):
+    from app.database import SessionLocal
+
+    nulls = {"is_deceased": None, "is_fuzzy": None, "sort_order": None}
+    data = schemas.FamilyImport(
+        family_name="Nulls",
+        user_id=user.id,
+        members=[
+            {"original_id": "a", "name": "A", "gender": "male", **nulls},
+            {"original_id": "b", "name": "B", "gender": "female", "sort_order": 2},
+        ],
+        spouse_relationships=[],
+        parent_child_relationships=[],
+        regions=[{"original_id": "r", "name": "Branch", "color": None}],
+    )
+    with SessionLocal() as session:
+        family_id = crud.import_family(session, data).id
+
+    members = {
+        m.name: m
+        for m in db.query(models.Member).filter(models.Member.family_id == family_id)
+    }
+    assert (members["A"].is_deceased, members["A"].is_fuzzy) == (False, False)
+    assert (members["A"].sort_order, members["B"].sort_order) == (0, 2)
+    region = db.query(models.Region).filter_by(family_id=family_id).one()
+    assert region.color == "#EBF8FF"
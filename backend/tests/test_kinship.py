@@ -0,0 +1,140 @@
+import pytest
+
+from app.cache import kinship_cache
+from app.kinship import CHILD, PARENT, SPOUSE, describe
+
+from .conftest import create_family_tree
+
+MEMBERS = {
+    "great": "male",
+    "grand": "male",
+    "granny": "female",
+    "dad": "male",
+    "mum": "female",
+    "aunt": "female",
+    "me": "male",
+    "cousin": "female",
+    "kid": "male",
+    "stranger": "male",
+}
+PARENT_CHILD = [
+    ("great", "grand"),
+    ("grand", "dad"),
+    ("granny", "dad"),
+    ("grand", "aunt"),
+    ("granny", "aunt"),
+    ("dad", "me"),
+    ("mum", "me"),
+    ("aunt", "cousin"),
+    ("me", "kid"),
+]
+SPOUSES = [("grand", "granny"), ("dad", "mum")]
+
+
+@pytest.mark.parametrize(
+    "relations, label",
+    [
+        ([], "self"),
+        ([PARENT], "parent"),
+        ([PARENT, PARENT, PARENT], "great-grandparent"),
+        ([CHILD, CHILD], "grandchild"),
+        ([PARENT, CHILD], "sibling"),
+        ([PARENT, PARENT, CHILD], "aunt/uncle"),
+        ([PARENT, CHILD, CHILD], "niece/nephew"),
+        ([PARENT, PARENT, CHILD, CHILD], "first cousin"),
+        ([PARENT, PARENT, CHILD, CHILD, CHILD], "first cousin once removed"),
+        ([PARENT, PARENT, PARENT, CHILD, CHILD, CHILD], "second cousin"),
+        ([SPOUSE, PARENT], "spouse's parent"),
+        ([PARENT, SPOUSE], "parent's spouse"),
+        ([CHILD, PARENT], "child's parent"),
+    ],
+)
+def test_describe(relations, label):
+    assert describe(relations) == label
+
+
+@pytest.fixture
+def tree(db, user):
+    return create_family_tree(db, user.id, MEMBERS, PARENT_CHILD, SPOUSES)
+
+
+def get_kinship(client, ids, source, target):
+    response = client.get(f"/api/members/{ids[source]}/kinship/{ids[target]}")
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.parametrize(
+    "source, target, relationship, distance",
+    [
+        ("me", "me", "self", 0),
+        ("me", "granny", "grandparent", 2),
+        ("me", "cousin", "first cousin", 4),
+        ("kid", "great", "great-great-grandparent", 4),
+        ("mum", "aunt", "spouse's sibling", 3),
+        ("cousin", "kid", "first cousin once removed", 5),
+    ],
+)
+def test_kinship_labels(client, tree, source, target, relationship, distance):
+    _, ids = tree
+    kinship = get_kinship(client, ids, source, target)
+
+    assert kinship["related"] is True
+    assert kinship["relationship"] == relationship
+    assert kinship["distance"] == distance
+    assert len(kinship["path"]) == distance + 1
+    assert kinship["path"][0]["member_id"] == ids[source]
+    assert kinship["path"][-1]["member_id"] == ids[target]
+
+
+def test_kinship_path_steps(client, tree):
+    _, ids = tree
+    kinship = get_kinship(client, ids, "me", "cousin")
+
+    names = [step["name"] for step in kinship["path"]]
+    assert [step["relation"] for step in kinship["path"]] == [
+        None,
+        "parent",
+        "parent",
+        "child",
+        "child",
+    ]
+    # Through either grandparent
+    assert names[:2] == ["me", "dad"]
+    assert names[2] in ("grand", "granny")
+    assert names[3:] == ["aunt", "cousin"]
+
+
+def test_unrelated_members(client, tree):
+    _, ids = tree
+    kinship = get_kinship(client, ids, "me", "stranger")
+
+    assert kinship["related"] is False
+    assert kinship["relationship"] is None
+    assert kinship["path"] == []
+
+
+def test_kinship_index_is_cached_per_version(client, tree):
+    _, ids = tree
+    get_kinship(client, ids, "me", "cousin")
+    hits = kinship_cache.stats()["hits"]
+
+    get_kinship(client, ids, "kid", "granny")
+    assert kinship_cache.stats()["hits"] == hits + 1
+
+    client.put(f"/api/members/{ids['stranger']}", json={"name": "Renamed"})
+    get_kinship(client, ids, "kid", "granny")
+    assert kinship_cache.stats()["hits"] == hits + 1
+
+
+def test_kinship_member_outside_the_family(client, db, user, tree):
+    family_id, ids = tree
+    _, other = create_family_tree(db, user.id, {"outsider": "male"})
+
+    response = client.get(f"/api/members/{ids['me']}/kinship/{other['outsider']}")
+    assert response.status_code == 404
+    response = client.get(
+        f"/api/members/{ids['me']}/kinship/{ids['dad']}",
+        params={"family_id": family_id},
+    )
+    assert response.status_code == 200
@@ -0,0 +1,81 @@
+from app.cache import layout_cache
+from app.layout import LAYOUT_PRESETS, LayoutMember, RecursiveFamilyLayout
+
+from .conftest import count_statements, import_synthetic_family
+
+
+def test_layout_places_spouses_on_a_row_and_centres_parents():
+    preset = LAYOUT_PRESETS["normal"]
+    members = [
+        LayoutMember(id="father", gender="male"),
+        LayoutMember(id="mother", gender="female"),
+        LayoutMember(id="younger", gender="male", birth_date="1990-05-01"),
+        LayoutMember(id="elder", gender="female", birth_date="1985-01-01"),
+        LayoutMember(id="stranger", gender="male"),
+    ]
+    positions = RecursiveFamilyLayout.from_preset("normal").layout(
+        members,
+        [("father", "mother")],
+        [
+            ("father", "younger"),
+            ("mother", "younger"),
+            ("father", "elder"),
+            ("mother", "elder"),
+        ],
+    )
+
+    assert set(positions) == {m.id for m in members}
+    father, mother = positions["father"], positions["mother"]
+    elder, younger = positions["elder"], positions["younger"]
+    assert father[1] == mother[1] == 0
+    assert mother[0] - father[0] == preset["node_width"] + preset["spouse_gap"]
+    assert elder[1] == younger[1] == preset["node_height"] + preset["y_gap"]
+    # Siblings by birth date, the parents centred above them
+    assert younger[0] - elder[0] == preset["node_width"] + preset["x_gap"]
+    assert father[0] + mother[0] == elder[0] + younger[0]
+    # Disconnected families are laid out to the right
+    assert positions["stranger"][0] > younger[0] + preset["node_width"]
+
+
+def test_layout_endpoint_stores_positions(client, user):
+    family_id = import_synthetic_family(user.id, 30)
+
+    response = client.post(f"/api/families/{family_id}/layout")
+    assert response.status_code == 200
+    layout = response.json()
+    assert layout["mode"] == "normal"
+    positions = {p["member_id"]: (p["x"], p["y"]) for p in layout["positions"]}
+
+    graph = client.get(f"/api/relationships/graph/{family_id}")
+    assert graph.headers["ETag"] == f'W/"{layout["version"]}"'
+    nodes = {n["id"]: (n["x"], n["y"]) for n in graph.json()["nodes"]}
+    assert nodes == positions
+
+    compact = client.post(
+        f"/api/families/{family_id}/layout", params={"mode": "compact"}
+    ).json()
+    assert compact["version"] > layout["version"]
+    compact_positions = {p["member_id"]: (p["x"], p["y"]) for p in compact["positions"]}
+    assert compact_positions != positions
+
+
+def test_repeated_layout_is_served_from_the_cache(client, user):
+    family_id = import_synthetic_family(user.id, 30)
+    url = f"/api/families/{family_id}/layout"
+    first = client.post(url)
+    hits = layout_cache.stats()["hits"]
+
+    with count_statements() as statements:
+        second = client.post(url)
+    assert second.content == first.content
+    assert layout_cache.stats()["hits"] == hits + 1
+    # Only the family version is read
+    assert len(statements) == 1
+
+
+def test_layout_rejects_unknown_modes_and_families(client, user):
+    family_id = import_synthetic_family(user.id, 5)
+
+    response = client.post(f"/api/families/{family_id}/layout", params={"mode": "x"})
+    assert response.status_code == 400
+    assert client.post("/api/families/missing/layout").status_code == 404
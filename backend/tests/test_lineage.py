@@ -0,0 +1,107 @@
+import pytest
+
+from .conftest import create_family_tree
+
+MEMBERS = {
+    "great": "male",
+    "grand": "male",
+    "granny": "female",
+    "dad": "male",
+    "mum": "female",
+    "aunt": "female",
+    "me": "male",
+    "cousin": "female",
+    "kid": "male",
+}
+PARENT_CHILD = [
+    ("great", "grand"),
+    ("grand", "dad"),
+    ("granny", "dad"),
+    ("grand", "aunt"),
+    ("granny", "aunt"),
+    ("dad", "me"),
+    ("mum", "me"),
+    ("aunt", "cousin"),
+    ("me", "kid"),
+]
+SPOUSES = [("grand", "granny"), ("dad", "mum")]
+
+
+@pytest.fixture
+def tree(db, user):
+    _, ids = create_family_tree(db, user.id, MEMBERS, PARENT_CHILD, SPOUSES)
+    return ids
+
+
+def get_lineage(client, tree, name, direction, **params):
+    response = client.get(f"/api/members/{tree[name]}/{direction}", params=params)
+    assert response.status_code == 200
+    graph = response.json()
+    names = {member_id: name for name, member_id in tree.items()}
+    nodes = {names[node["id"]] for node in graph["nodes"]}
+    edges = {
+        (names[edge["source"]], names[edge["target"]], edge["type"])
+        for edge in graph["edges"]
+    }
+    return nodes, edges
+
+
+@pytest.mark.parametrize(
+    "depth, expected",
+    [
+        (1, {"me", "dad", "mum"}),
+        (2, {"me", "dad", "mum", "grand", "granny"}),
+        (3, {"me", "dad", "mum", "grand", "granny", "great"}),
+        (100, {"me", "dad", "mum", "grand", "granny", "great"}),
+    ],
+)
+def test_ancestors_up_to_depth(client, tree, depth, expected):
+    nodes, _ = get_lineage(client, tree, "me", "ancestors", depth=depth)
+    assert nodes == expected
+
+
+@pytest.mark.parametrize(
+    "depth, expected",
+    [
+        (1, {"grand", "dad", "aunt"}),
+        (2, {"grand", "dad", "aunt", "me", "cousin"}),
+        (3, {"grand", "dad", "aunt", "me", "cousin", "kid"}),
+    ],
+)
+def test_descendants_up_to_depth(client, tree, depth, expected):
+    nodes, _ = get_lineage(client, tree, "grand", "descendants", depth=depth)
+    assert nodes == expected
+
+
+def test_lineage_edges_stay_inside_the_subgraph(client, tree):
+    _, edges = get_lineage(client, tree, "me", "ancestors", depth=2)
+
+    assert edges == {
+        ("grand", "dad", "parent-child"),
+        ("granny", "dad", "parent-child"),
+        ("dad", "me", "parent-child"),
+        ("mum", "me", "parent-child"),
+        ("grand", "granny", "spouse"),
+        ("dad", "mum", "spouse"),
+    }
+
+
+def test_descendants_with_spouses(client, tree):
+    nodes, edges = get_lineage(
+        client, tree, "grand", "descendants", depth=1, include_spouses=True
+    )
+
+    assert nodes == {"grand", "granny", "dad", "mum", "aunt"}
+    assert ("dad", "mum", "spouse") in edges
+
+
+@pytest.mark.parametrize("depth", [0, 101])
+def test_lineage_depth_is_bounded(client, tree, depth):
+    response = client.get(
+        f"/api/members/{tree['me']}/ancestors", params={"depth": depth}
+    )
+    assert response.status_code == 422
+
+
+def test_lineage_unknown_member(client):
+    assert client.get("/api/members/missing/descendants").status_code == 404
@@ -0,0 +1,27 @@
+from .conftest import run_app
+
+LISTENING = """
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from app import metrics
+
+    print(event.contains(Engine, "after_cursor_execute", metrics._after_cursor_execute))
+"""
+
+
+def test_metrics_count_requests_and_statements(client, user):
+    assert client.get(f"/api/users/{user.id}").status_code == 200
+
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/api/users/{user_id}"' in body
+    statements = next(
+        line
+        for line in body.splitlines()
+        if line.startswith("db_sql_statements_total ")
+    )
+    assert int(statements.split()[1]) > 0
+
+
+def test_disabled_metrics_do_not_listen_to_statements():
+    assert run_app(LISTENING, METRICS_ENABLED="false").strip() == "False"
+    assert run_app(LISTENING, METRICS_ENABLED="true").strip() == "True"
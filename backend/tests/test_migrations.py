@@ -0,0 +1,110 @@
+import json
+import os
+import sqlite3
+
+from sqlalchemy import create_engine, inspect
+
+from app.migrations import SCHEMA_VERSION
+
+from .conftest import run_app
+
+BASELINE_SCHEMA = os.path.join(
+    os.path.dirname(__file__), "fixtures", "baseline_schema.sql"
+)
+
+# Data written by the pre-migration app
+BASELINE_DATA = """
+    INSERT INTO users (id, email, password_hash, name, is_superuser)
+        VALUES ('u1', 'old@example.com', '', 'Old', 0);
+    INSERT INTO families (id, user_id, family_name) VALUES ('f1', 'u1', 'Old');
+    INSERT INTO members (id, family_id, name, gender)
+        VALUES ('m1', 'f1', 'Father', 'male'), ('m2', 'f1', 'Son', 'male');
+    INSERT INTO parent_child_relationships (id, parent_id, child_id, relationship_type)
+        VALUES ('pc1', 'm1', 'm2', 'father');
+"""
+
+UPGRADE = """
+    import sys
+    from app.migrations import main
+
+    sys.argv = ["migrations", "upgrade"]
+    main()
+"""
+
+# Starts the app without migrating and uses the old data
+CHECK = """
+    import json
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    graph = client.get("/api/relationships/graph/f1")
+    member = client.post(
+        "/api/members/", json={"name": "New", "gender": "female", "family_id": "f1"}
+    )
+    changes = client.get(
+        "/api/relationships/graph/f1/changes", params={"since": 0}
+    )
+    page = client.get("/api/members/", params={"family_id": "f1", "limit": 2})
+    print(json.dumps({
+        "startup": client.get("/api/instrumentation/startup").json(),
+        "graph": [graph.status_code, len(graph.json()["nodes"])],
+        "member": member.status_code,
+        "changes": [n["name"] for n in changes.json()["added"]["nodes"]],
+        "next_cursor": "X-Next-Cursor" in page.headers,
+    }))
+"""
+
+
+def create_baseline_database(path: str) -> str:
+    with open(BASELINE_SCHEMA) as f:
+        schema = f.read()
+    conn = sqlite3.connect(path)
+    conn.executescript(schema + BASELINE_DATA)
+    conn.close()
+    return f"sqlite:///{path}"
+
+
+def get_schema(url: str) -> dict:
+    engine = create_engine(url)
+    inspector = inspect(engine)
+    schema = {
+        table: (
+            {c["name"] for c in inspector.get_columns(table)},
+            {i["name"] for i in inspector.get_indexes(table)},
+        )
+        for table in inspector.get_table_names()
+    }
+    engine.dispose()
+    return schema
+
+
+def test_upgrade_from_the_baseline_schema(tmp_path):
+    url = create_baseline_database(str(tmp_path / "baseline.db"))
+
+    output = run_app(UPGRADE, DATABASE_URL=url)
+    assert f"Schema at version {SCHEMA_VERSION} ({SCHEMA_VERSION} applied)" in output
+
+    # Same tables, columns and indexes as a database created from scratch
+    fresh_url = f"sqlite:///{tmp_path / 'fresh.db'}"
+    run_app("from app import main", DATABASE_URL=fresh_url)
+    assert get_schema(url) == get_schema(fresh_url)
+
+    output = run_app(CHECK, DATABASE_URL=url, DB_INIT="check")
+    assert f"Database schema is current (version {SCHEMA_VERSION})" in output
+    result = json.loads(output.splitlines()[-1])
+    assert result["startup"]["db_init"] == "check"
+    assert result["startup"]["schema_version"] == SCHEMA_VERSION
+    assert result["graph"] == [200, 2]
+    assert result["member"] == 200
+    assert result["changes"] == ["New"]
+    assert result["next_cursor"] is True
+
+
+def test_check_mode_reports_a_pending_upgrade(tmp_path):
+    url = create_baseline_database(str(tmp_path / "baseline.db"))
+
+    output = run_app("from app import main", DATABASE_URL=url, DB_INIT="check")
+    assert "does not match" in output
+    # Nothing was migrated
+    assert "schema_version" not in get_schema(url)
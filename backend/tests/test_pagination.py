@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import models
+
+
+def create_family(client, user):
+    response = client.post(
+        "/api/families/", json={"family_name": "Paged", "user_id": user.id}
+    )
+    return response.json()["id"]
+
+
+def create_members(client, db, family_id, count):
+    ids = [
+        client.post(
+            "/api/members/",
+            json={"name": f"Member {i}", "gender": "male", "family_id": family_id},
+        ).json()["id"]
+        for i in range(count)
+    ]
+    # Spread creation times so the expected order differs from id order; the
+    # last two share a timestamp and fall back to id order
+    start = datetime(2020, 1, 1)
+    created = sorted(ids, reverse=True)
+    for i, member_id in enumerate(created):
+        db.query(models.Member).filter(models.Member.id == member_id).update(
+            {"created_at": start + timedelta(minutes=min(i, count - 2))}
+        )
+    db.commit()
+    return created[:-2] + sorted(created[-2:])
+
+
+def list_members(client, family_id, **params):
+    return client.get("/api/members/", params={"family_id": family_id, **params})
+
+
+def test_listing_is_in_creation_order(client, db, user):
+    family_id = create_family(client, user)
+    ids = create_members(client, db, family_id, 5)
+
+    assert [m["id"] for m in list_members(client, family_id).json()] == ids
+
+
+def test_cursor_walk_visits_every_member_once_in_order(client, db, user):
+    family_id = create_family(client, user)
+    ids = create_members(client, db, family_id, 7)
+
+    response = list_members(client, family_id, limit=3)
+    seen = [m["id"] for m in response.json()]
+    cursor = response.headers.get("X-Next-Cursor")
+    while cursor:
+        response = list_members(client, family_id, limit=3, cursor=cursor)
+        assert response.status_code == 200
+        seen += [m["id"] for m in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+    assert seen == ids
+
+
+def test_invalid_cursor_is_rejected(client, user):
+    family_id = create_family(client, user)
+    assert list_members(client, family_id, cursor="not-a-cursor").status_code == 400
+
+
+# The last row of page 5 shares its timestamp with the next one
+@pytest.mark.parametrize("limit", [3, 5])
+def test_cursor_survives_deleting_the_last_row_of_a_page(client, db, user, limit):
+    family_id = create_family(client, user)
+    ids = create_members(client, db, family_id, 6)
+
+    response = list_members(client, family_id, limit=limit)
+    cursor = response.headers["X-Next-Cursor"]
+    assert client.delete(f"/api/members/{ids[limit - 1]}").status_code == 200
+
+    response = list_members(client, family_id, limit=limit, cursor=cursor)
+    assert [m["id"] for m in response.json()] == ids[limit:]
+
+
+def test_projected_listing_pages_by_cursor(client, db, user):
+    family_id = create_family(client, user)
+    ids = create_members(client, db, family_id, 4)
+
+    response = list_members(client, family_id, limit=2, fields="name")
+    assert list(response.json()[0]) == ["name", "id"]
+    cursor = response.headers["X-Next-Cursor"]
+    response = list_members(client, family_id, limit=2, fields="name", cursor=cursor)
+    assert [m["id"] for m in response.json()] == ids[2:]
@@ -0,0 +1,76 @@
+import os
+import pstats
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import profiling
+from app.profiling import ProfilingMiddleware
+
+from .conftest import create_user
+
+
+@pytest.fixture
+def superuser(db):
+    user = create_user(db, "admin")
+    user.is_superuser = True
+    db.commit()
+    return user
+
+
+def get_family(client, user_id, headers=None):
+    response = client.post(
+        "/api/families/", json={"family_name": "Profiled", "user_id": user_id}
+    )
+    family_id = response.json()["id"]
+    response = client.get(f"/api/families/{family_id}", headers=headers)
+    assert response.status_code == 200
+    return family_id, response
+
+
+def test_superuser_header_profiles_the_request(app, superuser, tmp_path):
+    client = TestClient(ProfilingMiddleware(app, directory=str(tmp_path)))
+    family_id, response = get_family(
+        client, superuser.id, headers={"X-Profile": superuser.id}
+    )
+
+    name = response.headers["X-Profile-File"]
+    assert os.listdir(tmp_path) == [name]
+    assert name.endswith(f"-GET-api_families_family_id-{family_id}.prof")
+    stats = pstats.Stats(str(tmp_path / name))
+    assert any(func == "read_family" for _, _, func in stats.stats)
+
+
+def test_header_of_other_users_is_ignored(app, user, tmp_path):
+    client = TestClient(ProfilingMiddleware(app, directory=str(tmp_path)))
+    _, response = get_family(client, user.id, headers={"X-Profile": user.id})
+
+    assert "X-Profile-File" not in response.headers
+    assert os.listdir(tmp_path) == []
+
+
+def test_sampled_requests_are_profiled(app, user, tmp_path):
+    client = TestClient(
+        ProfilingMiddleware(app, directory=str(tmp_path), sample_rate=1.0)
+    )
+    _, response = get_family(client, user.id)
+
+    assert "X-Profile-File" in response.headers
+
+
+def test_one_profile_at_a_time(app, superuser, tmp_path):
+    client = TestClient(ProfilingMiddleware(app, directory=str(tmp_path)))
+    with profiling._profiling:
+        _, response = get_family(
+            client, superuser.id, headers={"X-Profile": superuser.id}
+        )
+
+    assert "X-Profile-File" not in response.headers
+    assert os.listdir(tmp_path) == []
+
+
+def test_profiling_is_off_by_default(client, superuser):
+    assert not profiling.PROFILING_ENABLED
+    _, response = get_family(client, superuser.id, headers={"X-Profile": superuser.id})
+
+    assert "X-Profile-File" not in response.headers
@@ -0,0 +1,76 @@
+import pytest
+
+from app import crud
+
+from .conftest import import_synthetic_family
+
+LEAN = set(crud.MEMBER_VIEWS["lean"])
+
+
+def test_member_fields():
+    assert crud.get_member_fields() is None
+    assert crud.get_member_fields("full") is None
+    assert set(crud.get_member_fields("lean")) == LEAN
+    # id always comes along, in schema order; fields wins over view
+    assert crud.get_member_fields("lean", "gender, name") == ["name", "gender", "id"]
+
+
+@pytest.mark.parametrize("view, fields", [("tiny", None), (None, "name,password")])
+def test_member_fields_rejects_unknown_names(view, fields):
+    with pytest.raises(ValueError):
+        crud.get_member_fields(view, fields)
+
+
+def get_graph(client, family_id, **params):
+    response = client.get(f"/api/relationships/graph/{family_id}", params=params)
+    assert response.status_code == 200
+    return response
+
+
+def test_lean_graph(client, user):
+    family_id = import_synthetic_family(user.id, 30)
+    full = get_graph(client, family_id)
+    lean = get_graph(client, family_id, view="lean")
+
+    assert lean.headers["ETag"] == full.headers["ETag"]
+    assert len(lean.content) < len(full.content)
+    full, lean = full.json(), lean.json()
+    assert all(set(node["data"]) == LEAN for node in lean["nodes"])
+    # Only node data is trimmed
+    assert lean["edges"] == full["edges"]
+    assert lean["regions"] == full["regions"]
+    assert [{**n, "data": None} for n in lean["nodes"]] == [
+        {**n, "data": None} for n in full["nodes"]
+    ]
+    for lean_node, full_node in zip(lean["nodes"], full["nodes"]):
+        assert lean_node["data"] == {f: full_node["data"][f] for f in LEAN}
+
+
+def test_graph_fields(client, user):
+    family_id = import_synthetic_family(user.id, 10)
+    graph = get_graph(client, family_id, fields="name,region_ids").json()
+
+    assert graph["nodes"]
+    for node in graph["nodes"]:
+        assert set(node["data"]) == {"id", "name", "region_ids"}
+
+
+@pytest.mark.parametrize("params", [{"view": "tiny"}, {"fields": "name,password"}])
+def test_unknown_projection(client, user, params):
+    family_id = import_synthetic_family(user.id, 5)
+
+    response = client.get(f"/api/relationships/graph/{family_id}", params=params)
+    assert response.status_code == 400
+    response = client.get("/api/members/", params={"family_id": family_id, **params})
+    assert response.status_code == 400
+
+
+def test_member_listing_projection(client, user):
+    family_id = import_synthetic_family(user.id, 10)
+    url = "/api/members/"
+    full = client.get(url, params={"family_id": family_id}).json()
+    lean = client.get(url, params={"family_id": family_id, "view": "lean"}).json()
+    names = client.get(url, params={"family_id": family_id, "fields": "name"}).json()
+
+    assert [set(m) for m in lean] == [LEAN] * len(full)
+    assert names == [{"id": m["id"], "name": m["name"]} for m in full]
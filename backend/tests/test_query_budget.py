@@ -0,0 +1,126 @@
+"""Routes that used to issue one query per row, exercised with enough rows to
+go over the per-statement repeat budget if they did again."""
+
+import pytest
+
+from app import crud, models, schemas
+from app.query_budget import QUERY_BUDGET_MAX_REPEATS, QueryBudgetExceeded
+
+from .conftest import create_user, import_synthetic_family, run_app
+
+# More rows than one statement may be repeated per request
+ROWS = QUERY_BUDGET_MAX_REPEATS + 5
+
+
+@pytest.fixture
+def owner(db):
+    return create_user(db, name="owner")
+
+
+def create_families(db, owner, count):
+    return [
+        crud.create_family(
+            db, schemas.FamilyCreate(family_name=f"Family {i}", user_id=owner.id)
+        )
+        for i in range(count)
+    ]
+
+
+def test_read_families_roles(client, db, owner, user):
+    families = create_families(db, owner, ROWS)
+    for i, family in enumerate(families):
+        crud.add_collaborator(db, family.id, user.id, ["viewer", "editor"][i % 2])
+
+    response = client.get("/api/families/", params={"user_id": user.id})
+    assert response.status_code == 200
+    roles = {f["current_user_role"] for f in response.json()}
+    assert roles == {"viewer", "editor"}
+
+
+def test_collaborators(client, db, owner):
+    (family,) = create_families(db, owner, 1)
+    for i in range(ROWS):
+        crud.add_collaborator(db, family.id, create_user(db, f"c{i}").id, "viewer")
+
+    response = client.get(f"/api/families/{family.id}/collaborators")
+    assert response.status_code == 200
+    assert len(response.json()) == ROWS
+    assert all(c["user"]["email"] for c in response.json())
+
+
+def test_pending_access_requests(client, db, owner):
+    families = create_families(db, owner, ROWS)
+    for i, family in enumerate(families):
+        crud.create_access_request(
+            db,
+            schemas.AccessRequestCreate(
+                family_id=family.id, user_id=create_user(db, f"r{i}").id
+            ),
+        )
+
+    response = client.get(
+        "/api/families/access-requests/pending", params={"user_id": owner.id}
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == ROWS
+
+
+def test_delete_members(client, db, user):
+    family_id = import_synthetic_family(user.id, ROWS * 2)
+    member_ids = [
+        m.id
+        for m in db.query(models.Member).filter(models.Member.family_id == family_id)
+    ]
+
+    response = client.request(
+        "DELETE", "/api/members/", json={"member_ids": member_ids}
+    )
+    assert response.status_code == 204
+    db.expire_all()
+    assert not db.query(models.Member).filter_by(family_id=family_id).count()
+
+
+def test_graph(client, user):
+    family_id = import_synthetic_family(user.id, ROWS * 10)
+
+    response = client.get(f"/api/relationships/graph/{family_id}")
+    assert response.status_code == 200
+    assert len(response.json()["nodes"]) == ROWS * 10
+
+
+def test_reintroduced_n_plus_one_fails(client, db, owner, monkeypatch):
+    (family,) = create_families(db, owner, 1)
+    for i in range(ROWS):
+        crud.add_collaborator(db, family.id, create_user(db, f"n{i}").id, "viewer")
+
+    def get_collaborators_with_users(db, family_id):
+        # The user of each collaborator fetched in its own query
+        collaborators = db.query(models.FamilyCollaborator).filter_by(
+            family_id=family_id
+        )
+        for collaborator in collaborators:
+            collaborator.user = crud.get_user(db, collaborator.user_id)
+        return collaborators
+
+    monkeypatch.setattr(
+        crud, "get_collaborators_with_users", get_collaborators_with_users
+    )
+    with pytest.raises(QueryBudgetExceeded, match="repeated"):
+        client.get(f"/api/families/{family.id}/collaborators")
+
+
+def test_off_by_default():
+    script = """
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        from app import query_budget
+        from app.main import app
+
+        print(
+            query_budget.QUERY_BUDGET_ENABLED,
+            event.contains(Engine, "after_cursor_execute", query_budget._count_statement),
+            any(m.cls is query_budget.QueryBudgetMiddleware for m in app.user_middleware),
+        )
+    """
+    output = run_app(script, QUERY_BUDGET_ENABLED=None).splitlines()[-1]
+    assert output == "False False False"
@@ -0,0 +1,90 @@
+import json
+
+from app.slow_queries import get_parameter_shape, slow_query_log
+
+from .conftest import run_app
+
+# Every statement counts as slow; an admin reads the log back
+SLOW_QUERIES = """
+    import json
+    from fastapi.testclient import TestClient
+    from app import database, models
+    from app.main import app
+
+    client = TestClient(app)
+    admin = client.post(
+        "/api/users/", json={"email": "a@example.com", "name": "A", "password": "x"}
+    ).json()
+    other = client.post(
+        "/api/users/", json={"email": "b@example.com", "name": "B", "password": "x"}
+    ).json()
+    with database.SessionLocal() as db:
+        db.get(models.User, admin["id"]).is_superuser = True
+        db.commit()
+    family = client.post(
+        "/api/families/", json={"family_name": "F", "user_id": admin["id"]}
+    ).json()
+    client.get(f"/api/relationships/graph/{family['id']}")
+
+    url = "/api/instrumentation/slow-queries"
+    log = client.get(url, params={"user_id": admin["id"], "limit": 1000}).json()
+    denied = client.get(url, params={"user_id": other["id"]}).status_code
+    client.delete(url, params={"user_id": admin["id"]})
+    cleared = client.get(url, params={"user_id": admin["id"]}).json()
+    print(json.dumps({
+        "log": log,
+        "denied": denied,
+        "after_clear": [e["caller"] for e in cleared["entries"]],
+    }))
+"""
+
+
+def test_parameter_shape_keeps_types_only():
+    assert get_parameter_shape(("a", "b", "c", 1, "d"), False) == [
+        "str x3",
+        "int",
+        "str",
+    ]
+    assert get_parameter_shape({"name": "secret", "limit": 5}, False) == {
+        "name": "str",
+        "limit": "int",
+    }
+    assert get_parameter_shape([("a", 1), ("b", 2)], True) == {
+        "rows": 2,
+        "row": ["str", "int"],
+    }
+
+
+def test_slow_queries_are_captured_with_their_plan():
+    result = json.loads(
+        run_app(
+            SLOW_QUERIES, SLOW_QUERY_LOG="true", SLOW_QUERY_THRESHOLD_MS="0"
+        ).splitlines()[-1]
+    )
+
+    log = result["log"]
+    assert log["enabled"] is True
+    assert log["threshold_ms"] == 0
+    assert log["total"] >= len(log["entries"]) > 0
+    selects = [
+        e for e in log["entries"] if e["statement"].lstrip().startswith("SELECT")
+    ]
+    graph = [e for e in selects if "get_family_graph" in e["caller"]]
+    assert graph
+    for entry in graph:
+        assert entry["caller"].startswith("app.crud.get_family_graph:")
+        assert entry["dialect"] == "sqlite"
+        assert entry["plan"] and not entry["plan"][0].startswith("EXPLAIN failed")
+    # Bound values never reach the log
+    assert "a@example.com" not in json.dumps(log)
+
+    assert result["denied"] == 403
+    # Only the admin check of the read that followed the clear
+    assert [c.split(":")[0] for c in result["after_clear"]] == ["app.crud.get_user"]
+
+
+def test_slow_query_log_is_off_by_default(client, user):
+    total = slow_query_log.total
+    client.get("/api/families/", params={"user_id": user.id})
+
+    assert slow_query_log.total == total